@@ -1,7 +1,10 @@
+import json
 import logging
 from pathlib import Path
 from typing import Generator
 
+from ..core.chapter_store import get_chapter_file
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,7 +13,11 @@ def make_jsons(app, data) -> Generator[str, None, None]:
     yield str(root_path / 'meta.json')
     for vol in data:
         for chap in data[vol]:
-            file_name = "%s.json" % str(chap["id"]).rjust(5, "0")
-            file_path = root_path / "json" / file_name
+            file_path = get_chapter_file(chap, app.output_path, app.pack_by_volume)
+            if not file_path.is_file() and chap.get("body"):
+                # export the chapters kept in another chapter store
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                with file_path.open("w", encoding="utf-8") as fp:
+                    json.dump(chap, fp, ensure_ascii=False)
             if file_path.is_file():
                 yield str(file_path)
@@ -14,6 +14,7 @@ from ...core.sources import crawler_list, prepare_crawler, rejected_sources
 from ...utils.platforms import Platform
 from .open_folder_prompt import display_open_folder
 from .resume_download import resume_session
+from .update_novel import update_session
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,10 @@ def start(self):
         resume_session()
         return
 
+    if "update" in args:
+        update_session()
+        return
+
     self.app = App()
 
     # Set filename if provided
@@ -164,16 +169,19 @@ def process_chapter_range(self, disable_args=False):
         start, stop = self.get_range_using_index(disable_args)
         chapters = self.app.crawler.chapters[start : (stop + 1)]
     elif res == "volumes":
-        selected = self.get_range_from_volumes(disable_args)
+        selected = set(self.get_range_from_volumes(disable_args))
         chapters = [
             chap
-            for chap in self.app.crawler.chapters
-            if selected.count(chap["volume"]) > 0
+            for vol in self.app.crawler.volumes
+            if vol["id"] in selected
+            for chap in self.app.crawler.get_volume_chapters(vol["id"])
         ]
     elif res == "chapters":
         selected = self.get_range_from_chapters(disable_args)
         chapters = [
-            chap for chap in self.app.crawler.chapters if selected.count(chap["id"]) > 0
+            chap
+            for chap in map(self.app.crawler.get_chapter_by_id, sorted(set(selected)))
+            if chap
         ]
 
     if len(chapters) == 0:
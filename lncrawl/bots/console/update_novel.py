@@ -0,0 +1,65 @@
+import logging
+from typing import List, Optional
+
+from questionary import prompt
+
+from ... import constants as C
+from ...core import display
+from ...core.app import App
+from ...core.arguments import get_args
+from ...core.metadata import get_metadata_list, save_metadata
+from ...models import MetaInfo
+from .open_folder_prompt import display_open_folder
+
+logger = logging.getLogger(__name__)
+
+
+def update_session():
+    args = get_args()
+    output_path = args.update or C.DEFAULT_OUTPUT_PATH
+
+    updatable_meta_data: List[MetaInfo] = [
+        meta
+        for meta in get_metadata_list(output_path)
+        if meta.novel and meta.session
+    ]
+
+    meta: Optional[MetaInfo] = None
+    if len(updatable_meta_data) == 1:
+        meta = updatable_meta_data[0]
+    elif len(updatable_meta_data) > 1:
+        answer = prompt(
+            [
+                {
+                    "type": "list",
+                    "name": "update",
+                    "message": "Which one do you want to update?",
+                    "choices": display.format_update_choices(updatable_meta_data),
+                }
+            ]
+        )
+        index = answer["update"]
+        meta = updatable_meta_data[index]
+
+    if not meta:
+        print("No downloaded novel to update\n")
+        display.app_complete()
+        return
+
+    app = App()
+    update = app.check_for_updates(meta)
+    assert app.crawler
+
+    print("Updating", app.crawler.novel_title)
+    print("Output path:", app.output_path)
+    display.novel_update_summary(update)
+
+    if app.chapters or update.moved or update.removed:
+        list(app.start_download())
+        list(app.bind_books())
+    else:
+        save_metadata(app, True)
+
+    app.destroy()
+    display.app_complete()
+    display_open_folder(app.output_path)
@@ -394,11 +394,12 @@ class MessageHandler:
             self.send_sync(
                 "Selected volumes: " + ", ".join(selected),
             )
-            selected = [int(x) for x in selected]
+            selected = set(int(x) for x in selected)
             self.app.chapters = [
                 chap
-                for chap in self.app.crawler.chapters
-                if selected.count(chap["volume"]) > 0
+                for vol in self.app.crawler.volumes
+                if vol["id"] in selected
+                for chap in self.app.crawler.get_volume_chapters(vol["id"])
             ]
         elif re.match(r"^chapter(\s\d+)+$", text):
             text = text[len("chapter") :].strip()
@@ -23,6 +23,8 @@ def analyze_url(base_url: str, url: str) -> Type[Crawler]:
     if CrawlerType:
         raise LNException("A crawler already exists for this url")
 
+    # the templates are found while importing the crawlers
+    crawler_list.load_all()
     for index, template in enumerate(template_list):
         name = template.__name__
         print(Style.BRIGHT + Chars.CLOVER, "Checking", name, end=" ")
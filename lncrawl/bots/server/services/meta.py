@@ -4,7 +4,7 @@ import json
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 from urllib.parse import urlparse
 
 from fastapi import APIRouter
@@ -13,9 +13,10 @@ from PIL import Image
 
 from lncrawl.constants import META_FILE_NAME
 from lncrawl.core.app import App
-from lncrawl.core.download_chapters import get_chapter_file
+from lncrawl.core.chapter_store import get_chapter_file, open_chapter_store
+from lncrawl.core.metadata import read_metadata_file
 from lncrawl.core.sources import crawler_list, rejected_sources
-from lncrawl.models import Chapter, MetaInfo
+from lncrawl.models import Chapter
 
 from ..context import ServerContext
 from ..exceptions import AppError, AppErrors
@@ -101,9 +102,7 @@ class MetadataService:
         meta_file = output_path / META_FILE_NAME
         if not meta_file.is_file():
             raise AppErrors.no_metadata_file
-        with open(meta_file, "r", encoding="utf-8") as fp:
-            data = json.load(fp)
-            meta = MetaInfo(**data)
+        meta = read_metadata_file(meta_file)
         if not meta.novel or not meta.session:
             raise AppErrors.malformed_metadata_file
         return meta.session, meta.novel
@@ -159,19 +158,43 @@ class MetadataService:
 
         return list(volumes.values())
 
+    def read_stored_chapter(
+        self,
+        chapters: List[Chapter],
+        json_file: Path,
+        output_path: Path,
+        pack_by_volume: bool,
+    ):
+        try:
+            chapter_id = int(json_file.stem)
+        except ValueError:
+            raise AppErrors.not_found
+        index = binary_search(
+            chapters,
+            {'id': chapter_id},
+            compare=lambda a, b: a['id'] < b['id']
+        )
+        if index is None:
+            raise AppErrors.not_found
+        with open_chapter_store(str(output_path), pack_by_volume) as store:
+            content = store.get(chapters[index])
+        if not content:
+            raise AppErrors.not_found
+        return content
+
     def get_novel_chapter_content(self, novel_id: str, hash: str):
         output_path = self.resolve_output_path(novel_id)
         session, novel = self.load_novel_meta(output_path)
 
         file_path = base64.urlsafe_b64decode(hash).decode()
         json_file = (Path(output_path) / file_path).resolve()
-        if not json_file.is_file():
-            raise AppErrors.not_found
-
-        with open(json_file, 'r', encoding='utf-8') as fp:
-            content = json.load(fp)
-            if not isinstance(content, dict):
-                raise AppErrors.malformed_json_file
+        if json_file.is_file():
+            with open(json_file, 'r', encoding='utf-8') as fp:
+                content = json.load(fp)
+        else:
+            content = self.read_stored_chapter(novel.chapters, json_file, output_path, session.pack_by_volume)
+        if not isinstance(content, dict):
+            raise AppErrors.malformed_json_file
 
         result = NovelChapterContent(
             id=content['id'],
@@ -175,6 +175,11 @@ def microtask(job_id: str, signal=Event()) -> None:
                     break
                 if cur_time - last_report > 5:
                     job.progress = round(app.progress)
+                    job.extra = dict(
+                        job.extra,
+                        circuit=crawler.circuit_state,
+                        pipeline=crawler.pipeline_stats,
+                    )
                     last_report = cur_time
                     save(refresh=True)
             else:
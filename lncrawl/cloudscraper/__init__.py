@@ -20,10 +20,11 @@ from .cloudflare_v2 import CloudflareV2
 from .cloudflare_v3 import CloudflareV3
 from .exceptions import (AbortedException, CloudflareIUAMError,
                          CloudflareLoopProtection)
+from .pacing import RequestPacer
 from .proxy_manager import ProxyManager
 from .stealth import StealthMode
 from .turnstile import CloudflareTurnstile
-from .user_agent import User_Agent
+from .user_agent import User_Agent, getCipherSuites
 
 # ------------------------------------------------------------------------------- #
 
@@ -158,13 +159,14 @@ class CloudScraper(Session):
         self.auto_refresh_on_403 = kwargs.pop('auto_refresh_on_403', True)
         self.max_403_retries = kwargs.pop('max_403_retries', 3)
 
-        # Request throttling and TLS management
-        self.last_request_time = 0.0
+        # Request throttling per host and TLS management
         self.min_request_interval = kwargs.pop('min_request_interval', 1.0)  # Minimum 1 second between requests
         self.max_concurrent_requests = kwargs.pop('max_concurrent_requests', 1)  # Limit concurrent requests
-        self.current_concurrent_requests = 0
+        self.pacer = RequestPacer(self)
         self.rotate_tls_ciphers = kwargs.pop('rotate_tls_ciphers', True)  # Enable TLS cipher rotation
         self._cipher_rotation_count = 0
+        self._cipher_variants = {}  # browser -> list of cipher suites to rotate
+        self._cipher_adapters = {}  # cipher suite -> pre-built https adapter
 
         # Proxy management
         proxy_options = kwargs.pop('proxy_options', {})
@@ -204,16 +206,7 @@ class CloudScraper(Session):
             self.cipherSuite = ':'.join(self.cipherSuite)
 
         # Mount the HTTPS adapter with our custom cipher suite
-        self.mount(
-            'https://',
-            CipherSuiteAdapter(
-                cipherSuite=self.cipherSuite,
-                ecdhCurve=self.ecdhCurve,
-                server_hostname=self.server_hostname,
-                source_address=self.source_address,
-                ssl_context=self.ssl_context
-            )
-        )
+        self.mount('https://', self._get_cipher_adapter(self.cipherSuite))
 
         # Initialize Cloudflare handlers
         self.cloudflare_v1 = Cloudflare(self)
@@ -282,163 +275,151 @@ class CloudScraper(Session):
     # ------------------------------------------------------------------------------- #
 
     def request(self, method, url, *args, **kwargs):
-        try:
-            # Apply request throttling to prevent TLS blocking
-            self._apply_request_throttling()
-
-            # Rotate TLS cipher suites to avoid detection
-            if self.rotate_tls_ciphers:
-                self._rotate_tls_cipher_suite()
-
-            # Check if session needs refresh due to age
-            if self._should_refresh_session():
-                self._refresh_session(url)
-
-            # Handle proxy rotation if no specific proxies are provided
-            if not kwargs.get('proxies') and hasattr(self, 'proxy_manager') and self.proxy_manager.proxies:
-                kwargs['proxies'] = self.proxy_manager.get_proxy()
-            elif kwargs.get('proxies') and kwargs.get('proxies') != self.proxies:
-                self.proxies = kwargs.get('proxies')
-
-            # Apply stealth techniques if enabled
-            if self.enable_stealth:
-                kwargs = self.stealth_mode.apply_stealth_techniques(method, url, **kwargs)
-
-            # Track request count
-            self.request_count += 1
-
-            # Track concurrent requests
-            self.current_concurrent_requests += 1
-
-            # ------------------------------------------------------------------------------- #
-            # Pre-Hook the request via user defined function.
-            # ------------------------------------------------------------------------------- #
-
-            if self.requestPreHook:
-                (method, url, args, kwargs) = self.requestPreHook(
-                    self,
-                    method,
-                    url,
-                    *args,
-                    **kwargs
-                )
+        # Rotate TLS cipher suites to avoid detection
+        if self.rotate_tls_ciphers:
+            self._rotate_tls_cipher_suite()
+
+        # Check if session needs refresh due to age
+        if self._should_refresh_session():
+            self._refresh_session(url)
+
+        # Handle proxy rotation if no specific proxies are provided
+        if not kwargs.get('proxies') and hasattr(self, 'proxy_manager') and self.proxy_manager.proxies:
+            kwargs['proxies'] = self.proxy_manager.get_proxy()
+        elif kwargs.get('proxies') and kwargs.get('proxies') != self.proxies:
+            self.proxies = kwargs.get('proxies')
+
+        # Apply stealth techniques if enabled
+        if self.enable_stealth:
+            kwargs = self.stealth_mode.apply_stealth_techniques(method, url, **kwargs)
+
+        # Track request count
+        self.request_count += 1
+
+        # ------------------------------------------------------------------------------- #
+        # Pre-Hook the request via user defined function.
+        # ------------------------------------------------------------------------------- #
+
+        if self.requestPreHook:
+            (method, url, args, kwargs) = self.requestPreHook(
+                self,
+                method,
+                url,
+                *args,
+                **kwargs
+            )
 
-            # ------------------------------------------------------------------------------- #
-            # Make the request via requests.
-            # ------------------------------------------------------------------------------- #
+        # ------------------------------------------------------------------------------- #
+        # Make the request via requests.
+        # ------------------------------------------------------------------------------- #
 
-            try:
+        # Human-like delays are folded into the request schedule of the host
+        delay = 0.0
+        if self.enable_stealth:
+            delay = self.stealth_mode.human_like_delay()
+
+        try:
+            # Apply request throttling per host to prevent TLS blocking.
+            # The slot is released before solving challenges, which make requests of their own.
+            with self.pacer.slot(url, delay):
                 response = self.decodeBrotli(
                     self.perform_request(method, url, *args, **kwargs)
                 )
 
-                # Report successful proxy use if applicable
-                if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
-                    self.proxy_manager.report_success(kwargs['proxies'])
+            # Report successful proxy use if applicable
+            if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
+                self.proxy_manager.report_success(kwargs['proxies'])
 
-            except (requests.exceptions.ProxyError, requests.exceptions.ConnectionError) as e:
-                # Report failed proxy use if applicable
-                if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
-                    self.proxy_manager.report_failure(kwargs['proxies'])
+        except (requests.exceptions.ProxyError, requests.exceptions.ConnectionError) as e:
+            # Report failed proxy use if applicable
+            if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
+                self.proxy_manager.report_failure(kwargs['proxies'])
+            raise e
 
-                # CRITICAL FIX: Always decrement concurrent request counter on exception
-                if self.current_concurrent_requests > 0:
-                    self.current_concurrent_requests -= 1
-                raise e
-            except Exception as e:
-                # CRITICAL FIX: Always decrement concurrent request counter on any exception
-                if self.current_concurrent_requests > 0:
-                    self.current_concurrent_requests -= 1
-                raise e
+        # ------------------------------------------------------------------------------- #
+        # Debug the request via the Response object.
+        # ------------------------------------------------------------------------------- #
 
-            # ------------------------------------------------------------------------------- #
-            # Debug the request via the Response object.
-            # ------------------------------------------------------------------------------- #
+        if self.debug:
+            self.debugRequest(response)
 
-            if self.debug:
-                self.debugRequest(response)
-
-            # ------------------------------------------------------------------------------- #
-            # Post-Hook the request aka Post-Hook the response via user defined function.
-            # ------------------------------------------------------------------------------- #
-
-            if self.requestPostHook:
-                newResponse = self.requestPostHook(self, response)
-
-                if response != newResponse:
-                    response = newResponse
-                    if self.debug:
-                        print('==== requestPostHook Debug ====')
-                        self.debugRequest(response)
-
-            # ------------------------------------------------------------------------------- #
-            # Handle Cloudflare challenges
-            # ------------------------------------------------------------------------------- #
-
-            # Check for loop protection
-            if self._solveDepthCnt >= self.solveDepth:
-                _ = self._solveDepthCnt
-                self.simpleException(
-                    CloudflareLoopProtection,
-                    f"!!Loop Protection!! We have tried to solve {_} time(s) in a row."
-                )
+        # ------------------------------------------------------------------------------- #
+        # Post-Hook the request aka Post-Hook the response via user defined function.
+        # ------------------------------------------------------------------------------- #
+
+        if self.requestPostHook:
+            newResponse = self.requestPostHook(self, response)
+
+            if response != newResponse:
+                response = newResponse
+                if self.debug:
+                    print('==== requestPostHook Debug ====')
+                    self.debugRequest(response)
+
+        # ------------------------------------------------------------------------------- #
+        # Handle Cloudflare challenges
+        # ------------------------------------------------------------------------------- #
+
+        # Check for loop protection
+        if self._solveDepthCnt >= self.solveDepth:
+            _ = self._solveDepthCnt
+            self.simpleException(
+                CloudflareLoopProtection,
+                f"!!Loop Protection!! We have tried to solve {_} time(s) in a row."
+            )
 
-            # Check for Cloudflare Turnstile challenges first (if not disabled)
-            if not self.disableTurnstile:
-                # Check for Turnstile Challenge
-                if self.turnstile.is_Turnstile_Challenge(response):
-                    if self.debug:
-                        print('Detected a Cloudflare Turnstile challenge.')
-                    self._solveDepthCnt += 1
-                    response = self.turnstile.handle_Turnstile_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v3 challenges (if not disabled)
-            if not self.disableCloudflareV3:
-                # Check for v3 JavaScript VM Challenge
-                if self.cloudflare_v3.is_V3_Challenge(response):
-                    if self.debug:
-                        print('Detected a Cloudflare v3 JavaScript VM challenge.')
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v3.handle_V3_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v2 challenges (if not disabled)
-            if not self.disableCloudflareV2:
-                # Check for v2 Captcha Challenge
-                if self.cloudflare_v2.is_V2_Captcha_Challenge(response):
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v2.handle_V2_Captcha_Challenge(response, **kwargs)
-                    return response
-
-                # Check for v2 JavaScript Challenge
-                if self.cloudflare_v2.is_V2_Challenge(response):
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v2.handle_V2_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v1 challenges (if not disabled)
-            if not self.disableCloudflareV1:
-                # Check if Cloudflare v1 anti-bot is on
-                if self.cloudflare_v1.is_Challenge_Request(response):
-                    # Try to solve the challenge and send it back
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v1.Challenge_Response(response, **kwargs)
-                    return response
-
-            # Reset solve depth counter if no challenge was detected
-            if not response.is_redirect and response.status_code not in [429, 503]:
-                self._solveDepthCnt = 0
-
-            # Handle 403 errors with automatic session refresh
-            if response.status_code == 403:
-                self.last_403_time = time.time()
-
-            return response
-        finally:
-            # Decrement concurrent request counter
-            if self.current_concurrent_requests > 0:
-                self.current_concurrent_requests -= 1
+        # Check for Cloudflare Turnstile challenges first (if not disabled)
+        if not self.disableTurnstile:
+            # Check for Turnstile Challenge
+            if self.turnstile.is_Turnstile_Challenge(response):
+                if self.debug:
+                    print('Detected a Cloudflare Turnstile challenge.')
+                self._solveDepthCnt += 1
+                response = self.turnstile.handle_Turnstile_Challenge(response, **kwargs)
+                return response
+
+        # Check for Cloudflare v3 challenges (if not disabled)
+        if not self.disableCloudflareV3:
+            # Check for v3 JavaScript VM Challenge
+            if self.cloudflare_v3.is_V3_Challenge(response):
+                if self.debug:
+                    print('Detected a Cloudflare v3 JavaScript VM challenge.')
+                self._solveDepthCnt += 1
+                response = self.cloudflare_v3.handle_V3_Challenge(response, **kwargs)
+                return response
+
+        # Check for Cloudflare v2 challenges (if not disabled)
+        if not self.disableCloudflareV2:
+            # Check for v2 Captcha Challenge
+            if self.cloudflare_v2.is_V2_Captcha_Challenge(response):
+                self._solveDepthCnt += 1
+                response = self.cloudflare_v2.handle_V2_Captcha_Challenge(response, **kwargs)
+                return response
+
+            # Check for v2 JavaScript Challenge
+            if self.cloudflare_v2.is_V2_Challenge(response):
+                self._solveDepthCnt += 1
+                response = self.cloudflare_v2.handle_V2_Challenge(response, **kwargs)
+                return response
+
+        # Check for Cloudflare v1 challenges (if not disabled)
+        if not self.disableCloudflareV1:
+            # Check if Cloudflare v1 anti-bot is on
+            if self.cloudflare_v1.is_Challenge_Request(response):
+                # Try to solve the challenge and send it back
+                self._solveDepthCnt += 1
+                response = self.cloudflare_v1.Challenge_Response(response, **kwargs)
+                return response
+
+        # Reset solve depth counter if no challenge was detected
+        if not response.is_redirect and response.status_code not in [429, 503]:
+            self._solveDepthCnt = 0
+
+        # Handle 403 errors with automatic session refresh
+        if response.status_code == 403:
+            self.last_403_time = time.time()
+
+        return response
 
     # ------------------------------------------------------------------------------- #
     # Session health monitoring and refresh methods
@@ -530,35 +511,13 @@ class CloudScraper(Session):
         if self.debug:
             print('Cleared Cloudflare cookies for session refresh')
 
-    def _apply_request_throttling(self):
-        """
-        Apply request throttling to prevent TLS blocking from concurrent requests
-        """
-        current_time = time.time()
-
-        # Wait for minimum interval between requests
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            if self.debug:
-                print(f'⏱️ Request throttling: sleeping {sleep_time:.2f}s')
-            time.sleep(sleep_time)
-            if self.signal.is_set():
-                raise AbortedException()
-
-        # Wait if too many concurrent requests
-        while self.current_concurrent_requests >= self.max_concurrent_requests:
-            if self.debug:
-                print(f'🚦 Concurrent request limit reached ({self.current_concurrent_requests}/{self.max_concurrent_requests}), waiting...')
-            time.sleep(0.1)
-            if self.signal.is_set():
-                raise AbortedException()
-
-        self.last_request_time = time.time()
-
     def _rotate_tls_cipher_suite(self):
         """
-        Rotate TLS cipher suites to avoid detection patterns
+        Rotate TLS cipher suites to avoid detection patterns.
+
+        Every cipher suite variant has its own pre-built adapter, which keeps its
+        pooled connections. Rotating only swaps the mounted adapter, so the
+        keep-alive connections of a variant are reused when it comes back.
         """
         if not hasattr(self, 'user_agent') or not hasattr(self.user_agent, 'cipherSuite'):
             return
@@ -567,51 +526,62 @@ class CloudScraper(Session):
         browser_name = getattr(self.user_agent, 'browser', 'chrome')
 
         try:
-            # Get cipher suites from browsers.json
-            import json
-            import os
-            browsers_file = os.path.join(os.path.dirname(__file__), 'user_agent', 'browsers.json')
-
-            with open(browsers_file, 'r') as f:
-                browsers_data = json.load(f)
-
-            available_ciphers = browsers_data.get('cipherSuite', {}).get(browser_name, [])
-
-            if available_ciphers and len(available_ciphers) > 1:
-                # Rotate through cipher suites
-                self._cipher_rotation_count += 1
-                cipher_index = self._cipher_rotation_count % len(available_ciphers)
-
-                # Use a subset of ciphers to create variation
-                num_ciphers = min(8, len(available_ciphers))  # Use up to 8 ciphers
-                start_index = cipher_index % (len(available_ciphers) - num_ciphers + 1)
-                selected_ciphers = available_ciphers[start_index:start_index + num_ciphers]
-
-                new_cipher_suite = ':'.join(selected_ciphers)
-
-                if new_cipher_suite != self.cipherSuite:
-                    self.cipherSuite = new_cipher_suite
-
-                    # Update the HTTPS adapter with new cipher suite
-                    self.mount(
-                        'https://',
-                        CipherSuiteAdapter(
-                            cipherSuite=self.cipherSuite,
-                            ecdhCurve=self.ecdhCurve,
-                            server_hostname=self.server_hostname,
-                            source_address=self.source_address,
-                            ssl_context=self.ssl_context
-                        )
-                    )
-
-                    if self.debug:
-                        print(f'🔐 Rotated TLS cipher suite (rotation #{self._cipher_rotation_count})')
-                        print(f'    Using {len(selected_ciphers)} ciphers starting from index {start_index}')
+            variants = self._get_cipher_variants(browser_name)
+            if len(variants) < 2:
+                return
+
+            # Rotate through cipher suites
+            self._cipher_rotation_count += 1
+            new_cipher_suite = variants[self._cipher_rotation_count % len(variants)]
+
+            if new_cipher_suite != self.cipherSuite:
+                self.cipherSuite = new_cipher_suite
+
+                # Swap the HTTPS adapter in place with the one of the new cipher suite
+                self.adapters['https://'] = self._get_cipher_adapter(new_cipher_suite)
+
+                if self.debug:
+                    print(f'🔐 Rotated TLS cipher suite (rotation #{self._cipher_rotation_count})')
 
         except Exception as e:
             if self.debug:
                 print(f'⚠️ TLS cipher rotation failed: {e}')
 
+    def _get_cipher_variants(self, browser_name):
+        """
+        Get the cipher suite variants of a browser, made of windows of up to 8 ciphers
+        """
+        if browser_name not in self._cipher_variants:
+            available_ciphers = getCipherSuites(browser_name)
+            num_ciphers = min(8, len(available_ciphers))  # Use up to 8 ciphers
+            self._cipher_variants[browser_name] = [
+                ':'.join(available_ciphers[start_index:start_index + num_ciphers])
+                for start_index in range(len(available_ciphers) - num_ciphers + 1)
+            ] if available_ciphers else []
+        return self._cipher_variants[browser_name]
+
+    def _get_cipher_adapter(self, cipherSuite):
+        """
+        Get the pre-built HTTPS adapter of a cipher suite, creating it on first use
+        """
+        adapter = self._cipher_adapters.get(cipherSuite)
+        if adapter is None:
+            adapter = CipherSuiteAdapter(
+                cipherSuite=cipherSuite,
+                ecdhCurve=self.ecdhCurve,
+                server_hostname=self.server_hostname,
+                source_address=self.source_address,
+                ssl_context=self.ssl_context
+            )
+            adapter = self._cipher_adapters.setdefault(cipherSuite, adapter)
+        return adapter
+
+    def close(self):
+        # Close the pooled connections of the adapters that are not mounted too
+        for adapter in self._cipher_adapters.values():
+            adapter.close()
+        super(CloudScraper, self).close()
+
     # ------------------------------------------------------------------------------- #
 
     @classmethod
@@ -0,0 +1,140 @@
+import logging
+import time
+from contextlib import contextmanager
+from threading import Condition, Lock
+from urllib.parse import urlparse
+
+from .exceptions import AbortedException
+
+# ------------------------------------------------------------------------------- #
+
+
+class HostSchedule:
+    """
+    The request slots of a single host
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.cond = Condition()
+        self.active = 0
+        self.last_start = None
+        self.paced = True
+
+# ------------------------------------------------------------------------------- #
+
+
+class RequestPacer:
+    """
+    Schedule request slots per host.
+
+    Every host keeps its own start time of the last request and its own count
+    of requests in flight, so that slow or throttled hosts never hold back the
+    requests to other hosts sharing the same session.
+    """
+
+    def __init__(self, cloudscraper):
+        """
+        Initialize the pacer. The `min_request_interval`, `max_concurrent_requests`
+        and `signal` of the cloudscraper are used for the schedule.
+
+        :param cloudscraper: The CloudScraper instance
+        """
+        self.cloudscraper = cloudscraper
+        self._hosts = {}
+        self._lock = Lock()
+
+    # ------------------------------------------------------------------------------- #
+
+    def _get_schedule(self, url):
+        return self._get_host_schedule(urlparse(url).hostname or '')
+
+    def _get_host_schedule(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostSchedule(host)
+            return self._hosts[host]
+
+    # ------------------------------------------------------------------------------- #
+
+    def set_paced(self, host, paced=True):
+        """
+        Enable or disable the schedule of a host, e.g. when the caller paces its requests.
+        The requests to a host which is not paced start at once, without keeping
+        the `min_request_interval`, the extra delays and the concurrency limit.
+
+        :param host: The hostname of the URLs
+        :param paced: False to let the requests to the host start at once
+        """
+        self._get_host_schedule(host or '').paced = paced
+
+    # ------------------------------------------------------------------------------- #
+
+    def acquire(self, url, delay=0.0):
+        """
+        Wait for a free slot of the host and reserve its start time.
+
+        The next start time is the last one plus the larger of `min_request_interval`
+        and the extra `delay`, so the delays are part of the schedule instead
+        of being slept on top of it. The first request to a host starts at once.
+
+        :param url: URL to request
+        :param delay: Extra seconds to keep from the previous request, e.g. a human-like delay
+        :return: The schedule of the host, to be passed to `release`
+        """
+        signal = self.cloudscraper.signal
+        min_interval = self.cloudscraper.min_request_interval
+        max_concurrent = max(1, self.cloudscraper.max_concurrent_requests)
+
+        schedule = self._get_schedule(url)
+        with schedule.cond:
+            if not schedule.paced:
+                schedule.active += 1
+                return schedule
+            while schedule.active >= max_concurrent:
+                if signal.is_set():
+                    raise AbortedException()
+                schedule.cond.wait(1)
+            now = time.monotonic()
+            start = now
+            if schedule.last_start is not None:
+                start = max(now, schedule.last_start + max(min_interval, delay))
+            schedule.last_start = start
+            schedule.active += 1
+
+        wait_time = start - now
+        if wait_time > 0:
+            logging.debug(f'Pacing request to {schedule.name} for {wait_time:.2f} seconds')
+            if signal.wait(wait_time):
+                self.release(schedule)
+                raise AbortedException()
+
+        return schedule
+
+    # ------------------------------------------------------------------------------- #
+
+    def release(self, schedule):
+        """
+        Release the slot of a finished request
+
+        :param schedule: The value returned by `acquire`
+        """
+        with schedule.cond:
+            schedule.active -= 1
+            schedule.cond.notify()
+
+    # ------------------------------------------------------------------------------- #
+
+    @contextmanager
+    def slot(self, url, delay=0.0):
+        """
+        Hold a request slot of the host while the block is being executed
+
+        :param url: URL to request
+        :param delay: Extra seconds to keep from the previous request
+        """
+        schedule = self.acquire(url, delay)
+        try:
+            yield schedule
+        finally:
+            self.release(schedule)
@@ -1,10 +1,7 @@
-import logging
 import random
 import time
 from collections import OrderedDict
 
-from .exceptions import AbortedException
-
 # ------------------------------------------------------------------------------- #
 
 
@@ -70,9 +67,8 @@ class StealthMode:
         :param kwargs: Additional arguments for the request
         :return: Modified kwargs
         """
-        # Apply human-like delays between requests
-        if self.human_like_delays:
-            self._apply_human_like_delay()
+        # Human-like delays are scheduled by the pacer of the cloudscraper,
+        # see `human_like_delay`
 
         # Randomize headers to look more like a browser
         if self.randomize_headers:
@@ -90,29 +86,30 @@ class StealthMode:
 
     # ------------------------------------------------------------------------------- #
 
-    def _apply_human_like_delay(self):
+    def human_like_delay(self):
         """
-        Add a random delay between requests to mimic human behavior
+        Get a random delay between requests to mimic human behavior.
+        It is folded into the request schedule of the host instead of being slept here.
+
+        :return: Delay in seconds
         """
-        # Skip delay for the first request
-        if self.request_count > 0:
-            # Calculate a random delay
-            delay = random.uniform(self.min_delay, self.max_delay)
+        if not self.human_like_delays:
+            return 0.0
 
-            # Add some randomness to make it look more human, but cap it
-            if random.random() < 0.1:  # 10% chance of a longer pause
-                delay *= 1.5  # Reduced from 2x to 1.5x
+        # Calculate a random delay
+        delay = random.uniform(self.min_delay, self.max_delay)
 
-            # Cap maximum delay to prevent excessive waits
-            delay = min(delay, 10.0)  # Never wait more than 10 seconds
+        # Add some randomness to make it look more human, but cap it
+        if random.random() < 0.1:  # 10% chance of a longer pause
+            delay *= 1.5  # Reduced from 2x to 1.5x
 
-            # Skip delay if it would be too short to matter
-            if delay >= 0.1:
-                logging.debug(f"Applying human-like delay of {delay:.2f} seconds")
-                time.sleep(delay)
+        # Cap maximum delay to prevent excessive waits
+        delay = min(delay, 10.0)  # Never wait more than 10 seconds
 
-            if self.cloudscraper.signal.is_set():
-                raise AbortedException()
+        # Skip delay if it would be too short to matter
+        if delay < 0.1:
+            return 0.0
+        return delay
 
     # ------------------------------------------------------------------------------- #
 
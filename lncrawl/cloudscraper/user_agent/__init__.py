@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import random
@@ -10,6 +11,152 @@ from collections import OrderedDict
 # ------------------------------------------------------------------------------- #
 
 
+_browsers_data = None
+
+
+def _getBrowsersData():
+    global _browsers_data
+    if _browsers_data is None:
+        _browsers_data = _parseBrowsersData()
+    return _browsers_data
+
+
+def loadBrowsersData():
+    """
+    Get the parsed browsers.json. The file is parsed only once, and every call
+    returns a fresh copy, so the caller can modify it freely.
+    """
+    return copy.deepcopy(_getBrowsersData())
+
+
+def getCipherSuites(browser):
+    """
+    Get the available cipher suites of a browser without copying the whole browsers.json
+    """
+    return tuple(_getBrowsersData().get('cipherSuite', {}).get(browser, []))
+
+# ------------------------------------------------------------------------------- #
+
+
+def _parseBrowsersData():
+    try:
+        # Try to load from the normal location
+        browsers_json_path = os.path.join(os.path.dirname(__file__), 'browsers.json')
+        with open(browsers_json_path, 'r') as fp:
+            user_agents = json.load(
+                fp,
+                object_pairs_hook=OrderedDict
+            )
+    except (FileNotFoundError, IOError):
+        # Fallback for executable environments
+        try:
+            # Try alternative paths for executables
+            if getattr(sys, 'frozen', False):
+                # Running in a PyInstaller bundle
+                bundle_dir = sys._MEIPASS  # type:ignore
+                browsers_json_path = os.path.join(bundle_dir, 'cloudscraper', 'user_agent', 'browsers.json')
+            else:
+                # Try current directory
+                browsers_json_path = os.path.join(os.getcwd(), 'browsers.json')
+
+            with open(browsers_json_path, 'r') as fp:
+                user_agents = json.load(
+                    fp,
+                    object_pairs_hook=OrderedDict
+                )
+        except (FileNotFoundError, IOError):
+            # Ultimate fallback - use comprehensive hardcoded user agents
+            user_agents = {
+                "headers": {
+                    "chrome": {
+                        "User-Agent": None,
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+                        "Accept-Language": "en-US,en;q=0.9",
+                        "Accept-Encoding": "gzip, deflate, br"
+                    },
+                    "firefox": {
+                        "User-Agent": None,
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                        "Accept-Language": "en-US,en;q=0.5",
+                        "Accept-Encoding": "gzip, deflate, br"
+                    }
+                },
+                "cipherSuite": {
+                    "chrome": [
+                        "TLS_AES_128_GCM_SHA256",
+                        "TLS_AES_256_GCM_SHA384",
+                        "ECDHE-ECDSA-AES128-GCM-SHA256",
+                        "ECDHE-RSA-AES128-GCM-SHA256",
+                        "ECDHE-ECDSA-AES256-GCM-SHA384",
+                        "ECDHE-RSA-AES256-GCM-SHA384"
+                    ],
+                    "firefox": [
+                        "TLS_AES_128_GCM_SHA256",
+                        "TLS_CHACHA20_POLY1305_SHA256",
+                        "TLS_AES_256_GCM_SHA384",
+                        "ECDHE-ECDSA-AES128-GCM-SHA256",
+                        "ECDHE-RSA-AES128-GCM-SHA256",
+                        "ECDHE-ECDSA-AES256-GCM-SHA384"
+                    ]
+                },
+                "user_agents": {
+                    "desktop": {
+                        "windows": {
+                            "chrome": [
+                                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                                "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                            ],
+                            "firefox": [
+                                "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                                "Mozilla/5.0 (Windows NT 10.0; WOW64; rv:120.0) Gecko/20100101 Firefox/120.0"
+                            ]
+                        },
+                        "linux": {
+                            "chrome": [
+                                "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                                "Mozilla/5.0 (X11; Linux i686) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                            ],
+                            "firefox": [
+                                "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                                "Mozilla/5.0 (X11; Linux i686; rv:120.0) Gecko/20100101 Firefox/120.0"
+                            ]
+                        },
+                        "darwin": {
+                            "chrome": [
+                                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                            ],
+                            "firefox": [
+                                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0"
+                            ]
+                        }
+                    },
+                    "mobile": {
+                        "android": {
+                            "chrome": [
+                                "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
+                                "Mozilla/5.0 (Linux; Android 11; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
+                            ],
+                            "firefox": [
+                                "Mozilla/5.0 (Mobile; rv:120.0) Gecko/120.0 Firefox/120.0"
+                            ]
+                        },
+                        "ios": {
+                            "chrome": [
+                                "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/120.0.0.0 Mobile/15E148 Safari/604.1"
+                            ],
+                            "firefox": [
+                                "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/120.0.0.0 Mobile/15E148 Safari/605.1.15"
+                            ]
+                        }
+                    }
+                }
+            }
+
+    return user_agents
+
+# ------------------------------------------------------------------------------- #
+
+
 class User_Agent():
 
     # ------------------------------------------------------------------------------- #
@@ -71,118 +218,7 @@ class User_Agent():
             sys.tracebacklimit = 0
             raise RuntimeError("Sorry you can't have mobile and desktop disabled at the same time.")
 
-        try:
-            # Try to load from the normal location
-            browsers_json_path = os.path.join(os.path.dirname(__file__), 'browsers.json')
-            with open(browsers_json_path, 'r') as fp:
-                user_agents = json.load(
-                    fp,
-                    object_pairs_hook=OrderedDict
-                )
-        except (FileNotFoundError, IOError):
-            # Fallback for executable environments
-            try:
-                # Try alternative paths for executables
-                if getattr(sys, 'frozen', False):
-                    # Running in a PyInstaller bundle
-                    bundle_dir = sys._MEIPASS  # type:ignore
-                    browsers_json_path = os.path.join(bundle_dir, 'cloudscraper', 'user_agent', 'browsers.json')
-                else:
-                    # Try current directory
-                    browsers_json_path = os.path.join(os.getcwd(), 'browsers.json')
-
-                with open(browsers_json_path, 'r') as fp:
-                    user_agents = json.load(
-                        fp,
-                        object_pairs_hook=OrderedDict
-                    )
-            except (FileNotFoundError, IOError):
-                # Ultimate fallback - use comprehensive hardcoded user agents
-                user_agents = {
-                    "headers": {
-                        "chrome": {
-                            "User-Agent": None,
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                            "Accept-Language": "en-US,en;q=0.9",
-                            "Accept-Encoding": "gzip, deflate, br"
-                        },
-                        "firefox": {
-                            "User-Agent": None,
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                            "Accept-Language": "en-US,en;q=0.5",
-                            "Accept-Encoding": "gzip, deflate, br"
-                        }
-                    },
-                    "cipherSuite": {
-                        "chrome": [
-                            "TLS_AES_128_GCM_SHA256",
-                            "TLS_AES_256_GCM_SHA384",
-                            "ECDHE-ECDSA-AES128-GCM-SHA256",
-                            "ECDHE-RSA-AES128-GCM-SHA256",
-                            "ECDHE-ECDSA-AES256-GCM-SHA384",
-                            "ECDHE-RSA-AES256-GCM-SHA384"
-                        ],
-                        "firefox": [
-                            "TLS_AES_128_GCM_SHA256",
-                            "TLS_CHACHA20_POLY1305_SHA256",
-                            "TLS_AES_256_GCM_SHA384",
-                            "ECDHE-ECDSA-AES128-GCM-SHA256",
-                            "ECDHE-RSA-AES128-GCM-SHA256",
-                            "ECDHE-ECDSA-AES256-GCM-SHA384"
-                        ]
-                    },
-                    "user_agents": {
-                        "desktop": {
-                            "windows": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                                    "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
-                                    "Mozilla/5.0 (Windows NT 10.0; WOW64; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            },
-                            "linux": {
-                                "chrome": [
-                                    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                                    "Mozilla/5.0 (X11; Linux i686) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
-                                    "Mozilla/5.0 (X11; Linux i686; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            },
-                            "darwin": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            }
-                        },
-                        "mobile": {
-                            "android": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
-                                    "Mozilla/5.0 (Linux; Android 11; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Mobile; rv:120.0) Gecko/120.0 Firefox/120.0"
-                                ]
-                            },
-                            "ios": {
-                                "chrome": [
-                                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/120.0.0.0 Mobile/15E148 Safari/604.1"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/120.0.0.0 Mobile/15E148 Safari/605.1.15"
-                                ]
-                            }
-                        }
-                    }
-                }
+        user_agents = loadBrowsersData()
 
         if self.custom:
             if not self.tryMatchCustom(user_agents):
@@ -2,3 +2,10 @@ import os
 
 DEFAULT_OUTPUT_PATH = os.getenv('OUTPUT_PATH') or os.path.abspath("Lightnovels")
 META_FILE_NAME = "meta.json"
+META_JOURNAL_FILE_NAME = "meta.journal"
+
+HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH') or os.path.join(DEFAULT_OUTPUT_PATH, ".http_cache")
+HTTP_CACHE_SIZE = int(os.getenv('HTTP_CACHE_SIZE') or 512 * 1024 * 1024)  # in bytes
+
+IMAGE_CACHE_PATH = os.getenv('IMAGE_CACHE_PATH') or os.path.join(DEFAULT_OUTPUT_PATH, ".image_cache")
+IMAGE_CACHE_SIZE = int(os.getenv('IMAGE_CACHE_SIZE') or 1024 * 1024 * 1024)  # in bytes
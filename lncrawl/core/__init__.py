@@ -42,6 +42,8 @@ def start_app():
     from ..bots import run_bot
     from .arguments import get_args
     from .display import cancel_method, error_message
+    from .http_cache import get_response_cache
+    from .image_cache import get_image_cache
     from .proxy import load_proxies, start_proxy_fetcher, stop_proxy_fetcher
     from .sources import load_sources
 
@@ -59,6 +61,33 @@ def start_app():
         os.environ["use_proxy"] = "auto"
         start_proxy_fetcher()
 
+    if args.clear_cache:
+        cache = get_response_cache()
+        if cache:
+            cache.clear()
+        image_cache = get_image_cache()
+        if image_cache:
+            image_cache.clear()
+
+    if args.no_cache:
+        os.environ["no_http_cache"] = "yes"
+        os.environ["no_image_cache"] = "yes"
+
+    if args.parse_processes is not None:
+        os.environ["parse_processes"] = str(args.parse_processes or os.cpu_count() or 1)
+
+    if args.chapter_store:
+        os.environ["chapter_store"] = args.chapter_store
+
+    if args.chapter_compression:
+        os.environ["chapter_compression"] = args.chapter_compression
+
+    if args.image_profile:
+        os.environ["image_profile"] = args.image_profile
+
+    if args.image_processes is not None:
+        os.environ["image_processes"] = str(args.image_processes)
+
     try:
         bot = os.getenv("BOT", "").lower()
         run_bot(bot)
@@ -13,15 +13,19 @@ from .. import constants as C
 from ..binders import generate_books
 from ..core.exeptions import LNException
 from ..core.sources import crawler_list, prepare_crawler
-from ..models import Chapter, CombinedSearchResult, OutputFormat
+from ..models import (Chapter, CombinedSearchResult, MetaInfo, NovelUpdate,
+                      OutputFormat)
 from .browser import Browser
+from .chapter_store import LazyBooks, open_chapter_store
 from .crawler import Crawler
-from .download_chapters import fetch_chapter_body
+from .download_chapters import fetch_chapter_body, restore_chapter_body
 from .download_images import fetch_chapter_images
 from .exeptions import ScraperErrorGroup
-from .metadata import save_metadata
+from .metadata import MetadataJournal, load_metadata, save_metadata
 from .novel_info import format_novel
 from .novel_search import search_novels
+from .novel_update import (diff_chapters, finish_update,
+                           get_chapters_to_bind, get_updated_chapters)
 from .scraper import Scraper
 from .sources import rejected_sources
 
@@ -45,6 +49,8 @@ class App:
         self.generated_books: Dict[OutputFormat, List[str]] = {}
         self.generated_archives: Dict[OutputFormat, str] = {}
         self.archived_outputs: Optional[List[str]] = None
+        self.novel_update: Optional[NovelUpdate] = None
+        self.metadata_journal: Optional[MetadataJournal] = None
         self.good_file_name: str = ""
         self.no_suffix_after_filename = False
         self.search_progress: float = 0
@@ -93,6 +99,8 @@ class App:
         self.generated_books = {}
         self.generated_archives = {}
         self.archived_outputs = None
+        self.novel_update = None
+        self.metadata_journal = None
         logger.debug("DONE")
 
     def __enter__(self):
@@ -194,6 +202,37 @@ class App:
         self.prepare_novel_output_path()
         save_metadata(self)
 
+    def check_for_updates(self, meta: MetaInfo) -> NovelUpdate:
+        """Requires: metadata of a downloaded novel, login_data"""
+        """Produces: crawler, output_path, chapters, novel_update"""
+        load_metadata(self, meta)
+        if not isinstance(self.crawler, Crawler):
+            raise LNException("No crawler is selected")
+
+        if self.can_do("login") and self.login_data:
+            logger.debug("Login with %s", self.login_data)
+            self.crawler.login(*list(self.login_data))
+
+        self.fetch_novel_progress = 0
+        self.crawler.volumes = []
+        self.crawler.chapters = []
+        with self.crawler.bypass_http_cache():
+            self.crawler.read_novel_info()
+        format_novel(self.crawler)
+        self.fetch_novel_progress = 100
+
+        if not len(self.crawler.chapters):
+            raise Exception("No chapters found")
+
+        with open_chapter_store(self.output_path, self.pack_by_volume) as store:
+            self.novel_update, self.chapters = diff_chapters(meta, self.crawler, store)
+        self.fetch_chapter_progress = 0
+        self.fetch_images_progress = 0
+        self.binding_progress = 0
+        self.generated_archives = {}
+        save_metadata(self)
+        return self.novel_update
+
     def prepare_novel_output_path(self):
         assert self.crawler
 
@@ -252,7 +291,17 @@ class App:
         logger.info("Processing data for binding")
         assert self.crawler
 
-        data = {}
+        updated_chapters: List[Chapter] = []
+        if self.novel_update:
+            # rebind only the books affected by the update
+            updated_chapters = get_updated_chapters(self)
+            self.chapters = get_chapters_to_bind(self)
+            if not self.chapters:
+                finish_update(self, updated_chapters)
+                return
+            restore_chapter_body(self)
+
+        books: Dict[str, List[Chapter]] = {}
         if self.pack_by_volume:
             for vol in self.crawler.volumes:
                 # filename_suffix = 'Volume %d' % vol['id']
@@ -260,18 +309,31 @@ class App:
                     vol["start_chapter"],
                     vol["final_chapter"],
                 )
-                data[filename_suffix] = [
+                books[filename_suffix] = [
                     x
                     for x in self.chapters
-                    if x["volume"] == vol["id"] and len(x["body"]) > 0
+                    if x["volume"] == vol["id"]
                 ]
         else:
             first_id = self.chapters[0]["id"]
             last_id = self.chapters[-1]["id"]
-            data[f"c{first_id}-{last_id}"] = self.chapters
-
-        for fmt in generate_books(self, data):
-            save_metadata(self)
-            if signal.is_set():
-                break
-            yield fmt, self.generated_archives[fmt]
+            books[f"c{first_id}-{last_id}"] = list(self.chapters)
+
+        # the books may include the metadata file
+        save_metadata(self, compact=True)
+
+        # the chapter bodies are read from the store one book at a time
+        with open_chapter_store(self.output_path, self.pack_by_volume) as store:
+            data = LazyBooks(store, books)
+            try:
+                for fmt in generate_books(self, data):
+                    data.release()
+                    save_metadata(self)
+                    if signal.is_set():
+                        break
+                    yield fmt, self.generated_archives[fmt]
+            finally:
+                data.release()
+
+        if updated_chapters and not signal.is_set():
+            finish_update(self, updated_chapters)
@@ -241,6 +241,50 @@ _builder = Args(
             default=False,
             help="Use some free proxies from https://free-proxy-list.net/",
         ),
+        Args(
+            "--no-cache",
+            action="store_true",
+            default=False,
+            help="Bypass the http response and image caches.",
+        ),
+        Args(
+            "--clear-cache",
+            action="store_true",
+            default=False,
+            help="Remove all responses from the http cache, and all images from the image cache.",
+        ),
+        Args(
+            "--parse-processes",
+            type=int,
+            nargs="?",
+            const=0,
+            metavar="N",
+            help="Parse and clean the chapters in N worker processes. Default: number of CPUs.",
+        ),
+        Args(
+            "--chapter-store",
+            type=str,
+            choices=["json", "sqlite"],
+            help="Save the chapters as json files or in a single SQLite file. Default: json, unless the novel is saved in SQLite.",
+        ),
+        Args(
+            "--chapter-compression",
+            type=str,
+            choices=["zlib", "zstd"],
+            help="Compression of the chapters in the SQLite store. Default: zlib.",
+        ),
+        Args(
+            "--image-profile",
+            type=str,
+            choices=["original", "kindle", "kobo", "tablet"],
+            help="Shrink the images to fit the screen of a reader. Default: original.",
+        ),
+        Args(
+            "--image-processes",
+            type=int,
+            metavar="N",
+            help="Convert the images in N worker processes, or in the download threads if 0. Default: 0.",
+        ),
         Args(
             '-b', "--bot",
             type=str,
@@ -310,6 +354,14 @@ _builder = Args(
             metavar="NAME/URL",
             help="Resume download of a novel containing in " + C.DEFAULT_OUTPUT_PATH,
         ),
+        Args(
+            "--update",
+            dest="update",
+            nargs="?",
+            default=argparse.SUPPRESS,
+            metavar="PATH",
+            help="Download only the new chapters of a novel containing in " + C.DEFAULT_OUTPUT_PATH,
+        ),
         Args(
             "extra",
             type=parse_qs,
@@ -0,0 +1,60 @@
+"""
+Helpers for the asyncio backend of the Scraper using httpx
+"""
+
+import logging
+from http.cookiejar import CookieJar
+from typing import Any, Dict
+
+from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
+
+from .exeptions import LNException
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # type:ignore
+
+logger = logging.getLogger(__name__)
+
+
+def create_async_client(cookies: CookieJar, http2: bool = False) -> "httpx.AsyncClient":
+    """Create a new async client sharing the cookie jar with the sync session"""
+    if httpx is None:
+        raise LNException("Please install httpx to use the async scraper")
+    return httpx.AsyncClient(
+        cookies=cookies,
+        http2=http2,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=100,
+        ),
+    )
+
+
+def prepare_async_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert keyword arguments of `requests` to the ones of `httpx`"""
+    kwargs = dict(kwargs)
+    kwargs.pop("proxies", None)
+    if "allow_redirects" in kwargs:
+        kwargs["follow_redirects"] = kwargs.pop("allow_redirects")
+    if isinstance(kwargs.get("data"), (str, bytes)):
+        kwargs["content"] = kwargs.pop("data")
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+    return kwargs
+
+
+def to_request_exception(error: Exception) -> RequestException:
+    """Convert a httpx error to the matching `requests` exception,
+    so that the existing error handlers keep working"""
+    if isinstance(error, httpx.TimeoutException):
+        return Timeout(str(error))
+    if isinstance(error, httpx.HTTPStatusError):
+        return HTTPError(str(error), response=error.response)
+    if isinstance(error, httpx.TransportError):
+        return ConnectionError(str(error))
+    return RequestException(str(error))
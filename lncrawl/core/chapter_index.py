@@ -0,0 +1,59 @@
+"""
+Lookup tables of the chapters of a novel
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from ..models import Chapter, Volume
+
+
+def normalize_chapter_url(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+class ChapterIndex(object):
+    """Finds the chapters by url, by id and by volume without scanning them.
+
+    The index is a snapshot of the lists it was built from. Use `is_valid_for`
+    to check if the lists were replaced or resized since then.
+
+    Args:
+    - chapters (List[Chapter]): The chapters of the novel.
+    - volumes (List[Volume]): The volumes of the novel.
+    """
+
+    def __init__(self, chapters: List[Chapter], volumes: List[Volume]) -> None:
+        self._key = self.make_key(chapters, volumes)
+        self.chapters = chapters
+        self.by_url: Dict[str, Chapter] = {}
+        self.by_id: Dict[int, Chapter] = {}
+        self.by_volume: Dict[int, List[Chapter]] = {}
+        for chapter in chapters:
+            url = chapter.get("url")
+            if url:
+                self.by_url.setdefault(normalize_chapter_url(url), chapter)
+            self.by_id.setdefault(chapter["id"], chapter)
+            self.by_volume.setdefault(chapter.get("volume"), []).append(chapter)
+
+    @staticmethod
+    def make_key(chapters: List[Chapter], volumes: List[Volume]) -> Tuple:
+        return (id(chapters), len(chapters), id(volumes), len(volumes))
+
+    def is_valid_for(self, chapters: List[Chapter], volumes: List[Volume]) -> bool:
+        return self._key == self.make_key(chapters, volumes)
+
+    def find_by_url(self, url: str) -> Optional[Chapter]:
+        return self.by_url.get(normalize_chapter_url(url))
+
+    def find_by_id(self, chapter_id: int) -> Optional[Chapter]:
+        return self.by_id.get(chapter_id)
+
+    def volume_chapters(self, volume_id: int) -> List[Chapter]:
+        return self.by_volume.get(volume_id, [])
+
+    def volume_range(self, volume_id: int) -> Tuple[int, int]:
+        """The first and the last chapter id of a volume, or (0, 0) if it is empty"""
+        chapters = self.by_volume.get(volume_id)
+        if not chapters:
+            return (0, 0)
+        return (chapters[0]["id"], chapters[-1]["id"])
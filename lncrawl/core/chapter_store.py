@@ -0,0 +1,425 @@
+"""
+Storage of the downloaded chapters
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models import Chapter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type:ignore
+
+logger = logging.getLogger(__name__)
+
+JSON_STORE = "json"
+SQLITE_STORE = "sqlite"
+SQLITE_FILE_NAME = "chapters.db"
+ZSTD_LEVEL = 9
+
+# codec name => (encode, decode) of the stored chapters
+_codecs: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "": (bytes, bytes),
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard:
+    _codecs["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+def get_chapter_file(
+    chapter: Chapter,
+    output_path: str,
+    pack_by_volume: bool,
+) -> Path:
+    dir_name = Path(output_path) / "json"
+    if pack_by_volume:
+        vol_name = "Volume " + str(chapter.volume).rjust(2, "0")
+        dir_name = dir_name / vol_name
+
+    chapter_name = str(chapter.id).rjust(5, "0")
+    json_file = dir_name / (chapter_name + ".json")
+    return json_file
+
+
+def chapter_store_type(output_path: str) -> str:
+    """The store to use for the novel in the output path.
+    It is selected by the `chapter_store` environment variable, otherwise
+    the SQLite store is used only if the novel was saved in one before."""
+    store_type = os.getenv("chapter_store")
+    if store_type:
+        return store_type
+    if (Path(output_path) / SQLITE_FILE_NAME).is_file():
+        return SQLITE_STORE
+    return JSON_STORE
+
+
+class ChapterStore(object):
+    """Saves the chapters of a novel and reads them back by chapter.
+
+    Args:
+    - output_path (str): Output path of the novel.
+    - pack_by_volume (bool, optional): Keep the chapters of each volume together. Default: False.
+    """
+
+    def __init__(self, output_path: str, pack_by_volume: bool = False) -> None:
+        self.output_path = output_path
+        self.pack_by_volume = pack_by_volume
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def get(self, chapter: Chapter) -> Optional[Dict[str, Any]]:
+        """Read the saved content of a chapter, or None if it was not saved"""
+        raise NotImplementedError()
+
+    def get_many(self, chapters: Iterable[Chapter]) -> Dict[int, Dict[str, Any]]:
+        """Read the saved content of the chapters, by the chapter id"""
+        result: Dict[int, Dict[str, Any]] = {}
+        for chapter in chapters:
+            content = self.get(chapter)
+            if content:
+                result[chapter.id] = content
+        return result
+
+    def put(self, chapter: Chapter) -> None:
+        """Save a chapter. The write may be delayed until `flush`."""
+        raise NotImplementedError()
+
+    def flush(self) -> None:
+        """Write the pending chapters"""
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonChapterStore(ChapterStore):
+    """Saves every chapter into its own json file"""
+
+    def get(self, chapter: Chapter) -> Optional[Dict[str, Any]]:
+        file_name = get_chapter_file(chapter, self.output_path, self.pack_by_volume)
+        if not file_name.is_file():
+            return None
+        try:
+            with open(file_name, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except json.JSONDecodeError:
+            logger.debug("Unable to decode JSON from the file: %s" % file_name)
+        except Exception as e:
+            logger.exception("An error occurred while reading the file: %s", e)
+        return None
+
+    def put(self, chapter: Chapter) -> None:
+        file_name = get_chapter_file(chapter, self.output_path, self.pack_by_volume)
+        file_name.parent.mkdir(parents=True, exist_ok=True)
+        with file_name.open("w", encoding="utf-8") as fp:
+            json.dump(chapter, fp, ensure_ascii=False)
+
+
+class SqliteChapterStore(ChapterStore):
+    """Saves all chapters into a single SQLite database in the output path.
+
+    The chapters are written in batches and compressed, and any chapter
+    can be read by its id without scanning the others.
+
+    With the zstd codec, a dictionary is trained on the first chapters of
+    the novel and saved in the database. The chapters of a novel share most
+    of their markup, so the dictionary makes the small documents compress
+    far better than they do alone. Every chapter records its codec, so the
+    chapters saved with any codec can be read back.
+
+    Args:
+    - output_path (str): Output path of the novel.
+    - pack_by_volume (bool, optional): Not used, the chapters are read by id. Default: False.
+    - codec (str, optional): Compression of the chapters: zlib or zstd. Default: zlib.
+    - batch_size (int, optional): Number of chapters to write at once. Default: 50.
+    - dict_samples (int, optional): Number of chapters to train the zstd dictionary on. Default: 32.
+    - dict_size (int, optional): Maximum size of the zstd dictionary in bytes. Default: 64KB.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        pack_by_volume: bool = False,
+        codec: str = "zlib",
+        batch_size: int = 50,
+        dict_samples: int = 32,
+        dict_size: int = 64 * 1024,
+    ) -> None:
+        super().__init__(output_path, pack_by_volume)
+        if codec == "zstd" and not zstandard:
+            logger.warning("Please install zstandard to use zstd. Using zlib instead.")
+            codec = "zlib"
+        if codec not in _codecs:
+            raise ValueError("Unknown codec: %s" % codec)
+        self.codec = codec
+        self.batch_size = batch_size
+        self.dict_samples = dict_samples
+        self.dict_size = dict_size
+        self._lock = Lock()
+        self._pending: Dict[int, Tuple[int, Optional[int], str, bytes]] = {}
+
+        db_file = Path(output_path) / SQLITE_FILE_NAME
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_file), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chapters ("
+            "id INTEGER PRIMARY KEY, "
+            "volume INTEGER, "
+            "codec TEXT NOT NULL, "
+            "data BLOB NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dictionaries ("
+            "id INTEGER PRIMARY KEY, "
+            "data BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+        # zstd compressor with the latest dictionary, and the decompressors by dictionary id
+        self._zstd_lock = Lock()
+        self._zstd_dict_id: Optional[int] = None
+        self._zstd_samples: Optional[Dict[int, Tuple[Optional[int], bytes]]] = None
+        self._zstd_compressor = None
+        self._zstd_decompressors: Dict[int, Any] = {}
+        if self.codec == "zstd":
+            self._load_zstd_dictionary()
+
+    def _load_zstd_dictionary(self) -> None:
+        row = self._db.execute(
+            "SELECT id, data FROM dictionaries ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row:
+            self._use_zstd_dictionary(row[0], zstandard.ZstdCompressionDict(row[1]))
+        else:
+            self._zstd_samples = {}
+            self._zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    def _use_zstd_dictionary(self, dict_id: int, zstd_dict) -> None:
+        self._zstd_dict_id = dict_id
+        self._zstd_samples = None
+        self._zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zstd_dict)
+        self._zstd_decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+
+    def _train_zstd_dictionary(self) -> None:
+        assert self._zstd_samples is not None
+        samples = self._zstd_samples
+        self._zstd_samples = None
+        try:
+            size = min(self.dict_size, sum(len(data) for _, data in samples.values()) // 10)
+            zstd_dict = zstandard.train_dictionary(size, [data for _, data in samples.values()])
+        except zstandard.ZstdError as e:
+            logger.debug("Unable to train the zstd dictionary: %s", e)
+            return
+
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO dictionaries (data) VALUES (?)",
+                (zstd_dict.as_bytes(),),
+            )
+            self._db.commit()
+        self._use_zstd_dictionary(int(cursor.lastrowid or 0), zstd_dict)
+        logger.info("Trained a zstd dictionary of %d bytes", len(zstd_dict))
+
+        # compress the sample chapters again with the dictionary
+        codec = "zstd:%d" % self._zstd_dict_id
+        with self._lock:
+            for chapter_id, (volume, data) in samples.items():
+                self._pending[chapter_id] = (
+                    chapter_id,
+                    volume,
+                    codec,
+                    self._zstd_compressor.compress(data),
+                )
+
+    def _encode(self, chapter: Chapter) -> Tuple[int, Optional[int], str, bytes]:
+        data = json.dumps(chapter, ensure_ascii=False).encode("utf-8")
+        if self.codec != "zstd":
+            encode, _ = _codecs[self.codec]
+            return chapter.id, chapter.volume, self.codec, encode(data)
+
+        with self._zstd_lock:
+            if self._zstd_samples is not None:
+                self._zstd_samples[chapter.id] = (chapter.volume, data)
+                if len(self._zstd_samples) >= self.dict_samples:
+                    self._train_zstd_dictionary()
+            codec = "zstd"
+            if self._zstd_dict_id is not None:
+                codec = "zstd:%d" % self._zstd_dict_id
+            return chapter.id, chapter.volume, codec, self._zstd_compressor.compress(data)
+
+    def _decode(self, codec: str, data: bytes) -> Dict[str, Any]:
+        if codec.startswith("zstd:"):
+            dict_id = int(codec[5:])
+            decompressor = self._zstd_decompressors.get(dict_id)
+            if decompressor is None:
+                row = self._db.execute(
+                    "SELECT data FROM dictionaries WHERE id = ?", (dict_id,)
+                ).fetchone()
+                zstd_dict = zstandard.ZstdCompressionDict(row[0])
+                decompressor = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+                self._zstd_decompressors[dict_id] = decompressor
+            return json.loads(decompressor.decompress(data).decode("utf-8"))
+        _, decode = _codecs[codec]
+        return json.loads(decode(data).decode("utf-8"))
+
+    def get(self, chapter: Chapter) -> Optional[Dict[str, Any]]:
+        return self.get_many([chapter]).get(chapter.id)
+
+    def get_many(self, chapters: Iterable[Chapter]) -> Dict[int, Dict[str, Any]]:
+        self.flush()
+        ids = [chapter.id for chapter in chapters]
+        result: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            # stay below the limit of variables in a query
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                rows = self._db.execute(
+                    "SELECT id, codec, data FROM chapters WHERE id IN (%s)"
+                    % ",".join("?" * len(batch)),
+                    batch,
+                )
+                for chapter_id, codec, data in rows:
+                    try:
+                        result[chapter_id] = self._decode(codec, data)
+                    except Exception as e:
+                        logger.debug("Unable to decode chapter %d: %s", chapter_id, e)
+        return result
+
+    def put(self, chapter: Chapter) -> None:
+        row = self._encode(chapter)
+        with self._lock:
+            self._pending[chapter.id] = row
+            if len(self._pending) < self.batch_size:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chapters (id, volume, codec, data) VALUES (?, ?, ?, ?)",
+                list(self._pending.values()),
+            )
+            self._db.commit()
+            self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def import_json_files(self) -> int:
+        """Move the chapters saved by `JsonChapterStore` into the database.
+        The json files are removed after they are imported."""
+        json_dir = Path(self.output_path) / "json"
+        if not json_dir.is_dir():
+            return 0
+
+        imported = []
+        for file_name in json_dir.glob("**/*.json"):
+            try:
+                with open(file_name, "r", encoding="utf-8") as file:
+                    self.put(Chapter(**json.load(file)))
+                imported.append(file_name)
+            except Exception as e:
+                logger.debug("Unable to import the file: %s | %s", file_name, e)
+        self.flush()
+
+        for file_name in imported:
+            file_name.unlink()
+        for dir_name in sorted(json_dir.glob("**/"), reverse=True):
+            try:
+                dir_name.rmdir()
+            except OSError:
+                pass  # not empty
+
+        if imported:
+            logger.info("Imported %d chapters into %s", len(imported), SQLITE_FILE_NAME)
+        return len(imported)
+
+
+def open_chapter_store(output_path: str, pack_by_volume: bool = False) -> ChapterStore:
+    """Open the store of the novel in the output path. The chapters
+    saved as json files are moved into the SQLite store when it is used."""
+    store_type = chapter_store_type(output_path)
+    if store_type == SQLITE_STORE:
+        codec = os.getenv("chapter_compression") or "zlib"
+        store = SqliteChapterStore(output_path, pack_by_volume, codec)
+        store.import_json_files()
+        return store
+    return JsonChapterStore(output_path, pack_by_volume)
+
+
+class LazyBooks(dict):
+    """The chapters of the books to bind, by the name of the book.
+
+    The chapter bodies are read from the store when a book is accessed,
+    and released when another book is accessed, so that only one book
+    is kept in memory while binding. The chapters without a body are
+    left out of the book.
+
+    Args:
+    - store (ChapterStore): The store of the chapters.
+    - books (dict): The chapters by the name of the book.
+    """
+
+    def __init__(self, store: ChapterStore, books: Dict[str, List[Chapter]]) -> None:
+        super().__init__(books)
+        self.store = store
+        self._loaded: Set[int] = set()
+        self._current: Optional[str] = None
+
+    def __getitem__(self, name: str) -> List[Chapter]:
+        chapters = super().__getitem__(name)
+        if self._current != name:
+            self.release()
+            self._load(chapters)
+            self._current = name
+        return chapters
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self else default
+
+    def items(self):  # type:ignore
+        for name in self:
+            yield name, self[name]
+
+    def values(self):  # type:ignore
+        for name in self:
+            yield self[name]
+
+    def _load(self, chapters: List[Chapter]) -> None:
+        unloaded = [x for x in chapters if x.body is None]
+        saved_chapters = self.store.get_many(unloaded)
+        for chapter in unloaded:
+            content = saved_chapters.get(chapter.id)
+            if content and content.get("body"):
+                chapter.body = content["body"]
+                self._loaded.add(chapter.id)
+        chapters[:] = [x for x in chapters if x.body]
+
+    def release(self) -> None:
+        """Drop the bodies read by the last accessed book"""
+        if self._current is None:
+            return
+        for chapter in super().__getitem__(self._current):
+            if chapter.id in self._loaded:
+                chapter.body = None
+        self._loaded.clear()
+        self._current = None
@@ -0,0 +1,217 @@
+"""
+Resolves the character encoding of the downloaded pages
+"""
+
+import codecs
+import logging
+import re
+from threading import Lock
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None  # type:ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "utf-8"
+
+# bytes of the content that are checked or given to the detector
+SAMPLE_SIZE = 64 * 1024
+
+# a declared encoding is used if at most 1 in this many characters is invalid
+MAX_ERROR_RATIO = 200
+
+# the browsers only look for the meta tag in the first bytes of the page
+META_SCAN_SIZE = 4096
+
+# the labels the browsers read as a wider encoding than their names say
+ENCODING_ALIASES = {
+    "ascii": "windows-1252",
+    "us-ascii": "windows-1252",
+    "latin1": "windows-1252",
+    "latin-1": "windows-1252",
+    "iso-8859-1": "windows-1252",
+    "iso8859-1": "windows-1252",
+    "gb2312": "gbk",
+    "x-gbk": "gbk",
+    "x-sjis": "shift_jis",
+    "sjis": "shift_jis",
+    "ks_c_5601-1987": "euc-kr",
+    "utf8": "utf-8",
+}
+
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_charset_re = re.compile(rb"charset\s*=\s*[\"']?\s*([a-zA-Z0-9_.:-]+)", re.I)
+_meta_re = re.compile(rb"<meta\b[^>]*?charset[^>]*>", re.I)
+_content_type_re = re.compile(r"charset\s*=\s*[\"']?\s*([a-zA-Z0-9_.:-]+)", re.I)
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Get the encoding of a label, or None if python can not decode it"""
+    if not label:
+        return None
+    label = label.strip().lower()
+    label = ENCODING_ALIASES.get(label, label)
+    try:
+        codecs.lookup(label)
+    except LookupError:
+        return None
+    return label
+
+
+def is_decodable(content: bytes, encoding: str) -> bool:
+    """Check if the start of the content is valid in the encoding"""
+    decoder = codecs.getincrementaldecoder(encoding)("strict")
+    try:
+        # not final, as the sample may end in the middle of a character
+        decoder.decode(content[:SAMPLE_SIZE], final=len(content) <= SAMPLE_SIZE)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def is_mostly_decodable(content: bytes, encoding: str) -> bool:
+    """Check if the start of the content is valid in the encoding, except a few
+    invalid bytes, which the pages declaring the encoding have now and then"""
+    try:
+        text = content[:SAMPLE_SIZE].decode(encoding, "replace")
+    except LookupError:
+        return False
+    return text.count("\ufffd") <= max(8, len(text) // MAX_ERROR_RATIO)
+
+
+def looks_like_utf8(content: bytes) -> bool:
+    """Check if the content has non-ascii characters, and all are valid utf-8.
+    The text in other encodings is very unlikely to be valid utf-8 as well."""
+    sample = content[:SAMPLE_SIZE]
+    return not sample.isascii() and is_decodable(sample, DEFAULT_ENCODING)
+
+
+def encoding_from_headers(headers: Optional[Mapping]) -> Optional[str]:
+    """Get the charset of the content-type header, if it is given explicitly"""
+    if not headers:
+        return None
+    content_type = headers.get("content-type") or headers.get("Content-Type")
+    match = _content_type_re.search(content_type or "")
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def is_json_content(headers: Optional[Mapping]) -> bool:
+    """Check if the content-type header is json, e.g. application/json or application/ld+json"""
+    if not headers:
+        return False
+    content_type = headers.get("content-type") or headers.get("Content-Type") or ""
+    return "json" in content_type.split(";")[0].lower()
+
+
+def encoding_from_meta(content: bytes) -> Optional[str]:
+    """Get the charset declared by a meta tag near the start of the page"""
+    for meta in _meta_re.finditer(content[:META_SCAN_SIZE]):
+        match = _charset_re.search(meta.group(0))
+        if match:
+            encoding = normalize_encoding(match.group(1).decode("ascii"))
+            if encoding:
+                return encoding
+    return None
+
+
+def detect_encoding(content: bytes) -> Optional[str]:
+    """Guess the encoding of the content by its bytes"""
+    for bom, encoding in BOM_ENCODINGS:
+        if content.startswith(bom):
+            return encoding
+    if is_decodable(content, DEFAULT_ENCODING):
+        return DEFAULT_ENCODING
+    if from_bytes is None:
+        return None
+    match = from_bytes(content[:SAMPLE_SIZE]).best()
+    return normalize_encoding(match.encoding) if match else None
+
+
+class CharsetResolver(object):
+    """Resolves the encoding of the pages from the content-type header, then the
+    meta tag, then by detecting it from the bytes. A declared encoding is used
+    only if it decodes the page, and valid utf-8 text is always read as utf-8.
+
+    The encoding that decodes a page of a host is remembered for the host, and
+    used for its pages that do not declare one, instead of detecting it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._hosts: Dict[str, str] = {}
+
+    def get_host_encoding(self, url: Optional[str]) -> Optional[str]:
+        host = urlparse(url).hostname if url else None
+        if not host:
+            return None
+        with self._lock:
+            return self._hosts.get(host)
+
+    def set_host_encoding(self, url: Optional[str], encoding: str) -> None:
+        host = urlparse(url).hostname if url else None
+        if not host:
+            return
+        with self._lock:
+            if self._hosts.get(host) != encoding:
+                logger.debug("Using %s encoding for %s", encoding, host)
+                self._hosts[host] = encoding
+
+    def response_encoding(self, headers: Optional[Mapping], url: Optional[str] = None) -> str:
+        """Get the encoding of the response text, without reading its content.
+        The encoding of the host is used only for the pages not declaring one,
+        and never for json, which is utf-8 unless declared otherwise."""
+        encoding = encoding_from_headers(headers)
+        if not encoding and not is_json_content(headers):
+            encoding = self.get_host_encoding(url)
+        return encoding or DEFAULT_ENCODING
+
+    def resolve(
+        self,
+        content: bytes,
+        headers: Optional[Mapping] = None,
+        url: Optional[str] = None,
+    ) -> str:
+        """Get the encoding of the content
+
+        Args:
+        - content (bytes): The downloaded content.
+        - headers (Mapping, optional): The response headers.
+        - url (str, optional): The url of the response, to use the encoding of its host.
+        """
+        if looks_like_utf8(content):
+            # the servers declaring latin-1 for utf-8 pages are common
+            self.set_host_encoding(url, DEFAULT_ENCODING)
+            return DEFAULT_ENCODING
+
+        declared = [
+            encoding_from_headers(headers),
+            encoding_from_meta(content),
+            self.get_host_encoding(url),
+        ]
+        for encoding in declared:
+            if encoding and is_mostly_decodable(content, encoding):
+                self.set_host_encoding(url, encoding)
+                return encoding
+
+        encoding = detect_encoding(content)
+        if encoding:
+            self.set_host_encoding(url, encoding)
+            return encoding
+        return DEFAULT_ENCODING
+
+
+_resolver = CharsetResolver()
+
+
+def get_charset_resolver() -> CharsetResolver:
+    """Get the process-wide resolver, sharing the encodings of the hosts"""
+    return _resolver
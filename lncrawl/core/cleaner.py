@@ -1,29 +1,183 @@
+import hashlib
 import itertools
 import re
 import sys
 import unicodedata
-from typing import Any, Dict, List, Set, Union
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Set, Tuple,
+                    Union)
 
+import soupsieve
 from bs4 import Comment, Tag
 
+from .lxml_soup import LxmlTag, css_to_xpath
 
-class TextCleaner:
-    def __init__(self) -> None:
-        self.line_separator = "<br>"
-        self.invisible_chars = [
-            code
-            for code in range(sys.maxunicode)
-            if unicodedata.category(chr(code)) in {"Cf", "Cc"}
-        ]
-        self.unprintable_chars = itertools.chain(
+
+class ImageCollector:
+    """Rewrites the images of a chapter to the local files while it is cleaned.
+
+    Args:
+    - resolve_url (Callable[[str], str]): Returns the absolute url of an image source.
+    - known_images (Dict[str, str], optional): The images rewritten before, to keep them as they are.
+    """
+
+    def __init__(
+        self,
+        resolve_url: Callable[[str], str],
+        known_images: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.resolve_url = resolve_url
+        self.known_images = known_images or {}
+        # filename -> url of the images to download
+        self.images: Dict[str, str] = {}
+        # number of <img> tags kept by the cleaner
+        self.tag_count = 0
+
+    def add(self, tag: Tag) -> None:
+        self.tag_count += 1
+        src = str(tag["src"])
+        filename = tag.get("alt")
+        if filename in self.known_images and src == f"images/{filename}":
+            self.images[filename] = self.known_images[filename]
+            return
+        full_url = self.resolve_url(src)
+        if not full_url.startswith("http"):
+            return
+        filename = hashlib.md5(full_url.encode()).hexdigest() + ".jpg"
+        tag.attrs = {"src": "images/" + filename, "alt": filename}
+        self.images[filename] = full_url
+
+    def is_complete(self, body: Optional[str]) -> bool:
+        """True if every image of the body was seen by this collector"""
+        return bool(body) and str(body).count("<img") == self.tag_count
+
+
+# the collector of the chapter being cleaned in the current thread or task
+image_collector: ContextVar[Optional[ImageCollector]] = ContextVar(
+    "image_collector", default=None
+)
+
+
+@lru_cache(maxsize=None)
+def get_invisible_chars() -> Tuple[int, ...]:
+    """The format and control characters of the unicode database. It takes a while
+    to build, so it is built once per process when it is first needed."""
+    return tuple(
+        code
+        for code in range(sys.maxunicode)
+        if unicodedata.category(chr(code)) in {"Cf", "Cc"}
+    )
+
+
+@lru_cache(maxsize=None)
+def get_nonprintable_mapping() -> Dict[int, None]:
+    """The default translation table to remove the unprintable characters.
+    Do not modify it, as it is shared by all cleaners."""
+    return dict.fromkeys(
+        itertools.chain(
             range(0x00, 0x20),
             range(0x7F, 0xA0),
-            self.invisible_chars,
+            get_invisible_chars(),
         )
-        self.nonprintable_mapping = {
-            character: None
-            for character in self.unprintable_chars
-        }
+    )
+
+
+def _tracked(cls: type, methods: Iterable[str]) -> type:
+    """Make a container class that calls `on_change` after each change"""
+
+    def wrap(name: str) -> Callable:
+        method = getattr(cls, name)
+
+        def changed(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            self.on_change()
+            return result
+
+        return changed
+
+    def init(self, value: Iterable, on_change: Callable[[], None]) -> None:
+        cls.__init__(self, value)
+        self.on_change = on_change
+
+    def reduce(self):
+        # copied and pickled as the plain container
+        return (cls, (cls(self),))
+
+    body: Dict[str, Any] = {name: wrap(name) for name in methods}
+    body.update(__init__=init, __reduce__=reduce)
+    return type(f"Tracked{cls.__name__.title()}", (cls,), body)
+
+
+TrackedSet = _tracked(
+    set,
+    [
+        "add",
+        "clear",
+        "difference_update",
+        "discard",
+        "intersection_update",
+        "pop",
+        "remove",
+        "symmetric_difference_update",
+        "update",
+        "__iand__",
+        "__ior__",
+        "__isub__",
+        "__ixor__",
+    ],
+)
+TrackedDict = _tracked(
+    dict,
+    [
+        "clear",
+        "pop",
+        "popitem",
+        "setdefault",
+        "update",
+        "__delitem__",
+        "__ior__",
+        "__setitem__",
+    ],
+)
+
+
+class TextCleaner:
+    # the settings the rules are compiled from. they are kept in tracked
+    # containers to compile the rules again when they are changed. a list
+    # inside `bad_tag_text_pairs` is not tracked, so set its item again
+    # after changing it in place.
+    RULES_ATTRIBUTES = frozenset(
+        [
+            "bad_tags",
+            "bad_css",
+            "bad_tag_text_pairs",
+            "bad_text_regex",
+            "substitutions",
+        ]
+    )
+    # the settings to recreate the cleaner in another process
+    CONFIG_ATTRIBUTES = (
+        "line_separator",
+        "bad_text_regex",
+        "bad_tag_text_pairs",
+        "bad_tags",
+        "bad_css",
+        "p_block_tags",
+        "unchanged_tags",
+        "plain_text_tags",
+        "substitutions",
+        "whitelist_attributes",
+        "whitelist_css_property",
+        "image_src_attributes",
+    )
+
+    def __init__(self) -> None:
+        self.line_separator = "<br>"
+        # the control characters are shared by all cleaners, see `nonprintable_mapping`
+        self._invisible_chars: Optional[List[int]] = None
+        self._nonprintable_mapping: Optional[Dict[int, None]] = None
+        self._rules: Optional[CleanerRules] = None
 
         self.bad_text_regex: Set[Union[str, re.Pattern[str]]] = set(
             [
@@ -150,60 +304,135 @@ class TextCleaner:
             "src",
         }
 
+    @property
+    def invisible_chars(self) -> List[int]:
+        if self._invisible_chars is None:
+            self._invisible_chars = list(get_invisible_chars())
+        return self._invisible_chars
+
+    @invisible_chars.setter
+    def invisible_chars(self, value: List[int]) -> None:
+        self._invisible_chars = value
+        self._nonprintable_mapping = None
+
+    @property
+    def unprintable_chars(self) -> Iterable[int]:
+        return itertools.chain(
+            range(0x00, 0x20),
+            range(0x7F, 0xA0),
+            self.invisible_chars,
+        )
+
+    @property
+    def nonprintable_mapping(self) -> Dict[int, None]:
+        if self._nonprintable_mapping is None:
+            if self._invisible_chars is None:
+                self._nonprintable_mapping = dict(get_nonprintable_mapping())
+            else:
+                self._nonprintable_mapping = dict.fromkeys(self.unprintable_chars)
+        return self._nonprintable_mapping
+
+    @nonprintable_mapping.setter
+    def nonprintable_mapping(self, value: Dict[int, None]) -> None:
+        self._nonprintable_mapping = value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.RULES_ATTRIBUTES:
+            tracked = TrackedDict if isinstance(value, dict) else TrackedSet
+            value = tracked(value, self._forget_rules)
+            self._forget_rules()
+        super().__setattr__(name, value)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # a copied cleaner tracks its own settings
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _forget_rules(self) -> None:
+        self.__dict__["_rules"] = None
+
+    def get_config(self) -> Dict[str, Any]:
+        """Get the settings of the cleaner, to be used in `from_config`"""
+        return {name: getattr(self, name) for name in self.CONFIG_ATTRIBUTES}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TextCleaner":
+        """Create a cleaner with the settings returned by `get_config`"""
+        cleaner = cls()
+        for name, value in config.items():
+            setattr(cleaner, name, value)
+        return cleaner
+
+    @property
+    def rules(self) -> "CleanerRules":
+        """The rules compiled from the current settings. They are compiled
+        again only when the settings are changed."""
+        if self._rules is None:
+            self._rules = CleanerRules(self)
+        return self._rules
+
     def extract_contents(self, tag) -> str:
-        self.clean_contents(tag)
-        body = self.extract_paragraphs(tag)
+        rules = self.rules
+        self._clean_contents(tag, rules)
+        body = self._extract_paragraphs(tag, rules)
         paragraphs = " ".join(body).split(self.line_separator)
         return "".join(
             [
                 f"<p>{p.strip()}</p>"
                 for p in paragraphs
-                if not self.contains_bad_texts(p)
+                if not rules.contains_bad_texts(p)
             ]
         )
 
     def clean_contents(self, div):
+        return self._clean_contents(div, self.rules)
+
+    def _clean_contents(self, div, rules: "CleanerRules"):
         if not isinstance(div, Tag):
             return div
+        is_bad_css = rules.bad_css.matcher(div) if rules.bad_css else None
+        self._clean_children(div, rules, is_bad_css)
+        self.clean_attributes(div)
+        return div
 
-        if self.bad_css:
-            for bad in div.select(",".join(self.bad_css)):
-                bad.extract()
-
-        if self.bad_tag_text_pairs:
-            for tag in div.select(",".join(self.bad_tag_text_pairs.keys())):
-                if self.tag_contains_bad_text(tag):
+    def _clean_children(
+        self,
+        parent: Tag,
+        rules: "CleanerRules",
+        is_bad_css: Optional[Callable[[Tag], bool]],
+    ) -> None:
+        # a single walk: the bad tags, and the tags with bad text, are
+        # removed before visiting their children
+        for tag in _child_tags(parent):
+            if tag.name in rules.bad_tags or (is_bad_css and is_bad_css(tag)):
+                tag.extract()
+                continue
+            if tag.name in rules.bad_tag_texts:
+                # the text is checked without the bad css children, as they
+                # are removed first, so a tag with text only in them is empty
+                if is_bad_css:
+                    self._remove_bad_css(tag, is_bad_css)
+                if rules.tag_contains_bad_text(tag):
                     tag.extract()
+                    continue
+            self._clean_children(tag, rules, is_bad_css)
+            getattr(self, rules.tag_cleaners.get(tag.name, "clean_attributes"))(tag)
 
-        for tag in div.find_all(True):
-            if isinstance(tag, Comment):
-                tag.extract()  # Remove comments
-                continue
-            if not isinstance(tag, Tag):
-                continue  # Skip elements that are not a Tag
-            if tag.name in self.bad_tags:
-                tag.extract()  # Remove bad tags
-            elif tag.name in ["br", "hr"]:
-                self.extract_on_duplicate_sibling(tag)
-            elif tag.name == "img":
-                self.clean_image(tag)
+    def _remove_bad_css(self, parent: Tag, is_bad_css: Callable[[Tag], bool]) -> None:
+        for tag in _child_tags(parent):
+            if is_bad_css(tag):
+                tag.extract()
             else:
-                self.clean_attributes(tag)
-
-        self.clean_attributes(div)
-        return div
+                self._remove_bad_css(tag, is_bad_css)
 
     def clean_text(self, text) -> str:
+        return self._clean_text(text, self.rules)
+
+    def _clean_text(self, text, rules: "CleanerRules") -> str:
         text = str(text).strip()
         text = text.translate(self.nonprintable_mapping)
-        if not hasattr(self, "_subs_"):
-            self._subs_ = re.compile(
-                "|".join([f"({x})" for x in self.substitutions.keys()]),
-                flags=re.IGNORECASE,
-            )
-        text = self._subs_.sub(
-            lambda m: self.substitutions[str(m.group(0)).lower()], text
-        )
+        if rules.substitutions:
+            text = rules.substitutions.sub(rules.substitute, text)
         return text
 
     def extract_on_duplicate_sibling(self, tag: Tag):
@@ -225,17 +454,7 @@ class TextCleaner:
         tag.attrs = attrs
 
     def tag_contains_bad_text(self, tag: Tag) -> bool:
-        pattern = self.bad_tag_text_pairs.get(tag.name)
-        if not tag.text:
-            return True
-        if not pattern:
-            return False
-        if isinstance(pattern, list):
-            pattern = "|".join([f"({x})" for x in pattern if x])
-        if not isinstance(pattern, re.Pattern):
-            pattern = re.compile(pattern, re.M)
-            self.bad_tag_text_pairs[tag.name] = pattern
-        return bool(pattern.search(tag.text))
+        return self.rules.tag_contains_bad_text(tag)
 
     def clean_image(self, tag: Tag):
         src = None
@@ -245,8 +464,11 @@ class TextCleaner:
                 break
         if not src:
             tag.extract()
-        else:
-            tag.attrs = {"src": src}
+            return
+        tag.attrs = {"src": src}
+        collector = image_collector.get()
+        if collector:
+            collector.add(tag)
 
     def clean_style_value(self, style: str) -> str:
         clean_css = []
@@ -262,15 +484,18 @@ class TextCleaner:
         return ";".join(clean_css)
 
     def extract_paragraphs(self, tag) -> list:
+        return self._extract_paragraphs(tag, self.rules)
+
+    def _extract_paragraphs(self, tag, rules: "CleanerRules") -> list:
         if not isinstance(tag, Tag):
             return []
 
         body = []
-        for elem in tag.contents:
+        for elem in tag.children:
             if isinstance(elem, Comment):
                 continue
             if not isinstance(elem, Tag):
-                body.append(self.clean_text(elem))
+                body.append(self._clean_text(elem, rules))
                 continue
             if elem.name in self.unchanged_tags:
                 body.append(str(elem))
@@ -288,7 +513,7 @@ class TextCleaner:
 
             is_block = elem.name in self.p_block_tags
             is_plain = elem.name in self.plain_text_tags
-            content = " ".join(self.extract_paragraphs(elem))
+            content = " ".join(self._extract_paragraphs(elem, rules))
 
             if is_block:
                 body.append(self.line_separator)
@@ -307,12 +532,259 @@ class TextCleaner:
 
         return [x.strip() for x in body if x.strip()]
 
+    def contains_bad_texts(self, text: str) -> bool:
+        return self.rules.contains_bad_texts(text)
+
+
+def _child_tags(parent: Tag) -> List[Tag]:
+    if isinstance(parent, LxmlTag):
+        # the texts of the lxml tree are made on each read, so they are skipped
+        return parent.find_all(recursive=False)
+    return [x for x in parent.contents if isinstance(x, Tag)]
+
+
+def _tag_classes(tag: Tag) -> List[str]:
+    classes = tag.get("class") or []
+    if isinstance(classes, str):
+        return classes.split()
+    return classes
+
+
+class SimpleSelector:
+    """A css selector made of a tag name, classes, an id and attribute
+    conditions, e.g. `a.ads[href*='patreon.com']`, matched without soupsieve.
+
+    Args:
+    - selector (str): The selector. Raises ValueError if it is not simple.
+    """
+
+    PATTERN = re.compile(r"^(?P<name>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:[.#][\w-]+|\[[^\]]+\])*)$")
+    PART = re.compile(r"([.#])([\w-]+)|\[\s*([\w-]+)\s*(?:([*^$~|]?=)\s*(?:\"([^\"]*)\"|'([^']*)'|([\w-]+))\s*)?\]")
+
+    def __init__(self, selector: str) -> None:
+        match = self.PATTERN.match(selector.strip())
+        if not match or not selector.strip():
+            raise ValueError(f"Not a simple selector: {selector}")
+        name = match.group("name")
+        self.name = name.lower() if name and name != "*" else None
+        self.ids: List[str] = []
+        self.classes: List[str] = []
+        self.attrs: List[Tuple[str, Optional[str], str]] = []
+        rest = match.group("rest")
+        for part in self.PART.finditer(rest):
+            prefix, ident, attr, op, *values = part.groups()
+            if prefix == ".":
+                self.classes.append(ident)
+            elif prefix == "#":
+                self.ids.append(ident)
+            else:
+                value = next((x for x in values if x is not None), "")
+                self.attrs.append((attr.lower(), op, value))
+        if "".join(x.group(0) for x in self.PART.finditer(rest)) != rest:
+            raise ValueError(f"Not a simple selector: {selector}")
+
+    def match(self, tag: Tag) -> bool:
+        if self.name and tag.name != self.name:
+            return False
+        if self.ids and any(tag.get("id") != x for x in self.ids):
+            return False
+        if self.classes:
+            classes = _tag_classes(tag)
+            if not all(x in classes for x in self.classes):
+                return False
+        for name, op, expected in self.attrs:
+            value = tag.get(name)
+            if value is None:
+                return False
+            if isinstance(value, list):
+                value = " ".join(value)
+            if not op:
+                continue
+            if op == "=" and value != expected:
+                return False
+            if op == "*=" and (not expected or expected not in value):
+                return False
+            if op == "^=" and (not expected or not value.startswith(expected)):
+                return False
+            if op == "$=" and (not expected or not value.endswith(expected)):
+                return False
+            if op == "~=" and expected not in value.split():
+                return False
+            if op == "|=" and value != expected and not value.startswith(expected + "-"):
+                return False
+        return True
+
+
+class SelectorIndex:
+    """Matches the tags with a list of css selectors. The simple selectors are
+    indexed by class, id and tag name, so a tag is only checked against the
+    ones that may match it. The others are compiled together with soupsieve.
+
+    Args:
+    - selectors (Iterable[str]): The css selectors. Each of them may be a list of selectors.
+    """
+
+    def __init__(self, selectors: Iterable[str]) -> None:
+        self.by_class: Dict[str, List[SimpleSelector]] = {}
+        self.by_id: Dict[str, List[SimpleSelector]] = {}
+        self.by_name: Dict[str, List[SimpleSelector]] = {}
+        self.universal: List[SimpleSelector] = []
+        complex_selectors: List[str] = []
+        for selector in selectors:
+            for item in self.split(selector):
+                try:
+                    simple = SimpleSelector(item)
+                except ValueError:
+                    complex_selectors.append(item)
+                    continue
+                if simple.classes:
+                    self.by_class.setdefault(simple.classes[0], []).append(simple)
+                elif simple.ids:
+                    self.by_id.setdefault(simple.ids[0], []).append(simple)
+                elif simple.name:
+                    self.by_name.setdefault(simple.name, []).append(simple)
+                else:
+                    self.universal.append(simple)
+        self.others_css = ",".join(complex_selectors)
+        self.others = soupsieve.compile(self.others_css) if complex_selectors else None
+
+    @staticmethod
+    def split(selector: str) -> List[str]:
+        """Split a selector list by the commas outside of brackets and quotes"""
+        items: List[str] = []
+        depth = 0
+        quote = ""
+        current = ""
+        for char in selector:
+            if quote:
+                if char == quote:
+                    quote = ""
+            elif char in "\"'":
+                quote = char
+            elif char in "[(":
+                depth += 1
+            elif char in "])":
+                depth -= 1
+            elif char == "," and depth == 0:
+                items.append(current)
+                current = ""
+                continue
+            current += char
+        items.append(current)
+        return [x.strip() for x in items if x.strip()]
+
+    def matcher(self, root: Tag) -> Callable[[Tag], bool]:
+        """A function to match the tags under the root while it is cleaned.
+
+        The other selectors may look at the ancestors and the siblings of a tag,
+        so they are run once on the document, and the tags are looked up in the
+        result. Like the old cleaner, which selected all the bad css first, the
+        tags are matched as they were before any of them was removed.
+        """
+        if not self.others:
+            return self.match_simple
+        if isinstance(root, LxmlTag):
+            document = root.element.getroottree().getroot()
+            elements = set(document.xpath(css_to_xpath(self.others_css, "descendant-or-self::")))
+            return lambda tag: self.match_simple(tag) or tag.element in elements
+        # the tags are kept in the list, so their ids are not reused
+        tags = self.others.select(root)
+        ids = set(map(id, tags))
+        return lambda tag: self.match_simple(tag) or id(tag) in ids
+
+    def match(self, tag: Tag) -> bool:
+        if self.match_simple(tag):
+            return True
+        if not self.others:
+            return False
+        if isinstance(tag, LxmlTag):
+            return self.matcher(tag)(tag)
+        return bool(self.others.match(tag))
+
+    def match_simple(self, tag: Tag) -> bool:
+        for selector in self.by_name.get(tag.name, ()):
+            if selector.match(tag):
+                return True
+        if self.by_class:
+            for name in _tag_classes(tag):
+                for selector in self.by_class.get(name, ()):
+                    if selector.match(tag):
+                        return True
+        if self.by_id:
+            for selector in self.by_id.get(tag.get("id"), ()):
+                if selector.match(tag):
+                    return True
+        for selector in self.universal:
+            if selector.match(tag):
+                return True
+        return False
+
+
+def _join_patterns(patterns: Iterable[Union[str, re.Pattern]]) -> str:
+    return "|".join(
+        f"({x.pattern if isinstance(x, re.Pattern) else x})"
+        for x in patterns
+        if x
+    )
+
+
+class CleanerRules:
+    """The settings of a `TextCleaner` compiled to be used while cleaning:
+    the css selectors, the combined regex patterns and the tag dispatch table.
+    It does not change once it is built; the cleaner builds a new one when
+    its settings change.
+
+    Args:
+    - cleaner (TextCleaner): The cleaner to compile the rules of.
+    """
+
+    # the cleaner method to clean the tags by name, other tags get `clean_attributes`
+    tag_cleaners: Dict[str, str] = {
+        "br": "extract_on_duplicate_sibling",
+        "hr": "extract_on_duplicate_sibling",
+        "img": "clean_image",
+    }
+
+    def __init__(self, cleaner: TextCleaner) -> None:
+        self.bad_tags = frozenset(cleaner.bad_tags)
+        self.bad_css = SelectorIndex(cleaner.bad_css) if cleaner.bad_css else None
+
+        self.bad_tag_texts: Dict[str, Optional[re.Pattern]] = {}
+        for name, pattern in cleaner.bad_tag_text_pairs.items():
+            if isinstance(pattern, list):
+                pattern = _join_patterns(pattern)
+            if pattern and not isinstance(pattern, re.Pattern):
+                pattern = re.compile(pattern, re.M)
+            self.bad_tag_texts[name] = pattern or None
+
+        self.bad_texts = (
+            re.compile(_join_patterns(cleaner.bad_text_regex))
+            if cleaner.bad_text_regex
+            else None
+        )
+
+        self.replacements = dict(cleaner.substitutions)
+        self.substitutions = (
+            re.compile(_join_patterns(self.replacements.keys()), flags=re.IGNORECASE)
+            if self.replacements
+            else None
+        )
+
+    def tag_contains_bad_text(self, tag: Tag) -> bool:
+        text = tag.text
+        if not text:
+            return True
+        pattern = self.bad_tag_texts.get(tag.name)
+        if not pattern:
+            return False
+        return bool(pattern.search(text))
+
     def contains_bad_texts(self, text: str) -> bool:
         if not text.strip():
             return True
-        if not self.bad_text_regex:
+        if not self.bad_texts:
             return False
-        if not hasattr(self, "__blacklist__"):
-            pattern = re.compile("|".join(["(%s)" % p for p in self.bad_text_regex]))
-            self.__blacklist__ = pattern
-        return bool(self.__blacklist__.search(text))
+        return bool(self.bad_texts.search(text))
+
+    def substitute(self, match: re.Match) -> str:
+        return self.replacements[str(match.group(0)).lower()]
@@ -1,15 +1,26 @@
-import hashlib
+import asyncio
+import contextvars
 import logging
+import os
 from abc import abstractmethod
-from threading import Event
-from typing import Generator, List, Optional, Union
+from concurrent.futures import Future
+from contextlib import contextmanager
+from threading import Event, local
+from typing import (Any, AsyncGenerator, Callable, Dict, Generator, List,
+                    Optional, Tuple, Union)
 
 from bs4 import Tag
+from requests import Response
 
 from ..models import Chapter, SearchResult, Volume
 from .arguments import get_args
-from .cleaner import TextCleaner
+from .chapter_index import ChapterIndex
+from .cleaner import ImageCollector, TextCleaner, image_collector
+from .exeptions import LNException
+from .parse_pool import parse_processes
+from .pipeline import Pipeline, PipelineStage
 from .scraper import Scraper
+from .taskman import TaskPriority
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +36,10 @@ class Crawler(Scraper):
     is_disabled = False
     disable_reason: Optional[str] = None
 
+    # Download the chapter pages with a plain GET of the chapter url, in
+    # a separate stage from `download_chapter_body` (see `fetch_chapter_page`)
+    prefetch_chapter_pages = False
+
     # ------------------------------------------------------------------------- #
     # Constructor & Destructors
     # ------------------------------------------------------------------------- #
@@ -67,6 +82,20 @@ class Crawler(Scraper):
         # `url` - the link where to download the chapter
         self.chapters: List[Chapter] = []
 
+        # Lookup tables of the chapters, see `chapter_index`
+        self._chapter_index: Optional[ChapterIndex] = None
+
+        # Chapters requested by `boost_chapter`
+        self._boosted_chapters: Dict[int, Future] = {}
+
+        # The pipeline of the last `download_chapters` call
+        self._pipeline: Optional[Pipeline] = None
+
+        # The chapter page to serve to `download_chapter_body` in each thread,
+        # and if it is seen downloading the chapters from their urls
+        self._chapter_page = local()
+        self._prefetch_chapter_pages: Optional[bool] = None if self.prefetch_chapter_pages else False
+
         # Initialize superclass
         super().__init__(
             origin=self.base_url[0],
@@ -108,19 +137,168 @@ class Crawler(Scraper):
         """Download body of a single chapter and return as clean html format."""
         raise NotImplementedError()
 
+    async def download_chapter_body_async(self, chapter: Chapter) -> str:
+        """Download body of a single chapter in the event loop and return as clean html format.
+
+        Override it using the async methods, e.g. `get_soup_async`, to download
+        chapters in the asyncio backend. By default it runs `download_chapter_body`
+        in the executor.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()  # to see the image collector
+        return await loop.run_in_executor(
+            self.executor,
+            context.run,
+            self.download_chapter_body,
+            chapter,
+        )
+
+    def fetch_chapter_page(self, chapter: Chapter) -> Optional[Response]:
+        """Download the raw page of a chapter to be parsed by `parse_chapter_page`.
+
+        Override it along with `parse_chapter_page` to split downloading from
+        parsing, so that `download_chapters` can run them in separate stages.
+
+        By default it returns None, and `download_chapter_body` is used instead.
+        With `prefetch_chapter_pages` set, it downloads the chapter url with a plain
+        GET, once `download_chapter_body` is seen requesting it. Set it only if the
+        chapter url needs no other headers, params or method.
+        """
+        if not self._prefetch_chapter_pages:
+            return None
+        return self.get_response(
+            chapter.url,
+            headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9"},
+        )
+
+    def parse_chapter_page(self, chapter: Chapter, page: Response) -> str:
+        """Parse the page returned by `fetch_chapter_page` and return the clean html.
+
+        By default it runs `download_chapter_body`, serving the page to it
+        instead of downloading the chapter url again.
+        """
+        with self.serve_chapter_page(chapter, page) as served:
+            body = self.download_chapter_body(chapter)
+        if not served.used:
+            logger.debug("The chapter url is not downloaded, disabling the prefetch")
+            self._prefetch_chapter_pages = False
+        return body
+
+    @contextmanager
+    def serve_chapter_page(
+        self,
+        chapter: Chapter,
+        page: Optional[Response] = None,
+    ) -> Generator[local, None, None]:
+        """Serve the page to the first request of the chapter url in this thread.
+        If the page is None, the request is only recorded in `used`."""
+        served = self._chapter_page
+        served.url = chapter.url
+        served.page = page
+        served.used = False
+        try:
+            yield served
+        finally:
+            served.url = None
+            served.page = None
+
+    def get_response(self, url: str, *args, **kwargs) -> Response:
+        served = self._chapter_page
+        if getattr(served, "url", None) == url:
+            served.url = None  # only once
+            served.used = True
+            if served.page is not None:
+                return served.page
+        return super().get_response(url, *args, **kwargs)
+
     # ------------------------------------------------------------------------- #
     # Utility methods that can be overriden
     # ------------------------------------------------------------------------- #
 
+    @property
+    def has_async_downloader(self) -> bool:
+        """True if the crawler overrides `download_chapter_body_async`"""
+        return (
+            type(self).download_chapter_body_async
+            != Crawler.download_chapter_body_async
+        )
+
+    @property
+    def pipeline_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Throughput and queue depths of each stage of the chapter download"""
+        if not self._pipeline:
+            return {}
+        return self._pipeline.stats()
+
+    @property
+    def chapter_index(self) -> ChapterIndex:
+        """Lookup tables of the chapters. It is rebuilt when the chapters or
+        volumes are replaced or resized; call `reindex_chapters` after editing
+        the chapters in place."""
+        index = self._chapter_index
+        if not index or not index.is_valid_for(self.chapters, self.volumes):
+            index = self.reindex_chapters()
+        return index
+
+    def reindex_chapters(self) -> ChapterIndex:
+        """Rebuild the lookup tables of the chapters"""
+        self._chapter_index = ChapterIndex(self.chapters, self.volumes)
+        return self._chapter_index
+
+    def get_chapter_by_url(self, url: str) -> Optional[Chapter]:
+        """Return the chapter by given url or None"""
+        return self.chapter_index.find_by_url(self.absolute_url(url))
+
+    def get_chapter_by_id(self, chapter_id: int) -> Optional[Chapter]:
+        """Return the chapter by given id or None"""
+        return self.chapter_index.find_by_id(chapter_id)
+
+    def get_volume_chapters(self, volume_id: int) -> List[Chapter]:
+        """Return the chapters of a volume in order"""
+        return self.chapter_index.volume_chapters(volume_id)
+
     def index_of_chapter(self, url: str) -> int:
         """Return the index of chapter by given url or 0"""
-        url = self.absolute_url(url)
-        for chapter in self.chapters:
-            if chapter.url.rstrip("/") == url:
-                return chapter.id
-        return 0
+        chapter = self.get_chapter_by_url(url)
+        return chapter["id"] if chapter else 0
+
+    @contextmanager
+    def collect_chapter_images(self, chapter: Chapter) -> Generator[None, None, None]:
+        """Rewrite the images of the chapter while its body is cleaned inside this
+        context, so that the body does not have to be parsed again afterwards.
+
+        Usage:
+            with self.collect_chapter_images(chapter):
+                chapter.body = self.download_chapter_body(chapter)
+        """
+        if get_args().ignore_images:
+            yield
+            return
+
+        collector = ImageCollector(
+            lambda src: self.absolute_url(src, page_url=chapter["url"])
+        )
+        token = image_collector.set(collector)
+        try:
+            yield
+        finally:
+            image_collector.reset(token)
+
+        if not chapter.body:
+            return
+        if collector.is_complete(chapter.body):
+            chapter.setdefault("images", {})
+            chapter.images.update(collector.images)
+        else:
+            # the body was not (entirely) made by the cleaner
+            chapter.images = {}
+            self.extract_chapter_images(chapter, collector.images)
 
-    def extract_chapter_images(self, chapter: Chapter) -> None:
+    def extract_chapter_images(
+        self,
+        chapter: Chapter,
+        known_images: Optional[Dict[str, str]] = None,
+    ) -> None:
         ignore_images = get_args().ignore_images
         if ignore_images:
             return
@@ -128,48 +306,179 @@ class Crawler(Scraper):
         if not chapter.body:
             return
 
-        has_changes = False
         chapter.setdefault("images", {})
         soup = self.make_soup(chapter.body)
+        collector = ImageCollector(
+            lambda src: self.absolute_url(src, page_url=chapter["url"]),
+            known_images,
+        )
         for img in soup.select("img[src]"):
-            src_url = img.get("src")
-            assert isinstance(src_url, str)
-            full_url = self.absolute_url(src_url, page_url=chapter["url"])
-            if not full_url.startswith("http"):
-                continue
-            filename = hashlib.md5(full_url.encode()).hexdigest() + ".jpg"
-            img.attrs = {"src": "images/" + filename, "alt": filename}
-            chapter.images[filename] = full_url
-            has_changes = True
-
-        if has_changes:
+            collector.add(img)
+
+        if collector.images:
+            chapter.images.update(collector.images)
             body = soup.find("body")
             assert isinstance(body, Tag)
             chapter.body = body.decode_contents()
 
+    def __download_chapter(self, chapter: Chapter) -> Chapter:
+        chapter.body = ""
+        chapter.images = {}
+        with self.collect_chapter_images(chapter):
+            chapter.body = self.download_chapter_body(chapter)
+        chapter.success = bool(chapter.body)
+        return chapter
+
+    def boost_chapter(self, chapter: Chapter) -> Future:
+        """Download a chapter before all other queued tasks,
+        e.g. the chapter a reader is waiting for.
+
+        If `download_chapters` reaches the same chapter later, it will
+        reuse the result of this task instead of downloading it again.
+        """
+        future = self._boosted_chapters.get(chapter.id)
+        if future and not future.done():
+            return future
+        future = self.submit_priority_task(
+            TaskPriority.URGENT,
+            chapter.id,
+            self.__download_chapter,
+            chapter,
+        )
+        self._boosted_chapters[chapter.id] = future
+        return future
+
     def download_chapters(
         self,
         chapters: List[Chapter],
         fail_fast=False,
         signal=Event(),
+        persist: Optional[Callable[[Chapter], None]] = None,
     ) -> Generator[Chapter, None, None]:
-        def _downloader(chapter: Chapter):
+        """Download the chapters and yield them as they complete.
+
+        The chapters go through a pipeline with bounded queues between the stages:
+        - fetch: downloads the pages in the threads of the stage, in order.
+          The chapters boosted by `boost_chapter` are taken from the executor.
+        - parse: parses and cleans the pages, and extracts the images.
+          The crawlers can split it from the fetch by `fetch_chapter_page`.
+        - persist: saves the chapters one by one using `persist`, if given.
+
+        Args:
+            chapters: The chapters to download.
+            fail_fast: Fail on first error.
+            signal: Cancels the download when set.
+            persist: Saves a downloaded chapter.
+        """
+        if self.has_async_downloader:
+            for chapter in self.__iterate_in_event_loop(
+                self.download_chapters_async(
+                    chapters,
+                    fail_fast=fail_fast,
+                    signal=signal,
+                )
+            ):
+                if chapter and persist:
+                    persist(chapter)
+                yield chapter
+            return
+
+        def _fetch(chapter: Chapter) -> Tuple[Chapter, Optional[Response], bool]:
             chapter.body = ""
             chapter.images = {}
-            chapter.body = self.download_chapter_body(chapter)
-            self.extract_chapter_images(chapter)
+            page = self.fetch_chapter_page(chapter)
+            if page is None:
+                with self.serve_chapter_page(chapter) as served:
+                    with self.collect_chapter_images(chapter):
+                        chapter.body = self.download_chapter_body(chapter)
+                if served.used and self._prefetch_chapter_pages is None:
+                    self._prefetch_chapter_pages = True
+            return chapter, page, False
+
+        def _schedule(chapter: Chapter) -> Tuple[Chapter, Optional[Response], bool]:
+            boosted = self._boosted_chapters.pop(chapter.id, None)
+            if boosted:
+                return boosted.result(), None, True
+            return _fetch(chapter)
+
+        def _parse(item: Tuple[Chapter, Optional[Response], bool]) -> Chapter:
+            chapter, page, done = item
+            if done:
+                return chapter
+            if page is not None:
+                with self.collect_chapter_images(chapter):
+                    chapter.body = self.parse_chapter_page(chapter, page)
             chapter.success = bool(chapter.body)
             return chapter
 
-        futures = [
-            self.executor.submit(_downloader, chapter)
-            for chapter in chapters
-        ]
+        def _persist(chapter: Chapter) -> Chapter:
+            if persist:
+                persist(chapter)
+            return chapter
+
+        self._pipeline = Pipeline([
+            PipelineStage("fetch", _schedule, workers=self.workers),
+            PipelineStage("parse", _parse, workers=parse_processes() or min(self.workers, os.cpu_count() or 1)),
+            PipelineStage("persist", _persist),
+        ])
+
+        bar = self.progress_bar(
+            total=len(chapters),
+            desc="Chapters",
+            unit="item",
+        )
+        try:
+            for job in self._pipeline.run(chapters, signal):
+                bar.update()
+                if job.error is None:
+                    yield job.item
+                elif fail_fast or isinstance(job.error, KeyboardInterrupt):
+                    raise job.error
+                elif isinstance(job.error, LNException):
+                    bar.clear()
+                    print(str(job.error))
+                else:
+                    bar.clear()
+                    logger.warning(f"{type(job.error).__name__}: {job.error}")
+                    yield None  # type:ignore
+        except KeyboardInterrupt:
+            signal.set()
+            raise
+        finally:
+            bar.close()
+
+    async def download_chapters_async(
+        self,
+        chapters: List[Chapter],
+        fail_fast=False,
+        signal=Event(),
+    ) -> AsyncGenerator[Chapter, None]:
+        async def _downloader(chapter: Chapter):
+            chapter.body = ""
+            chapter.images = {}
+            with self.collect_chapter_images(chapter):
+                chapter.body = await self.download_chapter_body_async(chapter)
+            chapter.success = bool(chapter.body)
+            return chapter
 
-        yield from self.resolve_as_generator(
-            futures,
+        async for chapter in self.resolve_as_async_generator(
+            [_downloader(chapter) for chapter in chapters],
             desc="Chapters",
             unit="item",
             fail_fast=fail_fast,
             signal=signal,
-        )
+        ):
+            yield chapter
+
+    def __iterate_in_event_loop(self, generator: AsyncGenerator) -> Generator:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(generator.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(generator.aclose())
+            loop.run_until_complete(self.close_async())
+            loop.close()
@@ -0,0 +1,111 @@
+"""
+Lookup table of the crawlers that imports the crawler files on demand
+"""
+
+import logging
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Dict, Iterator, List, Mapping, Type
+from urllib.parse import urlparse
+
+from .crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+
+def crawler_keys(url: str) -> List[str]:
+    """The keys a crawler is found by: the url and the hostname, with and without www"""
+    no_www = url.replace("://www.", "://")
+    keys = [url, no_www]
+    for key in (url, no_www):
+        hostname = urlparse(key).hostname
+        if hostname:
+            keys.append(hostname)
+    return keys
+
+
+class CrawlerRegistry(Mapping[str, Type[Crawler]]):
+    """Maps the urls and the hostnames of the sources to their crawlers.
+
+    The crawler files can be registered by their urls without importing them.
+    A file is imported the first time one of its crawlers is looked up, and all
+    of the remaining files are imported when the registry is iterated.
+
+    When several files register the same url, the last one wins, whether it
+    is imported already or not.
+
+    Args:
+    - import_file (Callable[[Path], List[Type[Crawler]]]): Imports the crawlers of a file.
+    """
+
+    def __init__(self, import_file: Callable[[Path], List[Type[Crawler]]]) -> None:
+        self._import_file = import_file
+        self._lock = RLock()
+        self._crawlers: Dict[str, Type[Crawler]] = {}
+        # the file of each key, which may not be imported yet
+        self._owners: Dict[str, Path] = {}
+        # the registered files, and if they are imported
+        self._files: Dict[Path, bool] = {}
+
+    def register_file(self, file_path: Path, base_urls: List[str]) -> None:
+        """Register the urls of a crawler file, to import it when needed"""
+        with self._lock:
+            self._files.setdefault(file_path, False)
+            for url in base_urls:
+                for key in crawler_keys(url):
+                    self._owners[key] = file_path
+                    self._crawlers.pop(key, None)
+
+    def add_crawler(self, crawler: Type[Crawler]) -> None:
+        """Add an imported crawler. Its `base_url` and `file_path` must be set."""
+        file_path = Path(getattr(crawler, "file_path"))
+        with self._lock:
+            self._files[file_path] = True
+            for url in getattr(crawler, "base_url"):
+                for key in crawler_keys(url):
+                    self._owners[key] = file_path
+                    self._crawlers[key] = crawler
+
+    def load_file(self, file_path: Path) -> None:
+        """Import a registered file, keeping the urls registered by the later files"""
+        with self._lock:
+            if self._files.get(file_path):
+                return
+            self._files[file_path] = True
+            logger.debug("Importing crawlers from %s", file_path)
+            try:
+                crawlers = self._import_file(file_path)
+            except Exception as e:
+                logger.warning("Could not load crawlers from %s. Error: %s", file_path, e)
+                return
+            for crawler in crawlers:
+                for url in getattr(crawler, "base_url"):
+                    for key in crawler_keys(url):
+                        owner = self._owners.setdefault(key, file_path)
+                        if owner == file_path:
+                            self._crawlers[key] = crawler
+
+    def load_all(self) -> None:
+        """Import all of the registered files"""
+        with self._lock:
+            pending = [path for path, loaded in self._files.items() if not loaded]
+            for file_path in pending:
+                self.load_file(file_path)
+
+    def __getitem__(self, key: str) -> Type[Crawler]:
+        crawler = self._crawlers.get(key)
+        if crawler:
+            return crawler
+        with self._lock:
+            file_path = self._owners.get(key)
+            if file_path:
+                self.load_file(file_path)
+            return self._crawlers[key]
+
+    def __iter__(self) -> Iterator[str]:
+        self.load_all()
+        return iter(list(self._crawlers))
+
+    def __len__(self) -> int:
+        self.load_all()
+        return len(self._crawlers)
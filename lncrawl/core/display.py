@@ -7,7 +7,7 @@ from colorama import Fore, Style
 from questionary import Choice
 
 from ..assets.chars import Chars
-from ..models import CombinedSearchResult, SearchResult
+from ..models import CombinedSearchResult, NovelUpdate, SearchResult
 from ..models.meta import MetaInfo
 from ..utils.platforms import Platform
 
@@ -282,3 +282,33 @@ def format_resume_choices(meta_list: List[MetaInfo]):
         text += "\n" + (" " * 6) + Chars.LINK + " " + meta.novel.url
         items.append(Choice(value=index, title=text))
     return items
+
+
+def format_update_choices(meta_list: List[MetaInfo]):
+    items = []
+    for index, meta in enumerate(meta_list):
+        if not meta.session or not meta.novel:
+            continue
+        text = "%d. %s [%d chapters]" % (
+            index + 1,
+            meta.novel.title,
+            len(meta.novel.chapters),
+        )
+        text += "\n" + (" " * 6) + Chars.LINK + " " + meta.novel.url
+        items.append(Choice(value=index, title=text))
+    return items
+
+
+def novel_update_summary(update: NovelUpdate):
+    print()
+    if not (update.added or update.changed or update.moved or update.removed):
+        print(Fore.YELLOW, Chars.INFO, "No new chapters found", Fore.RESET)
+    else:
+        print(
+            Fore.GREEN,
+            Chars.INFO,
+            "%d new, %d changed, %d moved, %d removed chapters"
+            % (len(update.added), len(update.changed), len(update.moved), len(update.removed)),
+            Fore.RESET,
+        )
+    print()
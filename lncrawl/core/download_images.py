@@ -3,34 +3,44 @@ To download chapter images
 """
 
 import logging
+import re
 from concurrent.futures import Future
 from pathlib import Path
 from threading import Event
 from typing import List
 
 from ..utils.imgen import generate_cover_image
+from .chapter_store import open_chapter_store
+from .image_cache import get_image_cache
+from .image_pipeline import ImagePipeline
+from .taskman import TaskPriority
 
 logger = logging.getLogger(__name__)
 
 
+def remove_image_tags(body: str, filenames: List[str]) -> str:
+    """Remove the <img> tags of the given files, as written by `ImageCollector`"""
+    pattern = re.compile(
+        r'<img\b[^>]*\balt="(?:%s)"[^>]*>' % "|".join(re.escape(x) for x in filenames)
+    )
+    return pattern.sub("", body)
+
+
 def fetch_chapter_images(app, signal=Event()):
     from .app import App
     assert isinstance(app, App) and app.crawler, 'Invalid app instance'
 
+    pipeline = ImagePipeline(
+        cache=get_image_cache() if app.crawler.use_image_cache else None,
+    )
+
     def _fetch_content_image(url: str, image_file: Path):
         assert app.crawler
+        if pipeline.restore(url, image_file):
+            logger.debug("Restored image: %s", image_file)
+            return
         img = app.crawler.download_image(url)
-        try:
-            if img.mode not in ("L", "RGB", "YCbCr", "RGBX"):
-                if img.mode == "RGBa":
-                    img = img.convert("RGBA").convert("RGB")
-                else:
-                    img = img.convert("RGB")
-            image_file.parent.mkdir(parents=True, exist_ok=True)
-            img.save(image_file.as_posix(), "JPEG", optimized=True)
-        finally:
-            img.close()
-
+        pipeline.save(url, img, image_file)
         logger.debug("Saved image: %s", image_file)
 
     def _fetch_cover_image(cover_url: str):
@@ -53,17 +63,28 @@ def fetch_chapter_images(app, signal=Event()):
 
     # download or generate cover
     if app.crawler.novel_cover:
-        f = app.crawler.executor.submit(_fetch_cover_image, app.crawler.novel_cover)
+        f = app.crawler.submit_priority_task(
+            TaskPriority.METADATA,
+            0,
+            _fetch_cover_image,
+            app.crawler.novel_cover,
+        )
         futures.append(f)
 
-    # download content images
+    # download content images in reading order
     image_folder = Path(app.output_path) / "images"
-    for chapter in app.chapters:
+    for index, chapter in enumerate(app.chapters):
         images = chapter.get("images") or {}
         for filename, url in images.items():
             image_file = image_folder / str(filename)
             if url and not image_file.is_file():
-                f = app.crawler.executor.submit(_fetch_content_image, url, image_file)
+                f = app.crawler.submit_priority_task(
+                    TaskPriority.IMAGE,
+                    index,
+                    _fetch_content_image,
+                    url,
+                    image_file,
+                )
                 futures.append(f)
 
     if not futures:
@@ -86,25 +107,30 @@ def fetch_chapter_images(app, signal=Event()):
         logger.info(f"Downloaded {current} images")
 
     # discard failed images
-    for chapter in app.chapters:
-        images = chapter.get("images")
-        if not images or not isinstance(images, dict):
-            continue
-
-        failed_images = []
-        for filename, url in images.items():
-            image_file = image_folder / str(filename)
-            if not image_file.is_file():
-                failed_images.append(filename)
-        if not failed_images:
-            continue
-
-        soup = app.crawler.make_soup(chapter["body"])
-        if not soup.body:
-            continue
-
-        for filename in failed_images:
-            images.pop(filename)
-            for img in soup.select(f'img[alt="{filename}"]'):
-                img.extract()
-        chapter["body"] = soup.body.decode_contents()
+    with open_chapter_store(app.output_path, app.pack_by_volume) as store:
+        for chapter in app.chapters:
+            images = chapter.get("images")
+            if not images or not isinstance(images, dict):
+                continue
+
+            failed_images = []
+            for filename, url in images.items():
+                image_file = image_folder / str(filename)
+                if not image_file.is_file():
+                    failed_images.append(filename)
+            if not failed_images:
+                continue
+
+            body = chapter.body
+            if body is None:
+                saved_chapter = store.get(chapter) or {}
+                body = saved_chapter.get("body")
+            if not body:
+                continue
+
+            for filename in failed_images:
+                images.pop(filename)
+            chapter["body"] = remove_image_tags(body, failed_images)
+            if chapter.success:
+                store.put(chapter)
+                chapter.body = None  # read again from the store when it is needed
@@ -14,6 +14,11 @@ class FallbackToBrowser(Exception):
     pass
 
 
+class CircuitOpenError(Exception):
+    """Raised without making a request when the circuit of the host is open"""
+    pass
+
+
 ScraperErrorGroup = (
     URLError,
     HTTPError,
@@ -0,0 +1,150 @@
+"""
+HTTP/2 transport for the Scraper using httpx
+"""
+
+import io
+from http.client import HTTPMessage
+from threading import BoundedSemaphore, Lock
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .async_client import to_request_exception
+from .exeptions import LNException
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # type:ignore
+
+
+class HTTP2Adapter(BaseAdapter):
+    """A transport adapter of `requests` sending the requests over HTTP/2.
+
+    Each host gets its own connections, and each connection carries up to
+    `max_streams` concurrent requests. The hosts not supporting HTTP/2 are
+    answered over HTTP/1.1, see `http_version` to send them elsewhere.
+    The session still prepares the requests, follows the redirects and
+    stores the cookies.
+
+    Args:
+    - max_streams (int, optional): Concurrent requests per connection. Default: 32.
+    - max_connections (int, optional): Number of connections to open per host. Default: 1.
+    """
+
+    def __init__(self, max_streams: int = 32, max_connections: int = 1) -> None:
+        if httpx is None:
+            raise LNException("Please install httpx[http2] to use the HTTP/2 transport")
+        super().__init__()
+        self.max_streams = max_streams
+        self.max_connections = max_connections
+        self._lock = Lock()
+        # the client and the stream slots of each host, by the network location
+        self._hosts: Dict[str, Tuple["httpx.Client", BoundedSemaphore]] = {}
+        # the http version of the last response of each hostname
+        self._versions: Dict[str, str] = {}
+
+    def http_version(self, hostname: Optional[str]) -> Optional[str]:
+        """The http version the host answered with, e.g. "HTTP/2", or None if unknown"""
+        return self._versions.get(hostname or "")
+
+    def _get_host(self, netloc: str) -> Tuple["httpx.Client", BoundedSemaphore]:
+        with self._lock:
+            host = self._hosts.get(netloc)
+            if host is None:
+                client = httpx.Client(
+                    http2=True,
+                    follow_redirects=False,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                )
+                streams = BoundedSemaphore(self.max_streams * self.max_connections)
+                host = self._hosts[netloc] = (client, streams)
+            return host
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        else:
+            timeout = httpx.Timeout(timeout)
+
+        http2_request = httpx.Request(
+            str(request.method),
+            str(request.url),
+            headers=list(request.headers.items()),
+            content=request.body,
+            extensions={"timeout": timeout.as_dict()},
+        )
+        url = urlparse(str(request.url))
+        client, streams = self._get_host(url.netloc)
+        with streams:
+            try:
+                http2_response = client.send(http2_request)
+            except httpx.HTTPError as e:
+                raise to_request_exception(e) from e
+        self._versions[url.hostname or ""] = http2_response.http_version
+        return self.build_response(request, http2_response)
+
+    def build_response(
+        self,
+        request: PreparedRequest,
+        http2_response: "httpx.Response",
+    ) -> Response:
+        # The session reads the cookies from the message of the raw response
+        msg = HTTPMessage()
+        for key, value in http2_response.headers.multi_items():
+            msg.add_header(key, value)
+        raw = io.BytesIO(http2_response.content)
+        setattr(raw, "_original_response", SimpleNamespace(msg=msg))
+
+        response = Response()
+        response.status_code = http2_response.status_code
+        response.headers = CaseInsensitiveDict(http2_response.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = http2_response.reason_phrase
+        response.url = str(request.url)
+        response.raw = raw
+        response._content = http2_response.content
+        response.request = request
+        response.connection = self
+        setattr(response, "http_version", http2_response.http_version)
+        extract_cookies_to_jar(response.cookies, request, raw)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            hosts = list(self._hosts.values())
+            self._hosts.clear()
+        for client, _ in hosts:
+            client.close()
+
+
+def create_http2_session(
+    session: Session,
+    max_streams: int = 32,
+    max_connections: int = 1,
+) -> Session:
+    """Create a session sending https requests over HTTP/2.
+    The cookies and headers are shared with the given session."""
+    http2_session = Session()
+    http2_session.cookies = session.cookies
+    http2_session.headers = session.headers
+    http2_session.mount("https://", HTTP2Adapter(max_streams, max_connections))
+    return http2_session
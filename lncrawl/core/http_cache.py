@@ -0,0 +1,259 @@
+"""
+Persistent on-disk cache for the responses of GET requests
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Dict, Optional
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .. import constants as C
+from .charset import get_charset_resolver
+
+logger = logging.getLogger(__name__)
+
+# headers that are stored with the body
+STORED_HEADERS = {
+    "content-type",
+    "content-language",
+    "etag",
+    "last-modified",
+}
+
+
+class CacheEntry(object):
+    def __init__(
+        self,
+        key: str,
+        url: str,
+        digest: str,
+        headers: Dict[str, str],
+        stored_at: float,
+    ) -> None:
+        self.key = key
+        self.url = url
+        self.digest = digest
+        self.headers = headers
+        self.stored_at = stored_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+
+class ResponseCache(object):
+    """A content-addressed cache of the response bodies.
+
+    The bodies are stored in files named by their sha256 digest, so identical
+    bodies are stored once. A sqlite index maps every request to its body,
+    headers and last access time, which is used for the LRU eviction.
+
+    Args:
+    - path (str): The cache directory.
+    - max_size (int): Maximum total size of the bodies in bytes.
+    """
+
+    def __init__(self, path: str, max_size: int) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self._lock = Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._size: Optional[int] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self.path / "index.db"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+            )
+        return self._db
+
+    @staticmethod
+    def make_key(url: str, accept: Optional[str] = None, identity: str = "") -> str:
+        """The key of a response. The identity is the session the page is fetched by,
+        e.g. the cookies and the authorization, as the page may differ for each user."""
+        return hashlib.sha256(f"{url}\n{accept or ''}\n{identity}".encode()).hexdigest()
+
+    def _body_file(self, digest: str) -> Path:
+        return self.path / "bodies" / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT url, digest, headers, stored_at FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        url, digest, headers, stored_at = row
+        if not self._body_file(digest).is_file():
+            self.remove(key)
+            return None
+        return CacheEntry(key, url, digest, json.loads(headers), stored_at)
+
+    def load(self, entry: CacheEntry) -> Response:
+        """Build a response from the cached entry and mark it as used"""
+        with self._lock:
+            self.db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                (time.time(), entry.key),
+            )
+        response = Response()
+        response.url = entry.url
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = self._body_file(entry.digest).read_bytes()
+        response.encoding = get_charset_resolver().response_encoding(response.headers, entry.url)
+        setattr(response, "from_cache", True)
+        return response
+
+    def revalidated(self, entry: CacheEntry, response: Response) -> Response:
+        """Refresh the entry after a `304 Not Modified` response"""
+        headers = dict(entry.headers)
+        headers.update(self._filter_headers(response))
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "UPDATE entries SET headers = ?, stored_at = ? WHERE key = ?",
+                (json.dumps(headers), now, entry.key),
+            )
+        entry.headers = headers
+        entry.stored_at = now
+        return self.load(entry)
+
+    def put(self, key: str, response: Response) -> None:
+        content = response.content
+        if not content:
+            return
+        digest = hashlib.sha256(content).hexdigest()
+        body_file = self._body_file(digest)
+        is_new = not body_file.is_file()
+        if is_new:
+            self._write_body(body_file, content)
+
+        now = time.time()
+        headers = self._filter_headers(response)
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, digest, len(content), json.dumps(headers), now, now),
+            )
+            if not body_file.is_file():
+                # evicted before the entry was inserted, now it is referenced
+                self._write_body(body_file, content)
+                is_new = True
+            if self._size is not None and is_new:
+                self._size += len(content)
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    @staticmethod
+    def _write_body(body_file: Path, content: bytes) -> None:
+        body_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = body_file.with_suffix(f".{os.getpid()}.{get_ident()}.tmp")
+        tmp_file.write_bytes(content)
+        os.replace(tmp_file, body_file)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the size fits"""
+        with self._lock:
+            (total,) = self.db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+            ).fetchone()
+            self._size = total
+            if total <= self.max_size:
+                return
+            rows = self.db.execute(
+                "SELECT key, digest, size FROM entries ORDER BY accessed_at"
+            ).fetchall()
+            # the other processes cannot reference a body between the check and the unlink
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                for key, digest, size in rows:
+                    if total <= self.max_size:
+                        break
+                    self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    (refs,) = self.db.execute(
+                        "SELECT COUNT(*) FROM entries WHERE digest = ?", (digest,)
+                    ).fetchone()
+                    if refs == 0:
+                        self._body_file(digest).unlink(missing_ok=True)
+                        total -= size
+            finally:
+                self.db.execute("COMMIT")
+            self._size = total
+        logger.debug("Evicted http cache entries. Current size: %d", total)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._size = None
+            shutil.rmtree(self.path, ignore_errors=True)
+        logger.info("Cleared http cache: %s", self.path)
+
+    @staticmethod
+    def _filter_headers(response: Response) -> Dict[str, str]:
+        return {
+            k.lower(): v
+            for k, v in response.headers.items()
+            if k.lower() in STORED_HEADERS
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, or None if it is disabled"""
+    global _cache
+    if os.getenv("no_http_cache"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(C.HTTP_CACHE_PATH, C.HTTP_CACHE_SIZE)
+        return _cache
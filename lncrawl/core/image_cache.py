@@ -0,0 +1,192 @@
+"""
+Persistent on-disk cache of the processed images, shared by all novels
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Optional
+
+from .. import constants as C
+
+logger = logging.getLogger(__name__)
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard link the file if possible, so that identical images are stored once"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = dst.with_suffix(f".{os.getpid()}.{get_ident()}.tmp")
+    tmp_file.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_file)
+    except OSError:
+        shutil.copyfile(src, tmp_file)
+    os.replace(tmp_file, dst)
+
+
+class ImageCache(object):
+    """A content-addressed cache of the processed images.
+
+    The images are stored in files named by their sha256 digest. A sqlite index
+    maps the image urls and the digests of the downloaded images to the stored
+    files, along with the last access time, which is used for the LRU eviction.
+    The keys include the image profile, as it changes the stored image.
+
+    Args:
+    - path (str): The cache directory.
+    - max_size (int): Maximum total size of the images in bytes.
+    """
+
+    def __init__(self, path: str, max_size: int) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self._lock = Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._size: Optional[int] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self.path / "index.db"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS images (
+                    key TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS images_accessed_at ON images (accessed_at)"
+            )
+        return self._db
+
+    @staticmethod
+    def url_key(url: str, profile: str) -> str:
+        return hashlib.sha256(f"url\n{profile}\n{url}".encode()).hexdigest()
+
+    @staticmethod
+    def source_key(source_digest: str, profile: str) -> str:
+        return hashlib.sha256(f"source\n{profile}\n{source_digest}".encode()).hexdigest()
+
+    def _image_file(self, digest: str) -> Path:
+        return self.path / "images" / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[Path]:
+        """Get the stored image file of the key and mark it as used"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT digest FROM images WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None
+            self.db.execute(
+                "UPDATE images SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        image_file = self._image_file(row[0])
+        if not image_file.is_file():
+            self.remove(key)
+            return None
+        return image_file
+
+    def put(self, image_file: Path, *keys: str) -> None:
+        """Store the image file under the given keys"""
+        content = image_file.read_bytes()
+        if not content:
+            return
+        digest = hashlib.sha256(content).hexdigest()
+        cached_file = self._image_file(digest)
+        is_new = not cached_file.is_file()
+        if is_new:
+            link_or_copy(image_file, cached_file)
+
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?)",
+                    (key, digest, len(content), now),
+                )
+            if not cached_file.is_file():
+                # evicted before the keys were inserted, now it is referenced
+                link_or_copy(image_file, cached_file)
+                is_new = True
+            if self._size is not None and is_new:
+                self._size += len(content)
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self.db.execute("DELETE FROM images WHERE key = ?", (key,))
+
+    def evict(self) -> None:
+        """Remove the least recently used images until the size fits"""
+        with self._lock:
+            (total,) = self.db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM images)"
+            ).fetchone()
+            self._size = total
+            if total <= self.max_size:
+                return
+            rows = self.db.execute(
+                "SELECT key, digest, size FROM images ORDER BY accessed_at"
+            ).fetchall()
+            # the other processes cannot reference an image between the check and the unlink
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                for key, digest, size in rows:
+                    if total <= self.max_size:
+                        break
+                    self.db.execute("DELETE FROM images WHERE key = ?", (key,))
+                    (refs,) = self.db.execute(
+                        "SELECT COUNT(*) FROM images WHERE digest = ?", (digest,)
+                    ).fetchone()
+                    if refs == 0:
+                        # the novels keep their own links to the file
+                        self._image_file(digest).unlink(missing_ok=True)
+                        total -= size
+            finally:
+                self.db.execute("COMMIT")
+            self._size = total
+        logger.debug("Evicted image cache entries. Current size: %d", total)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._size = None
+            shutil.rmtree(self.path, ignore_errors=True)
+        logger.info("Cleared image cache: %s", self.path)
+
+
+_cache: Optional[ImageCache] = None
+_cache_lock = Lock()
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """Get the process-wide image cache, or None if it is disabled"""
+    global _cache
+    if os.getenv("no_image_cache"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache(C.IMAGE_CACHE_PATH, C.IMAGE_CACHE_SIZE)
+        return _cache
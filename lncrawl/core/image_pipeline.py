@@ -0,0 +1,213 @@
+"""
+To save the downloaded images as JPEG files suitable for the e-book readers
+"""
+
+import atexit
+import hashlib
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .image_cache import ImageCache, link_or_copy
+
+logger = logging.getLogger(__name__)
+
+# the largest size of the images for each reader, or None to keep the size
+IMAGE_PROFILES: Dict[str, Optional[Tuple[int, int]]] = {
+    "original": None,
+    "kindle": (1072, 1448),
+    "kobo": (1264, 1680),
+    "tablet": (1600, 2560),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def image_profile() -> str:
+    """Name of the image profile to use, see `IMAGE_PROFILES`"""
+    profile = os.getenv("image_profile") or "original"
+    if profile not in IMAGE_PROFILES:
+        logger.warning("Unknown image profile: %s", profile)
+        return "original"
+    return profile
+
+
+def image_processes() -> int:
+    """Number of processes to convert the images in, or 0 if it is disabled"""
+    return int(os.getenv("image_processes") or 0)
+
+
+def get_image_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process-wide pool to convert the images, or None if it is disabled"""
+    global _pool
+    workers = image_processes()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # forking a process with running threads may deadlock
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if sys.version_info >= (3, 9):
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            else:
+                atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def get_image_data(image: Any) -> bytes:
+    """Get the content of the value returned by `Scraper.download_image`.
+
+    The images opened from the memory or from a file keep the source bytes,
+    so they are returned without decoding the image.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    assert isinstance(image, Image.Image), "Invalid image"
+    with image:
+        fp = getattr(image, "fp", None)
+        if isinstance(fp, BytesIO):
+            return fp.getvalue()
+        filename = getattr(image, "filename", None)
+        if filename and os.path.isfile(filename):
+            # the file is closed once the image is loaded
+            return Path(filename).read_bytes()
+        if fp is not None and hasattr(fp, "seek") and not getattr(fp, "closed", False):
+            fp.seek(0)
+            return fp.read()
+        buffer = BytesIO()
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+
+def is_acceptable_jpeg(data: bytes, max_size: Optional[Tuple[int, int]]) -> bool:
+    """True if the data can be saved as it is. It only reads the image header."""
+    if not data.startswith(b"\xff\xd8\xff"):
+        return False
+    if not data.rstrip(b"\0\r\n").endswith(b"\xff\xd9"):
+        return False  # truncated
+    try:
+        with Image.open(BytesIO(data)) as img:
+            if img.format != "JPEG" or img.mode not in ("L", "RGB"):
+                return False
+            if max_size:
+                return img.width <= max_size[0] and img.height <= max_size[1]
+            return True
+    except Exception:
+        return False
+
+
+def convert_image(data: bytes, max_size: Optional[Tuple[int, int]]) -> bytes:
+    """Convert the image to JPEG, fitting it in the max size if given.
+    It runs in a worker process of the image pool."""
+    # the opened image is closed even if it is replaced by a converted copy
+    with Image.open(BytesIO(data)) as img:
+        if img.mode not in ("L", "RGB", "YCbCr", "RGBX"):
+            if img.mode == "RGBa":
+                img = img.convert("RGBA").convert("RGB")
+            else:
+                img = img.convert("RGB")
+        if max_size and (img.width > max_size[0] or img.height > max_size[1]):
+            img.thumbnail(max_size, Image.LANCZOS)
+        output = BytesIO()
+        img.save(output, "JPEG", optimize=True)
+        return output.getvalue()
+
+
+class ImagePipeline(object):
+    """Saves the downloaded images of a novel.
+
+    The JPEG images that fit in the profile are saved as they are, and the
+    others are converted in the image pool. Identical images are linked to a
+    single file. With a cache, the images are also looked up in it by url and
+    by content.
+
+    Args:
+    - profile (str, optional): The image profile. Default: `image_profile()`.
+    - cache (ImageCache, optional): The image cache, see `get_image_cache()`. Default: None.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[str] = None,
+        cache: Optional[ImageCache] = None,
+    ) -> None:
+        self.profile = profile or image_profile()
+        self.max_size = IMAGE_PROFILES[self.profile]
+        self.cache = cache
+        self._saved: Dict[str, Path] = {}  # source digest -> image file
+        self._lock = Lock()
+
+    def restore(self, url: str, image_file: Path) -> bool:
+        """Restore the image of the url from the cache without downloading it"""
+        if not self.cache or url.startswith("data:"):
+            return False
+        try:
+            cached_file = self.cache.get(self.cache.url_key(url, self.profile))
+            if not cached_file:
+                return False
+            link_or_copy(cached_file, image_file)
+            return True
+        except Exception as e:
+            logger.debug("Failed to read image cache: %s", e)
+            return False
+
+    def save(self, url: str, image: Any, image_file: Path) -> None:
+        """Save the image returned by `Scraper.download_image` to the file"""
+        data = get_image_data(image)
+        digest = hashlib.sha256(data).hexdigest()
+        keys: List[str] = []
+        if self.cache:
+            keys.append(self.cache.source_key(digest, self.profile))
+            if not url.startswith("data:"):
+                keys.append(self.cache.url_key(url, self.profile))
+
+        if not self.__link_saved(digest, image_file, keys):
+            image_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = image_file.with_suffix(f".{os.getpid()}.{get_ident()}.tmp")
+            tmp_file.write_bytes(self.__process(data))
+            os.replace(tmp_file, image_file)
+            with self._lock:
+                self._saved[digest] = image_file
+
+        if self.cache:
+            try:
+                self.cache.put(image_file, *keys)
+            except Exception as e:
+                logger.debug("Failed to update image cache: %s", e)
+
+    def __link_saved(self, digest: str, image_file: Path, keys: List[str]) -> bool:
+        with self._lock:
+            saved_file = self._saved.get(digest)
+        if saved_file and saved_file.is_file():
+            if saved_file != image_file:
+                link_or_copy(saved_file, image_file)
+            return True
+        if self.cache and keys:
+            try:
+                cached_file = self.cache.get(keys[0])
+                if cached_file:
+                    link_or_copy(cached_file, image_file)
+                    return True
+            except Exception as e:
+                logger.debug("Failed to read image cache: %s", e)
+        return False
+
+    def __process(self, data: bytes) -> bytes:
+        if is_acceptable_jpeg(data, self.max_size):
+            return data
+        pool = get_image_pool()
+        if pool:
+            return pool.submit(convert_image, data, self.max_size).result()
+        return convert_image(data, self.max_size)
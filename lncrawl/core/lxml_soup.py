@@ -0,0 +1,542 @@
+"""
+A faster soup made directly on the lxml tree, with a subset of the
+BeautifulSoup interface that is used by the crawlers and the cleaner
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator
+    from lxml import etree
+    from lxml.html.defs import tags as HTML_TAGS
+except ImportError:
+    lxml = None  # type:ignore
+    HTMLTranslator = None  # type:ignore
+    HTML_TAGS = frozenset()
+
+logger = logging.getLogger(__name__)
+
+# the attributes that BeautifulSoup splits into a list of values
+MULTI_VALUED_ATTRIBUTES = {"class", "rel", "rev", "accept-charset", "headers", "accesskey"}
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+def is_available() -> bool:
+    return lxml is not None and HTMLTranslator is not None
+
+
+@lru_cache(maxsize=1024)
+def css_to_xpath(selector: str, prefix: str) -> str:
+    return HTMLTranslator().css_to_xpath(selector, prefix=prefix)
+
+
+def _is_element(node: Any) -> bool:
+    return isinstance(node.tag, str)
+
+
+class LxmlString(NavigableString):
+    """A text of the lxml tree. It is made for each read, and is not linked to
+    the other nodes, so the setup of the NavigableString is skipped."""
+
+    hidden = False
+    parent = previous_element = next_element = previous_sibling = next_sibling = None
+
+    def __new__(cls, value: str) -> "LxmlString":
+        return str.__new__(cls, value)
+
+
+def _wrap(node: Any) -> Union["LxmlTag", NavigableString, None]:
+    if _is_element(node):
+        return LxmlTag(node)
+    if isinstance(node, etree._Comment):
+        return Comment(node.text or "")
+    return None
+
+
+def _iter_strings(element: Any) -> Iterator[str]:
+    if element.text:
+        yield element.text
+    for child in element:
+        if _is_element(child):
+            yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _serialize(element: Any) -> str:
+    # the xml method writes the void elements like BeautifulSoup (<br/>),
+    # and the empty text keeps the other elements open (<p></p>)
+    for node in element.iter():
+        if _is_element(node) and node.text is None and len(node) == 0 and node.tag not in VOID_ELEMENTS:
+            node.text = ""
+    return etree.tostring(element, method="xml", encoding=str, with_tail=False)
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _match_value(expected: Any, value: Any, name: str = "") -> bool:
+    if expected is True:
+        return value is not None
+    if expected is None or expected is False:
+        return value is None
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return any(_match_value(x, value, name) for x in expected)
+    if value is None:
+        return False
+    if callable(expected) and not isinstance(expected, re.Pattern):
+        return bool(expected(value))
+    values = [value]
+    if name in MULTI_VALUED_ATTRIBUTES:
+        values += value.split()
+    if isinstance(expected, re.Pattern):
+        return any(expected.search(x) for x in values)
+    return str(expected) in values
+
+
+class _TagFilter:
+    """The arguments of `find_all` to match the elements with"""
+
+    def __init__(self, name: Any, attrs: Any, string: Any, kwargs: Dict[str, Any]) -> None:
+        if string is None:
+            string = kwargs.pop("text", None)
+        if not isinstance(attrs, dict):
+            attrs = {"class": attrs}
+        attrs = dict(attrs)
+        if "class_" in kwargs:
+            attrs["class"] = kwargs.pop("class_")
+        attrs.update(kwargs)
+        self.name = None if name is True else name
+        self.attrs = attrs
+        self.string = string
+
+    def __call__(self, element: Any) -> bool:
+        name = self.name
+        if name is not None:
+            tag_name = str(element.tag).lower()
+            if isinstance(name, str):
+                if tag_name != name:
+                    return False
+            elif not _match_value(name, tag_name):
+                return False
+        for key, expected in self.attrs.items():
+            if not _match_value(expected, element.get(key), key):
+                return False
+        if self.string is not None:
+            return _match_value(self.string, LxmlTag(element).string)
+        return True
+
+
+def _set_attribute(element: Any, name: str, value: Any) -> None:
+    if isinstance(value, (list, tuple)):
+        value = " ".join(value)
+    element.set(name, str(value))
+
+
+class LxmlAttributes(dict):
+    """The attributes of an element, which writes the changes to the element"""
+
+    def __init__(self, element: Any) -> None:
+        super().__init__(element.items())
+        self._element = element
+        for name in MULTI_VALUED_ATTRIBUTES.intersection(self):
+            super().__setitem__(name, self[name].split())
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        super().__setitem__(name, value)
+        _set_attribute(self._element, name, value)
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        del self._element.attrib[name]
+
+    def pop(self, name: str, *args):
+        if name in self._element.attrib:
+            del self._element.attrib[name]
+        return super().pop(name, *args)
+
+
+class LxmlTag(Tag):
+    """A BeautifulSoup Tag backed by an lxml element.
+
+    It supports the common ways to find and read the tags: `select`, `select_one`,
+    `find`, `find_all`, `get_text`, `text`, `string`, the attributes, `children`,
+    `contents`, `parent`, the siblings, `extract`, `decompose`, `decode_contents`
+    and `str`. The first child tag can be found by its html tag name, e.g. `soup.body`.
+    The other methods of the BeautifulSoup Tag raise NotImplementedError.
+
+    Args:
+    - element (lxml.etree._Element): The element to wrap.
+    """
+
+    # the axis to search the tags from, which excludes the tag itself
+    _axis = "descendant::"
+
+    def __init__(self, element: Any) -> None:
+        self._element = element
+        self.name = element.tag.lower()
+
+    def __getattr__(self, name: str) -> Any:
+        # the Tag.__init__ is not called, so only the tag names are looked up
+        if name in HTML_TAGS:
+            return self.find(name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, LxmlTag) and other._element is self._element
+
+    def __hash__(self) -> int:
+        return hash(self._element)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.contents)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.contents
+
+    def __getitem__(self, name: str) -> Any:
+        return self.attrs[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self.attrs[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        self.attrs.pop(name, None)
+
+    def __call__(self, *args, **kwargs) -> List["LxmlTag"]:
+        return self.find_all(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return self.decode()
+
+    def __repr__(self) -> str:
+        return self.decode()
+
+    # ------------------------------------------------------------------------- #
+    # Properties
+    # ------------------------------------------------------------------------- #
+
+    @property
+    def element(self) -> Any:
+        """The wrapped lxml element"""
+        return self._element
+
+    @property  # type:ignore
+    def attrs(self) -> LxmlAttributes:
+        return LxmlAttributes(self._element)
+
+    @attrs.setter
+    def attrs(self, value: Dict[str, Any]) -> None:
+        element = self._element
+        if element.keys():
+            element.attrib.clear()
+        for name, item in value.items():
+            _set_attribute(element, name, item)
+
+    @property  # type:ignore
+    def contents(self) -> List[Any]:
+        return list(self.children)
+
+    @property
+    def children(self) -> Iterator[Any]:  # type:ignore
+        element = self._element
+        if element.text:
+            yield LxmlString(element.text)
+        for child in element:
+            node = _wrap(child)
+            if node is not None:
+                yield node
+            if child.tail:
+                yield LxmlString(child.tail)
+
+    @property
+    def descendants(self) -> Iterator[Any]:  # type:ignore
+        for node in self.children:
+            yield node
+            if isinstance(node, LxmlTag):
+                yield from node.descendants
+
+    @property  # type:ignore
+    def parent(self) -> Optional["LxmlTag"]:
+        parent = self._element.getparent()
+        return LxmlTag(parent) if parent is not None else None
+
+    @property
+    def parents(self) -> Iterator["LxmlTag"]:  # type:ignore
+        for parent in self._element.iterancestors():
+            yield LxmlTag(parent)
+
+    @property  # type:ignore
+    def next_sibling(self) -> Any:
+        element = self._element
+        if element.tail:
+            return LxmlString(element.tail)
+        sibling = element.getnext()
+        return _wrap(sibling) if sibling is not None else None
+
+    @property  # type:ignore
+    def previous_sibling(self) -> Any:
+        element = self._element
+        sibling = element.getprevious()
+        if sibling is not None:
+            if sibling.tail:
+                return LxmlString(sibling.tail)
+            return _wrap(sibling)
+        parent = element.getparent()
+        if parent is not None and parent.text:
+            return LxmlString(parent.text)
+        return None
+
+    nextSibling = next_sibling
+    previousSibling = previous_sibling
+
+    @property  # type:ignore
+    def text(self) -> str:
+        return self.get_text()
+
+    @property  # type:ignore
+    def string(self) -> Optional[str]:
+        contents = [
+            x for x in self.contents
+            if not isinstance(x, Comment)
+        ]
+        if len(contents) != 1:
+            return None
+        child = contents[0]
+        if isinstance(child, LxmlTag):
+            return child.string
+        return child
+
+    @property
+    def strings(self) -> Iterator[str]:  # type:ignore
+        return _iter_strings(self._element)
+
+    @property
+    def stripped_strings(self) -> Iterator[str]:  # type:ignore
+        for text in self.strings:
+            text = text.strip()
+            if text:
+                yield text
+
+    # ------------------------------------------------------------------------- #
+    # Methods
+    # ------------------------------------------------------------------------- #
+
+    def get(self, name: str, default: Any = None) -> Any:  # type:ignore
+        value = self._element.get(name)
+        if value is None:
+            return default
+        if name in MULTI_VALUED_ATTRIBUTES:
+            return value.split()
+        return value
+
+    def has_attr(self, name: str) -> bool:
+        return name in self._element.attrib
+
+    def get_text(self, separator: str = "", strip: bool = False, **kwargs) -> str:  # type:ignore
+        strings: Iterable[str] = self.stripped_strings if strip else self.strings
+        return separator.join(strings)
+
+    getText = get_text
+
+    def select(self, selector: str, namespaces=None, limit: Optional[int] = None, **kwargs) -> List["LxmlTag"]:  # type:ignore
+        result = [
+            LxmlTag(x)
+            for x in self._element.xpath(css_to_xpath(selector, self._axis))
+        ]
+        return result[:limit] if limit else result
+
+    def select_one(self, selector: str, namespaces=None, **kwargs) -> Optional["LxmlTag"]:  # type:ignore
+        result = self.select(selector, limit=1)
+        return result[0] if result else None
+
+    def _iter_elements(self, recursive: bool) -> Iterator[Any]:
+        # the comments and the other nodes are skipped by lxml
+        if recursive:
+            return self._element.iterdescendants(etree.Element)
+        return iter([x for x in self._element if isinstance(x.tag, str)])
+
+    def find_all(  # type:ignore
+        self,
+        name: Any = None,
+        attrs: Any = {},
+        recursive: bool = True,
+        string: Any = None,
+        limit: Optional[int] = None,
+        **kwargs,
+    ) -> List["LxmlTag"]:
+        if name in (None, True) and not attrs and string is None and not kwargs:
+            # all of the tags, e.g. the child tags in the cleaner
+            tags = [LxmlTag(x) for x in self._iter_elements(recursive)]
+            return tags[:limit] if limit else tags
+        match = _TagFilter(name, attrs, string, kwargs)
+        result: List[LxmlTag] = []
+        for element in self._iter_elements(recursive):
+            if match(element):
+                result.append(LxmlTag(element))
+                if limit and len(result) >= limit:
+                    break
+        return result
+
+    findAll = find_all
+
+    def find(self, name: Any = None, attrs: Any = {}, recursive: bool = True, string: Any = None, **kwargs) -> Optional["LxmlTag"]:  # type:ignore
+        result = self.find_all(name, attrs, recursive, string, limit=1, **kwargs)
+        return result[0] if result else None
+
+    def find_next_sibling(self, name: Any = None, attrs: Any = {}, string: Any = None, **kwargs) -> Optional["LxmlTag"]:  # type:ignore
+        match = _TagFilter(name, attrs, string, kwargs)
+        for element in self._element.itersiblings():
+            if _is_element(element) and match(element):
+                return LxmlTag(element)
+        return None
+
+    def find_previous_sibling(self, name: Any = None, attrs: Any = {}, string: Any = None, **kwargs) -> Optional["LxmlTag"]:  # type:ignore
+        match = _TagFilter(name, attrs, string, kwargs)
+        for element in self._element.itersiblings(preceding=True):
+            if _is_element(element) and match(element):
+                return LxmlTag(element)
+        return None
+
+    def extract(self, _self_index: Optional[int] = None) -> "LxmlTag":  # type:ignore
+        """Remove the tag from the tree, keeping the text that follows it"""
+        element = self._element
+        parent = element.getparent()
+        if parent is not None:
+            if element.tail:
+                previous = element.getprevious()
+                if previous is not None:
+                    previous.tail = (previous.tail or "") + element.tail
+                else:
+                    parent.text = (parent.text or "") + element.tail
+            element.tail = None
+            parent.remove(element)
+        return self
+
+    def decompose(self) -> None:
+        self.extract()
+
+    def decode(self, *args, **kwargs) -> str:  # type:ignore
+        return _serialize(self._element)
+
+    def decode_contents(self, *args, **kwargs) -> str:  # type:ignore
+        element = self._element
+        html = _escape(element.text or "")
+        for child in element:
+            if _is_element(child) or isinstance(child, etree._Comment):
+                html += _serialize(child)
+            html += _escape(child.tail or "")
+        return html
+
+    def prettify(self, *args, **kwargs) -> str:  # type:ignore
+        return self.decode()
+
+
+class LxmlSoup(LxmlTag, BeautifulSoup):
+    """A BeautifulSoup document backed by an lxml tree. See `LxmlTag`.
+
+    Args:
+    - html (Union[str, bytes]): The html document.
+    - encoding (str, optional): The encoding of the bytes. Default: utf-8.
+    """
+
+    # the root <html> can be found in the soup as well
+    _axis = "descendant-or-self::"
+
+    def __init__(self, html: Union[str, bytes], encoding: Optional[str] = None) -> None:
+        if isinstance(html, str):
+            html, encoding = html.encode("utf8"), "utf8"
+        root = self._parse(html, encoding or "utf8")
+        super().__init__(root)
+        self.name = self.ROOT_TAG_NAME
+        # lxml makes the python object of an element again on each read,
+        # unless one is alive, so they are kept as long as the soup is
+        self._elements = list(root.iter())
+
+    @staticmethod
+    def _parse(html: bytes, encoding: str) -> Any:
+        try:
+            # the plain etree parser, as the class lookup of lxml.html runs
+            # in python for each element the soup reads
+            parser = etree.HTMLParser(encoding=encoding)
+        except LookupError:
+            # libxml2 does not know all the encodings python does
+            return LxmlSoup._parse(html.decode(encoding, "ignore").encode("utf8"), "utf8")
+        root = etree.fromstring(html, parser=parser)
+        if root is None:
+            root = etree.fromstring(b"<html><body></body></html>", parser=parser)
+        if any(
+            error.type == etree.ErrorTypes.ERR_INVALID_ENCODING for error in parser.error_log
+        ):
+            # libxml2 stops at the invalid bytes, instead of skipping them
+            return LxmlSoup._parse(html.decode(encoding, "ignore").encode("utf8"), "utf8")
+        return root
+
+    @property  # type:ignore
+    def parent(self) -> None:
+        return None
+
+    @property
+    def children(self) -> Iterator[Any]:  # type:ignore
+        yield LxmlTag(self._element)
+
+    def _iter_elements(self, recursive: bool) -> Iterator[Any]:
+        yield self._element
+        if recursive:
+            yield from super()._iter_elements(recursive)
+
+    def decode(self, *args, **kwargs) -> str:  # type:ignore
+        return _serialize(self._element)
+
+    def decode_contents(self, *args, **kwargs) -> str:  # type:ignore
+        return _serialize(self._element)
+
+    def extract(self, _self_index: Optional[int] = None) -> "LxmlSoup":  # type:ignore
+        return self
+
+
+class _NotSupported:
+    """A member of the BeautifulSoup classes which is not implemented on the lxml tree"""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        raise NotImplementedError(
+            f"{owner.__name__}.{self.name} is not supported, use the bs4 soup backend"
+        )
+
+
+def _block_not_supported(cls: type, base: type) -> None:
+    # the methods of the base would run on the missing attributes of the
+    # BeautifulSoup tree, so they raise instead of returning a wrong result
+    own = [vars(x) for x in cls.__mro__ if x not in base.__mro__]
+    for name in dir(base):
+        if name.startswith("_") or name.isupper() or any(name in x for x in own):
+            continue
+        member = _NotSupported()
+        member.__set_name__(cls, name)
+        setattr(cls, name, member)
+
+
+_block_not_supported(LxmlTag, Tag)
+_block_not_supported(LxmlSoup, BeautifulSoup)
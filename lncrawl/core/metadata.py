@@ -1,33 +1,176 @@
 import json
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from .. import constants as C
-from ..models import Chapter, MetaInfo, Novel, Session
+from ..models import Chapter, MetaInfo, Novel, NovelUpdate, Session
 from .sources import prepare_crawler
 
 logger = logging.getLogger(__name__)
 
 
+def read_metadata_file(meta_file: Path) -> MetaInfo:
+    """Read the snapshot of the metadata, and apply the records of its journal"""
+    with open(meta_file, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    journal_file = meta_file.with_name(C.META_JOURNAL_FILE_NAME)
+    if journal_file.is_file():
+        __apply_journal(data, journal_file)
+    return MetaInfo(**data)
+
+
+def __apply_journal(data: Dict[str, Any], journal_file: Path) -> None:
+    session = data.get("session") or {}
+    novel = data.get("novel") or {}
+    chapters = {chapter["id"]: chapter for chapter in novel.get("chapters") or []}
+    with open(journal_file, "r", encoding="utf-8") as fp:
+        for index, line in enumerate(fp):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # the last record was not written completely
+            if index == 0:
+                if record.get("snapshot_id") != data.get("snapshot_id"):
+                    return  # the journal of an older snapshot
+                continue
+            session.update(record.get("session") or {})
+            for chapter_id, state in (record.get("chapters") or {}).items():
+                chapter = chapters.get(int(chapter_id))
+                if chapter:
+                    chapter.update(state)
+
+
 def get_metadata_list(output_path: str) -> Iterable[MetaInfo]:
     for meta_file in Path(output_path).glob("**/" + C.META_FILE_NAME):
         try:
-            with open(meta_file, "r", encoding="utf-8") as fp:
-                data = json.load(fp)
-                yield MetaInfo(**data)
+            yield read_metadata_file(meta_file)
         except Exception as e:
             logger.debug("Failed to read file %s | %s", meta_file, e)
     yield from ()
 
 
-def save_metadata(app, completed=False):
-    from .app import App
-    if not isinstance(app, App) or not app.crawler:
-        return
+class MetadataJournal(object):
+    """Saves the metadata of a novel as a snapshot and a journal of changes.
+
+    The snapshot is the `meta.json` file, and it is replaced atomically.
+    Between the snapshots, only the changes of the session and of the
+    success flags and images of the chapters are appended to the journal.
+    A new snapshot is written when the novel changes, when the download is
+    completed, or when the journal has `compact_every` records.
+
+    Args:
+    - output_path (str): Output path of the novel.
+    - compact_every (int, optional): Number of records to write a new snapshot after. Default: 200.
+    """
+
+    def __init__(self, output_path: str, compact_every: int = 200) -> None:
+        self.output_path = output_path
+        self.compact_every = compact_every
+        self.meta_file = Path(output_path) / C.META_FILE_NAME
+        self.journal_file = Path(output_path) / C.META_JOURNAL_FILE_NAME
+        self._snapshot_id: Optional[int] = None
+        self._novel_key: Optional[Tuple] = None
+        self._session: Dict[str, Any] = {}
+        self._chapters: Dict[int, Tuple[bool, Dict[str, str]]] = {}
+        self._records = 0
+
+    def save(self, app, completed=False, compact=False) -> None:
+        from .app import App
+        assert isinstance(app, App) and app.crawler, "Invalid app instance"
+
+        session = self.__make_session(app, completed)
+        if (
+            compact
+            or completed
+            or self._snapshot_id is None
+            or self._records >= self.compact_every
+            or self._novel_key != self.__make_novel_key(app)
+        ):
+            self.__write_snapshot(app, session)
+            return
+
+        record: Dict[str, Any] = {}
+        session_data = session.to_dict()
+        changes = {
+            key: value
+            for key, value in session_data.items()
+            if self._session.get(key) != value
+        }
+        if changes:
+            record["session"] = changes
 
-    novel = MetaInfo(
-        session=Session(
+        chapters: Dict[str, Dict[str, Any]] = {}
+        for chapter in app.crawler.chapters:
+            state = (bool(chapter.success), dict(chapter.images or {}))
+            if self._chapters.get(chapter.id) != state:
+                self._chapters[chapter.id] = state
+                chapters[str(chapter.id)] = dict(success=state[0], images=state[1])
+        if chapters:
+            record["chapters"] = chapters
+
+        if not record:
+            return
+
+        with open(self.journal_file, "a", encoding="utf-8") as fp:
+            if self._records == 0:
+                fp.write(json.dumps(dict(snapshot_id=self._snapshot_id)) + "\n")
+            fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._session = session_data
+        self._records += 1
+
+    def __write_snapshot(self, app, session: Session) -> None:
+        snapshot_id = time.time_ns()
+        meta = MetaInfo(
+            session=session,
+            novel=Novel(
+                url=app.crawler.novel_url,
+                title=app.crawler.novel_title,
+                authors=[x.strip() for x in app.crawler.novel_author.split(",")],
+                cover_url=app.crawler.novel_cover,
+                synopsis=app.crawler.novel_synopsis,
+                language=app.crawler.language,
+                tags=app.crawler.novel_tags,
+                volumes=app.crawler.volumes,
+                chapters=[Chapter.without_body(chap) for chap in app.crawler.chapters],
+                is_rtl=app.crawler.is_rtl,
+            ),
+            snapshot_id=snapshot_id,
+        )
+
+        self.meta_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.meta_file.with_name(C.META_FILE_NAME + ".tmp")
+        meta.to_json(temp_file, encoding="utf-8")
+        os.replace(temp_file, self.meta_file)
+        if self.journal_file.is_file():
+            self.journal_file.unlink()
+
+        self._snapshot_id = snapshot_id
+        self._novel_key = self.__make_novel_key(app)
+        self._session = session.to_dict()
+        self._chapters = {
+            chapter.id: (bool(chapter.success), dict(chapter.images or {}))
+            for chapter in app.crawler.chapters
+        }
+        self._records = 0
+
+    def __make_novel_key(self, app) -> Tuple:
+        crawler = app.crawler
+        return (
+            crawler.novel_url,
+            crawler.novel_title,
+            crawler.novel_author,
+            crawler.novel_cover,
+            id(crawler.chapters),
+            len(crawler.chapters),
+            id(crawler.volumes),
+            len(crawler.volumes),
+        )
+
+    def __make_session(self, app, completed: bool) -> Session:
+        return Session(
             completed=completed,
             user_input=app.user_input or '',
             login_data=app.login_data,
@@ -46,6 +189,7 @@ def save_metadata(app, completed=False):
             fetch_content_progress=app.fetch_chapter_progress,
             fetch_images_progress=app.fetch_images_progress,
             binding_progress=app.binding_progress,
+            novel_update=app.novel_update,
             cookies={
                 k: v for k, v in app.crawler.cookies.items() if v
             },
@@ -53,27 +197,21 @@ def save_metadata(app, completed=False):
                 k: (v if isinstance(v, str) else bytes(v).decode())
                 for k, v in app.crawler.headers.items()
             },
-        ),
-        novel=Novel(
-            url=app.crawler.novel_url,
-            title=app.crawler.novel_title,
-            authors=[x.strip() for x in app.crawler.novel_author.split(",")],
-            cover_url=app.crawler.novel_cover,
-            synopsis=app.crawler.novel_synopsis,
-            language=app.crawler.language,
-            tags=app.crawler.novel_tags,
-            volumes=app.crawler.volumes,
-            chapters=[Chapter.without_body(chap) for chap in app.crawler.chapters],
-            is_rtl=app.crawler.is_rtl,
-        ),
-    )
+        )
+
+
+def save_metadata(app, completed=False, compact=False):
+    from .app import App
+    if not isinstance(app, App) or not app.crawler:
+        return
 
+    journal = app.metadata_journal
+    if not journal or journal.output_path != app.output_path:
+        journal = app.metadata_journal = MetadataJournal(app.output_path)
     try:
-        Path(app.output_path).mkdir(parents=True, exist_ok=True)
-        file_name = Path(app.output_path) / C.META_FILE_NAME
-        novel.to_json(file_name, encoding="utf-8", indent=2)
-    except Exception:
-        pass
+        journal.save(app, completed, compact)
+    except Exception as e:
+        logger.debug("Failed to save metadata | %s", e)
 
 
 def load_metadata(app, meta: MetaInfo):
@@ -98,6 +236,8 @@ def load_metadata(app, meta: MetaInfo):
     app.fetch_chapter_progress = session.fetch_content_progress
     app.fetch_images_progress = session.fetch_images_progress
     app.binding_progress = session.binding_progress
+    if session.novel_update:
+        app.novel_update = NovelUpdate(**session.novel_update)
 
     logger.info("Novel Url: %s", novel.url)
     if not app.crawler:
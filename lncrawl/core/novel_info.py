@@ -69,3 +69,4 @@ def format_novel(crawler: Crawler):
     __format_volume(crawler, vol_id_map)
     __format_chapters(crawler, vol_id_map)
     crawler.volumes = [x for x in crawler.volumes if x["chapter_count"] > 0]
+    crawler.reindex_chapters()
@@ -0,0 +1,169 @@
+"""
+To update a downloaded novel with the new chapters only
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..models import Chapter, MetaInfo, NovelUpdate
+from .chapter_store import ChapterStore
+from .crawler import Crawler
+from .metadata import save_metadata
+
+logger = logging.getLogger(__name__)
+
+
+def _chapter_key(chapter: Chapter) -> str:
+    return chapter.url.rstrip("/") or f"#{chapter.id}"
+
+
+def _move_chapters(store: ChapterStore, moves: List[Tuple[Chapter, Chapter]]) -> Set[int]:
+    """Save the stored chapters again by their new id and volume.
+
+    A chapter is read before another one is saved in its place, so the
+    chapters shifted by an insertion are moved one at a time, without
+    keeping them all in memory.
+
+    Returns:
+        The new ids of the chapters that are not found in the store.
+    """
+    pending: Dict[int, Tuple[Chapter, Chapter]] = {old.id: (old, new) for old, new in moves}
+    source_of: Dict[int, int] = {new.id: old.id for old, new in moves}
+    missing: Set[int] = set()
+
+    def _save(new: Chapter, content: Optional[dict]) -> None:
+        if not content:
+            missing.add(new.id)
+            return
+        content.update(id=new.id, volume=new.volume, volume_title=new.volume_title)
+        store.put(Chapter(**content))
+
+    def _move_chain(old_id: Optional[int]) -> None:
+        # move the chapter, then the one that goes in its place
+        while old_id is not None and old_id in pending:
+            old, new = pending.pop(old_id)
+            _save(new, store.get(old))
+            old_id = source_of.get(old.id)
+
+    # the chains end at a chapter moving to a place no other chapter leaves
+    for old_id in [k for k, (_, new) in pending.items() if new.id not in pending]:
+        _move_chain(old_id)
+    # the rest are cycles, one chapter of each is kept in memory
+    while pending:
+        old_id = next(iter(pending))
+        old, new = pending.pop(old_id)
+        content = store.get(old)
+        _move_chain(source_of.get(old.id))
+        _save(new, content)
+
+    store.flush()
+    return missing
+
+
+def diff_chapters(
+    meta: MetaInfo,
+    crawler: Crawler,
+    store: ChapterStore,
+) -> Tuple[NovelUpdate, List[Chapter]]:
+    """Compare the freshly read chapters of the crawler with the saved ones by url.
+
+    The chapters downloaded before keep their success flag, so they are
+    restored from the store instead of being downloaded again. The ones
+    with a new id or volume, e.g. after a chapter is inserted before them,
+    are moved in the store.
+
+    Returns:
+        The changes, and the chapters to download.
+    """
+    assert meta.novel and meta.session, "Invalid metadata"
+
+    old_chapters: Dict[str, Chapter] = {
+        _chapter_key(chapter): chapter
+        for chapter in meta.novel.chapters
+    }
+    selected: Set[int] = set(meta.session.chapters_to_download)
+
+    update = NovelUpdate(added=[], changed=[], moved=[], removed=[], checked_at=time.time())
+    volumes: Set[int] = set()
+    pending: List[Chapter] = []
+    moves: List[Tuple[Chapter, Chapter]] = []
+    for chapter in crawler.chapters:
+        old = old_chapters.pop(_chapter_key(chapter), None)
+        if old is None:
+            update.added.append(chapter.id)
+        elif old.title != chapter.title:
+            update.changed.append(chapter.id)
+        elif old.success:
+            chapter.success = True
+            if old.id != chapter.id or old.volume != chapter.volume:
+                moves.append((old, chapter))
+                volumes.update([old.volume, chapter.volume])
+            continue
+        elif old.id not in selected:
+            continue  # it was never downloaded
+        pending.append(chapter)
+        volumes.add(chapter.volume)
+
+    for old in old_chapters.values():
+        update.removed.append(old.url)
+        volumes.add(old.volume)
+
+    if moves:
+        missing = _move_chapters(store, moves)
+        for old, chapter in moves:
+            if chapter.id in missing:
+                chapter.success = False
+                pending.append(chapter)
+            else:
+                update.moved.append(chapter.id)
+        pending.sort(key=lambda x: x.id)
+
+    update.volumes = sorted(x for x in volumes if x is not None)
+    logger.info(
+        "Update: %d added, %d changed, %d moved, %d removed, %d volumes affected",
+        len(update.added),
+        len(update.changed),
+        len(update.moved),
+        len(update.removed),
+        len(update.volumes),
+    )
+    return update, pending
+
+
+def get_updated_chapters(app) -> List[Chapter]:
+    """All chapters of the novel after the update, which are downloaded
+    before or are being downloaded now."""
+    from .app import App
+    assert isinstance(app, App) and app.crawler, "Invalid app instance"
+
+    pending = set(chapter.id for chapter in app.chapters)
+    return [
+        chapter
+        for chapter in app.crawler.chapters
+        if chapter.success or chapter.id in pending
+    ]
+
+
+def get_chapters_to_bind(app) -> List[Chapter]:
+    """The chapters of the books affected by the update. These are all downloaded
+    chapters if the novel is bound as a single book, otherwise only the
+    chapters of the affected volumes."""
+    assert app.novel_update, "No update to bind"
+
+    chapters = get_updated_chapters(app)
+    if app.pack_by_volume:
+        volumes = set(app.novel_update.volumes)
+        chapters = [x for x in chapters if x.volume in volumes]
+    return chapters
+
+
+def finish_update(app, chapters: List[Chapter]) -> None:
+    """Forget the update once its books are bound, so that the next runs
+    use all of the chapters instead of the ones affected by the update."""
+    from .app import App
+    assert isinstance(app, App), "Invalid app instance"
+
+    app.chapters = chapters
+    app.novel_update = None
+    save_metadata(app)
@@ -0,0 +1,84 @@
+"""
+Process pool to parse and clean the chapter pages outside of the GIL
+"""
+
+import atexit
+import hashlib
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from .cleaner import TextCleaner
+from .soup import SoupMaker
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+# cleaners created in the worker process, by the digest of their settings
+_cleaners: Dict[bytes, TextCleaner] = {}
+
+
+def parse_processes() -> int:
+    """Number of processes to parse the chapters in, or 0 if it is disabled"""
+    return int(os.getenv("parse_processes") or 0)
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process-wide pool to parse the chapters, or None if it is disabled"""
+    global _pool
+    workers = parse_processes()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # forking a process with running threads may deadlock
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if sys.version_info >= (3, 9):
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            else:
+                atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def dump_cleaner_config(cleaner: TextCleaner) -> bytes:
+    """Serialize the settings of a cleaner to be sent to `clean_chapter_page`"""
+    return pickle.dumps(cleaner.get_config())
+
+
+def clean_chapter_page(
+    page: bytes,
+    parser: str,
+    backend: str,
+    selector: str,
+    cleaner_config: bytes,
+    encoding: str,
+) -> str:
+    """Parse the page, select the chapter body and return the clean html.
+    It runs in a worker process of the parse pool.
+
+    Args:
+        page: The raw content of the chapter page.
+        parser: The parser to use with BeautifulSoup.
+        backend: The soup backend of the crawler, see `SoupMaker`.
+        selector: CSS selector of the tag containing the chapter text.
+        cleaner_config: The value returned by `dump_cleaner_config`.
+        encoding: The encoding of the page, see `CharsetResolver.resolve`.
+    """
+    key = hashlib.sha1(cleaner_config).digest()
+    cleaner = _cleaners.get(key)
+    if cleaner is None:
+        config: Dict[str, Any] = pickle.loads(cleaner_config)
+        cleaner = TextCleaner.from_config(config)
+        _cleaners[key] = cleaner
+
+    soup = SoupMaker(parser, backend).make_soup(page, encoding)
+    body = soup.select_one(selector)
+    assert body
+    return cleaner.extract_contents(body)
@@ -0,0 +1,204 @@
+"""
+A staged pipeline with bounded queues between the stages
+"""
+
+import logging
+import time
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
+
+from .exeptions import LNException
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class PipelineJob(object):
+    """An item moving through the stages, with the error that stopped it"""
+
+    def __init__(self, index: int, item: Any) -> None:
+        self.index = index
+        self.item = item
+        self.error: Optional[BaseException] = None
+
+
+class PipelineStage(object):
+    """A stage of the pipeline run by a pool of threads.
+
+    Every thread takes a job from the input queue, applies `fn` on its item
+    and puts the job to the next stage. The input queue is bounded, so a slow
+    stage holds back the stages before it instead of piling up the items.
+
+    Args:
+    - name (str): Name of the stage, used in the stats.
+    - fn (Callable): Takes the item of a job and returns the new item.
+    - workers (int, optional): Number of threads. Default: 1.
+    - queue_size (int, optional): Capacity of the input queue. Default: twice the workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue: Queue = Queue(maxsize=queue_size or 2 * self.workers)
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self._lock = Lock()
+        self._running = 0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        """The throughput and the load of the stage"""
+        return dict(
+            workers=self.workers,
+            processed=self.processed,
+            failed=self.failed,
+            throughput=round(self.processed / elapsed, 2) if elapsed > 0 else 0,
+            utilization=round(self.busy_time / (elapsed * self.workers), 2) if elapsed > 0 else 0,
+            queue=self.queue.qsize(),
+            queue_size=self.queue.maxsize,
+        )
+
+    def start(self, output: Queue, stop: Event) -> None:
+        self._running = self.workers
+        for i in range(self.workers):
+            Thread(
+                target=self._work,
+                args=(output, stop),
+                name=f"lncrawl_{self.name}_{i}",
+                daemon=True,
+            ).start()
+
+    def _work(self, output: Queue, stop: Event) -> None:
+        while True:
+            job = _get(self.queue, stop)
+            if job is None:
+                break
+            if job is _STOP:
+                _put(self.queue, _STOP, stop)  # for the other threads
+                break
+            if job.error is None:
+                start = time.monotonic()
+                try:
+                    job.item = self.fn(job.item)
+                except BaseException as e:
+                    job.error = e
+                elapsed = time.monotonic() - start
+                with self._lock:
+                    self.processed += 1
+                    self.busy_time += elapsed
+                    if job.error is not None:
+                        self.failed += 1
+            if not _put(output, job, stop):
+                break
+        with self._lock:
+            self._running -= 1
+            if self._running > 0:
+                return
+        # the last thread removes the stop marker, and closes the next stage
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        _put(output, _STOP, stop)
+
+
+class Pipeline(object):
+    """Run items through a chain of stages, and yield them as they complete.
+
+    Example:
+        pipeline = Pipeline([
+            PipelineStage("fetch", fetch, workers=10),
+            PipelineStage("parse", parse, workers=4),
+            PipelineStage("persist", persist),
+        ])
+        for item in pipeline.run(items):
+            ...
+    """
+
+    def __init__(self, stages: List[PipelineStage]) -> None:
+        if not stages:
+            raise LNException("Pipeline needs at least one stage")
+        self.stages = stages
+        self._started_at: Optional[float] = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """The stats of every stage, to find the bottleneck"""
+        if self._started_at is None:
+            return {}
+        elapsed = time.monotonic() - self._started_at
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+    def report(self) -> str:
+        """The stats of every stage in a single line"""
+        return " | ".join(
+            f"{name}: {s['processed']} done, {s['throughput']}/s, "
+            f"{round(100 * s['utilization'])}% busy, queue {s['queue']}/{s['queue_size']}"
+            for name, s in self.stats().items()
+        )
+
+    def run(
+        self,
+        items: Iterable[Any],
+        signal=Event(),
+    ) -> Generator[PipelineJob, None, None]:
+        """Feed the items to the first stage and yield the finished jobs.
+        The jobs are yielded in the order of completion, including the failed ones.
+        All stages are stopped when the generator is closed.
+
+        Args:
+            items: The items to process. They are read lazily.
+            signal: Cancels the pipeline when set.
+        """
+        stop = Event()
+        output: Queue = Queue()
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.start(next_stage.queue, stop)
+        self.stages[-1].start(output, stop)
+        self._started_at = time.monotonic()
+
+        def _feed() -> None:
+            first = self.stages[0]
+            for index, item in enumerate(items):
+                if not _put(first.queue, PipelineJob(index, item), stop):
+                    return
+            _put(first.queue, _STOP, stop)
+
+        Thread(target=_feed, name="lncrawl_pipeline_feed", daemon=True).start()
+        try:
+            while not signal.is_set():
+                try:
+                    job = output.get(timeout=0.5)
+                except Empty:
+                    continue
+                if job is _STOP:
+                    break
+                yield job
+        finally:
+            stop.set()
+            logger.info("Pipeline: %s", self.report())
+
+
+def _put(queue: Queue, item: Any, stop: Event) -> bool:
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.5)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _get(queue: Queue, stop: Event) -> Any:
+    while not stop.is_set():
+        try:
+            return queue.get(timeout=0.5)
+        except Empty:
+            pass
+    return None
@@ -1,21 +1,31 @@
+import asyncio
 import base64
 import logging
 import os
 import re
+from contextlib import contextmanager
+from functools import partial
 from io import BytesIO
-from typing import Any, Callable, Dict, MutableMapping, Optional, Tuple, Union
+from typing import (Any, Callable, Dict, Generator, MutableMapping, Optional,
+                    Tuple, Union)
 from urllib.parse import ParseResult, urlparse
 
 from bs4 import BeautifulSoup
 from ..cloudscraper import create_scraper
+from ..cloudscraper.exceptions import CloudflareException
 from PIL import Image, UnidentifiedImageError
 from requests import Response, Session
 from requests.exceptions import ProxyError
 from requests.structures import CaseInsensitiveDict
-from tenacity import (RetryCallState, retry, retry_if_exception_type,
-                      stop_after_attempt, wait_random_exponential)
-
-from .exeptions import RetryErrorGroup
+from tenacity import (RetryCallState, retry, retry_if_exception,
+                      retry_if_exception_type, stop_after_attempt,
+                      wait_random_exponential)
+
+from ..utils.circuit import CircuitBreaker
+from ..utils.concurrency import is_host_failure
+from .charset import get_charset_resolver
+from .exeptions import CircuitOpenError, RetryErrorGroup
+from .http_cache import get_response_cache
 from .proxy import get_a_proxy, remove_faulty_proxies
 from .soup import SoupMaker
 from .taskman import TaskManager
@@ -24,6 +34,34 @@ logger = logging.getLogger(__name__)
 
 
 class Scraper(TaskManager, SoupMaker):
+    # Keep the GET responses in the http cache. Enable it only for the sources
+    # serving the same pages to everyone, as the cached pages are shared by all
+    # the sessions having the same cookies and authorization.
+    use_http_cache: bool = False
+
+    # Seconds to serve a cached page without revalidating it with the server
+    http_cache_ttl: float = 3600
+
+    # Pattern of the names of the cookies identifying the logged in user, which
+    # are kept in the key of the cached pages along with the authorization.
+    # The other cookies, e.g. the rotating ones of cloudflare, are ignored.
+    http_cache_cookies: str = r"auth|login|logged_?in|token|remember"
+
+    # Keep the downloaded images in the image cache. Enable it only for the sources
+    # serving the same images to everyone, as the cached images are looked up by url.
+    use_image_cache: bool = False
+
+    # Send the https requests over HTTP/2, bypassing the cloudscraper session.
+    # Enable it only for the sources that do not need cloudflare challenges solved.
+    use_http2: bool = False
+
+    # Number of concurrent requests multiplexed over a HTTP/2 connection
+    http2_max_streams: int = 32
+
+    # Backend of the soups: "bs4" or "lxml". The lxml backend skips building the
+    # BeautifulSoup tree, but supports only the common subset of its methods.
+    soup_backend: str = "bs4"
+
     # ------------------------------------------------------------------------- #
     # Initializers
     # ------------------------------------------------------------------------- #
@@ -63,10 +101,21 @@ class Scraper(TaskManager, SoupMaker):
     def close(self) -> None:
         if hasattr(self, "scraper"):
             self.scraper.close()
+        if hasattr(self, "_http2_session"):
+            self._http2_session.close()
+        if hasattr(self, "_async_client"):
+            del self._async_client  # the event loop owning it is already gone
         super().close()
 
+    async def close_async(self) -> None:
+        """Close the async client of the running event loop"""
+        if hasattr(self, "_async_client"):
+            client = self._async_client
+            del self._async_client
+            await client.aclose()
+
     def init_parser(self, parser: Optional[str] = None):
-        self._soup_tool = SoupMaker(parser)
+        self._soup_tool = SoupMaker(parser, backend=self.soup_backend)
         self.make_tag = self._soup_tool.make_tag  # type:ignore
         self.make_soup = self._soup_tool.make_soup  # type:ignore
 
@@ -78,6 +127,8 @@ class Scraper(TaskManager, SoupMaker):
                 # debug=True,  # Enable for monitoring (disable in production)
 
                 # KEY SETTINGS to prevent 403 errors
+                # The hosts with a ratelimit set by `init_executor` are paced by
+                # `rate_gate` instead, see `__pace_scraper`.
                 min_request_interval=2.0,      # CRITICAL: Prevents TLS blocking
                 max_concurrent_requests=1,     # CRITICAL: Prevents concurrent conflicts
                 rotate_tls_ciphers=True,       # CRITICAL: Avoids cipher detection
@@ -109,15 +160,94 @@ class Scraper(TaskManager, SoupMaker):
             logger.exception("Failed to initialize cloudscraper")
             self.scraper = session or Session()
 
+        if self.use_http2:
+            from .http2 import create_http2_session
+
+            try:
+                self._http2_session = create_http2_session(
+                    self.scraper,
+                    max_streams=self.http2_max_streams,
+                )
+            except Exception:
+                logger.exception("Failed to initialize HTTP/2 session")
+
     # ------------------------------------------------------------------------- #
     # Internal methods
     # ------------------------------------------------------------------------- #
 
+    def __get_session(self, parsed_url: ParseResult) -> Session:
+        if (
+            parsed_url.scheme == "https"
+            and not self.use_proxy
+            and hasattr(self, "_http2_session")
+        ):
+            # the hosts answering over HTTP/1.1 are requested with the cloudscraper
+            adapter = self._http2_session.get_adapter("https://")
+            if adapter.http_version(parsed_url.hostname) in (None, "HTTP/2"):
+                return self._http2_session
+        return self.scraper
+
+    def __widen_domain_gate(self, hostname: Optional[str], response: Any) -> None:
+        # let more requests in once the host answers over HTTP/2, as they share
+        # the connection. only the first call widens it, the window is adapted after that.
+        if getattr(response, "http_version", None) != "HTTP/2":
+            return
+        self._get_domain_semaphore(hostname).resize(
+            maximum=self.http2_max_streams,
+            initial=self.http2_max_streams // 2,
+        )
+
+    def __pace_scraper(self, hostname: Optional[str]) -> None:
+        # the cloudscraper keeps its own interval and delays between the requests
+        # of a host, unless they are already paced by the ratelimit of the crawler
+        pacer = getattr(self.scraper, "pacer", None)
+        if pacer:
+            pacer.set_paced(hostname, self._get_rate_limiter(hostname) is None)
+
     def __get_proxies(self, scheme, timeout: float = 0):
         if self.use_proxy and scheme:
             return {scheme: get_a_proxy(scheme, timeout)}
         return {}
 
+    def __retry_condition(self, breaker: CircuitBreaker):
+        def _withdraw(e: BaseException) -> bool:
+            if breaker.budget.withdraw():
+                return True
+            logger.debug(f"Retry budget of {breaker.name} is exhausted")
+            return False
+
+        return retry_if_exception_type(RetryErrorGroup) & retry_if_exception(_withdraw)
+
+    def __check_circuit(self, breaker: CircuitBreaker) -> None:
+        if not breaker.allow_request():
+            raise CircuitOpenError(
+                f"Circuit of {breaker.name} is {breaker.state}. "
+                f"Retry after {breaker.retry_after():.0f} seconds."
+            )
+
+    def __cache_identity(self, headers: MutableMapping) -> str:
+        # the pages may differ for each user, so they are never shared
+        pattern = re.compile(self.http_cache_cookies, re.I)
+        cookies = [
+            f"{x.domain}/{x.name}={x.value}"
+            for x in self.scraper.cookies
+            if pattern.search(x.name)
+        ]
+        for cookie in str(headers.get("Cookie") or "").split(";"):
+            name = cookie.split("=", 1)[0].strip()
+            if name and pattern.search(name):
+                cookies.append(cookie.strip())
+        return "\n".join([str(headers.get("Authorization") or ""), *sorted(cookies)])
+
+    def __record_outcome(self, breaker: CircuitBreaker, error: Optional[BaseException]) -> None:
+        if isinstance(error, ProxyError) or (error is not None and not isinstance(error, Exception)):
+            # the proxy failed, or the request was cancelled or interrupted
+            breaker.record_ignored()
+        elif isinstance(error, CloudflareException) or is_host_failure(error):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
     def __process_request(
         self,
         method: str,
@@ -125,14 +255,15 @@ class Scraper(TaskManager, SoupMaker):
         *args,
         max_retries: Optional[int] = None,
         headers: Optional[MutableMapping] = {},
+        use_cache: bool = False,
         **kwargs,
     ):
-        method_call: Callable[..., Response] = getattr(self.scraper, method)
+        _parsed = urlparse(url)
+
+        method_call: Callable[..., Response] = getattr(self.__get_session(_parsed), method)
         if not callable(method_call):
             raise Exception(f"No request method: {method}")
 
-        _parsed = urlparse(url)
-
         kwargs = kwargs or dict()
         kwargs.setdefault("allow_redirects", True)
         kwargs["proxies"] = self.__get_proxies(_parsed.scheme)
@@ -141,6 +272,26 @@ class Scraper(TaskManager, SoupMaker):
         headers.setdefault("Origin", self.home_url.strip("/"))
         headers.setdefault("Referer", self.last_soup_url or self.home_url)
 
+        cache = None
+        cache_key = ""
+        cache_entry = None
+        if use_cache and method == "get" and not kwargs.get("stream"):
+            cache = get_response_cache()
+        if cache:
+            try:
+                cache_key = cache.make_key(url, headers.get("Accept"), self.__cache_identity(headers))
+                cache_entry = cache.get(cache_key)
+                if cache_entry and cache_entry.is_fresh(self.http_cache_ttl):
+                    logger.debug(f"[CACHED] {url}")
+                    return cache.load(cache_entry)
+                if cache_entry and cache_entry.etag:
+                    headers.setdefault("If-None-Match", cache_entry.etag)
+                if cache_entry and cache_entry.last_modified:
+                    headers.setdefault("If-Modified-Since", cache_entry.last_modified)
+            except Exception as e:
+                logger.debug(f"Failed to read http cache: {e}")
+                cache = None
+
         def _after_retry(retry_state: RetryCallState):
             future = retry_state.outcome
             if future:
@@ -152,37 +303,171 @@ class Scraper(TaskManager, SoupMaker):
                             remove_faulty_proxies(proxy_url)
                         kwargs["proxies"] = self.__get_proxies(_parsed.scheme, 5)
 
+        breaker = self.host_breaker(_parsed.hostname)
+        breaker.budget.deposit()
+
         @retry(
             stop=stop_after_attempt(max_retries or 0),
             wait=wait_random_exponential(multiplier=0.5, max=60),
-            retry=retry_if_exception_type(RetryErrorGroup),
+            retry=self.__retry_condition(breaker),
             after=_after_retry,
             reraise=True,
         )
         def _do_request():
-            with self.domain_gate(_parsed.hostname):
-                response = method_call(
+            self.__check_circuit(breaker)
+            self.rate_gate(_parsed.hostname)
+            self.__pace_scraper(_parsed.hostname)
+            error: Optional[BaseException] = None
+            try:
+                with self.domain_gate(_parsed.hostname):
+                    response = method_call(
+                        url,
+                        *args,
+                        **kwargs,
+                        headers=headers,
+                    )
+                    response.raise_for_status()
+                    response.encoding = get_charset_resolver().response_encoding(response.headers, url)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                # always release the probe of a half-open circuit
+                self.__record_outcome(breaker, error)
+
+            self.cookies.update({x.name: x.value for x in response.cookies})
+            return response
+
+        logger.debug(
+            f"[{method.upper()}] {url}\n"
+            + "\n".join([f"    {k} = {v}" for k, v in kwargs.items()])
+        )
+        response = _do_request()
+        self.__widen_domain_gate(_parsed.hostname, response)
+
+        if cache:
+            try:
+                if cache_entry and response.status_code == 304:
+                    logger.debug(f"[NOT MODIFIED] {url}")
+                    return cache.revalidated(cache_entry, response)
+                if response.status_code == 200:
+                    cache.put(cache_key, response)
+            except Exception as e:
+                logger.debug(f"Failed to update http cache: {e}")
+
+        return response
+
+    def __get_async_client(self):
+        loop = asyncio.get_running_loop()
+        if hasattr(self, "_async_client"):
+            if self._async_loop is loop and not self._async_client.is_closed:
+                return self._async_client
+
+        from .async_client import create_async_client
+
+        self._async_loop = loop
+        self._async_client = create_async_client(
+            self.scraper.cookies,
+            http2=self.use_http2,
+        )
+        return self._async_client
+
+    async def __process_request_async(
+        self,
+        method: str,
+        url: str,
+        *args,
+        max_retries: Optional[int] = None,
+        headers: Optional[MutableMapping] = {},
+        **kwargs,
+    ):
+        if self.use_proxy:
+            # proxies are only supported by the sync session
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                partial(
+                    self.__process_request,
+                    method,
                     url,
                     *args,
-                    **kwargs,
+                    max_retries=max_retries,
                     headers=headers,
-                )
-                response.raise_for_status()
-                response.encoding = "utf8"
+                    **kwargs,
+                ),
+            )
 
-            self.cookies.update({x.name: x.value for x in response.cookies})
+        from .async_client import (httpx, prepare_async_kwargs,
+                                   to_request_exception)
+
+        client = self.__get_async_client()
+        _parsed = urlparse(url)
+
+        kwargs = kwargs or dict()
+        kwargs.setdefault("allow_redirects", True)
+        kwargs = prepare_async_kwargs(kwargs)
+
+        headers = CaseInsensitiveDict(headers)
+        headers.setdefault("Origin", self.home_url.strip("/"))
+        headers.setdefault("Referer", self.last_soup_url or self.home_url)
+        merged_headers = CaseInsensitiveDict(self.scraper.headers)
+        merged_headers.update(headers)
+        request_headers = {
+            k: v for k, v in merged_headers.items() if v is not None
+        }
+
+        breaker = self.host_breaker(_parsed.hostname)
+        breaker.budget.deposit()
+
+        @retry(
+            stop=stop_after_attempt(max_retries or 0),
+            wait=wait_random_exponential(multiplier=0.5, max=60),
+            retry=self.__retry_condition(breaker),
+            reraise=True,
+        )
+        async def _do_request():
+            self.__check_circuit(breaker)
+            await self.rate_gate_async(_parsed.hostname)
+            error: Optional[BaseException] = None
+            try:
+                async with self.domain_gate_async(_parsed.hostname):
+                    try:
+                        response = await client.request(
+                            method.upper(),
+                            url,
+                            *args,
+                            **kwargs,
+                            headers=request_headers,
+                        )
+                        response.raise_for_status()
+                    except httpx.HTTPError as e:
+                        raise to_request_exception(e) from e
+                    response.encoding = get_charset_resolver().response_encoding(response.headers, url)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                # always release the probe of a half-open circuit
+                self.__record_outcome(breaker, error)
             return response
 
         logger.debug(
-            f"[{method.upper()}] {url}\n"
+            f"[{method.upper()}] {url} (async)\n"
             + "\n".join([f"    {k} = {v}" for k, v in kwargs.items()])
         )
-        return _do_request()
+        response = await _do_request()
+        self.__widen_domain_gate(_parsed.hostname, response)
+        return response
 
     # ------------------------------------------------------------------------- #
     # Helpers
     # ------------------------------------------------------------------------- #
 
+    @property
+    def circuit_state(self) -> str:
+        """Circuit state of the host of self.home_url"""
+        return str(self.host_breaker(self.origin.hostname).state)
+
     @property
     def origin(self) -> ParseResult:
         """Parsed self.home_url"""
@@ -235,6 +520,7 @@ class Scraper(TaskManager, SoupMaker):
         self,
         url: str,
         timeout: Optional[Union[float, Tuple[float, float]]] = (7, 301),
+        use_cache: Optional[bool] = None,
         **kwargs,
     ) -> Response:
         """
@@ -247,19 +533,34 @@ class Scraper(TaskManager, SoupMaker):
                 - If a tuple of two floats is provided, the first is used for the connect timeout and the second
                   for the read timeout.
                 - Defaults to (7, 301).
+            - use_cache (Optional[bool]): Serve the response from the http cache, and store it there.
+                - Defaults to `use_http_cache` of the crawler.
             - **kwargs: Additional keyword arguments to pass to the request.
 
         Returns:
             - Response: The response object resulting from the GET request.
         """
+        if use_cache is None:
+            use_cache = self.use_http_cache
         return self.__process_request(
             "get",
             url,
             timeout=timeout,
             max_retries=2,
+            use_cache=use_cache,
             **kwargs,
         )
 
+    @contextmanager
+    def bypass_http_cache(self) -> Generator[None, None, None]:
+        """Fetch the pages from the server inside this context, e.g. to see the latest chapters"""
+        use_http_cache = self.use_http_cache
+        self.use_http_cache = False
+        try:
+            yield
+        finally:
+            self.use_http_cache = use_http_cache
+
     def post_response(
         self,
         url: str,
@@ -464,3 +765,69 @@ class Scraper(TaskManager, SoupMaker):
             **kwargs,
         )
         return self.make_soup(response, encoding)
+
+    # ------------------------------------------------------------------------- #
+    # Async downloaders
+    # ------------------------------------------------------------------------- #
+
+    async def get_response_async(
+        self,
+        url: str,
+        timeout: Optional[Union[float, Tuple[float, float]]] = (7, 301),
+        **kwargs,
+    ):
+        """
+        Same as `get_response`, but runs in the current event loop using httpx.
+
+        The session headers and cookies are shared with the sync scraper.
+        The cloudflare challenges are not solved by this backend, and the
+        requests are delegated to the sync scraper if proxies are in use.
+
+        Returns:
+            - A httpx.Response, or a requests.Response if proxies are in use.
+        """
+        return await self.__process_request_async(
+            "get",
+            url,
+            timeout=timeout,
+            max_retries=2,
+            **kwargs,
+        )
+
+    async def get_json_async(
+        self,
+        url: str,
+        headers: Optional[MutableMapping] = {},
+        **kwargs
+    ) -> Any:
+        """Fetch the content in the event loop and return the content as JSON object"""
+        headers = CaseInsensitiveDict(headers)
+        headers.setdefault(
+            "Accept",
+            "application/json,text/plain,*/*",
+        )
+        response = await self.get_response_async(url, headers=headers, **kwargs)
+        return response.json()
+
+    async def get_soup_async(
+        self,
+        url: str,
+        headers: Optional[MutableMapping] = {},
+        encoding: Optional[str] = None,
+        **kwargs,
+    ) -> BeautifulSoup:
+        """Fetch the content in the event loop and return a BeautifulSoup instance of the page"""
+        headers = CaseInsensitiveDict(headers)
+        headers.setdefault(
+            "Accept",
+            "text/html,application/xhtml+xml,application/xml;q=0.9",
+        )
+        response = await self.get_response_async(
+            url,
+            headers=headers,
+            **kwargs,
+        )
+        self.last_soup_url = url
+        if not encoding:
+            encoding = get_charset_resolver().resolve(response.content, response.headers, str(response.url))
+        return self.make_soup(response.content, encoding)
@@ -5,6 +5,8 @@ from typing import Optional, Union
 from bs4 import BeautifulSoup, Tag
 from requests import Response
 
+from . import lxml_soup
+from .charset import get_charset_resolver
 from .exeptions import LNException
 
 logger = logging.getLogger(__name__)
@@ -12,19 +14,34 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_PARSER = "lxml"
 
+# backends to make the soup with
+BS4_BACKEND = "bs4"
+LXML_BACKEND = "lxml"
+
 
 class SoupMaker(ABC):
     def __init__(
         self,
         parser: Optional[str] = None,
+        backend: Optional[str] = None,
     ) -> None:
         """This is a helper for Beautiful Soup. It is being used as a superclass of the Crawler.
 
         Args:
         - parser (Optional[str], optional): Desirable features of the parser. This can be the name of a specific parser
             ("lxml", "lxml-xml", "html.parser", or "html5lib") or it may be the type of markup to be used ("html", "html5", "xml").
+        - backend (Optional[str], optional): "lxml" to make the soups directly on the lxml tree, which is faster but only
+            supports a subset of the BeautifulSoup methods (see `LxmlTag`). It is only used with the "lxml" or "html" parser.
+            Default: "bs4".
         """
         self._parser = parser or DEFAULT_PARSER
+        self._backend = backend or BS4_BACKEND
+        self._use_lxml = (
+            self._backend == LXML_BACKEND
+            and self._parser in ("lxml", "html")
+            and lxml_soup.is_available()
+        )
+        self.charsets = get_charset_resolver()
 
     def close(self) -> None:
         pass
@@ -34,14 +51,24 @@ class SoupMaker(ABC):
         data: Union[Response, bytes, str],
         encoding: Optional[str] = None,
     ) -> BeautifulSoup:
+        """Parse the page. The encoding of the bytes is resolved from the response
+        headers, the meta tag or the content itself, if it is not given."""
         if isinstance(data, Response):
+            if not encoding:
+                encoding = self.charsets.resolve(data.content, data.headers, data.url)
             return self.make_soup(data.content, encoding)
         elif isinstance(data, bytes):
-            html = data.decode(encoding or "utf8", "ignore")
+            encoding = encoding or self.charsets.resolve(data)
+            if self._use_lxml:
+                # lxml decodes the bytes itself
+                return lxml_soup.LxmlSoup(data, encoding)
+            html = data.decode(encoding, "ignore")
         elif isinstance(data, str):
             html = data
         else:
             raise LNException("Could not parse response")
+        if self._use_lxml:
+            return lxml_soup.LxmlSoup(html)
         return BeautifulSoup(html, features=self._parser)
 
     def make_tag(
@@ -20,6 +20,7 @@ from ..assets.version import get_version
 from ..utils.platforms import Platform
 from .arguments import get_args
 from .crawler import Crawler
+from .crawler_registry import CrawlerRegistry
 from .display import new_version_news
 from .exeptions import LNException
 from .taskman import TaskManager
@@ -36,7 +37,7 @@ __all__ = [
 ]
 
 template_list: Set[Type[Crawler]] = set()
-crawler_list: Dict[str, Type[Crawler]] = {}
+crawler_list = CrawlerRegistry(lambda file_path: __import_crawlers(file_path))
 rejected_sources: Dict[str, str] = {}
 
 # --------------------------------------------------------------------------- #
@@ -347,26 +348,53 @@ def __add_crawlers_from_path(path: Path, no_cache=False):
         crawlers = __import_crawlers(path, no_cache)
         for crawler in crawlers:
             setattr(crawler, "file_path", str(path.absolute()))
-            base_urls: list[str] = getattr(crawler, "base_url")
-            for url in base_urls:
-                no_www = url.replace("://www.", "://")
-                hostname = urlparse(url).hostname
-                no_www_hostname = urlparse(no_www).hostname
-                crawler_list[url] = crawler
-                crawler_list[no_www] = crawler
-                if hostname:
-                    crawler_list[hostname] = crawler
-                if no_www_hostname:
-                    crawler_list[no_www_hostname] = crawler
+            crawler_list.add_crawler(crawler)
     except Exception as e:
         logger.warning("Could not load crawlers from %s. Error: %s", path, e)
 
 
+def __index_by_file() -> Dict[str, List[dict]]:
+    index_by_file: Dict[str, List[dict]] = {}
+    for info in __current_index.get("crawlers", {}).values():
+        index_by_file.setdefault(str(info["file_path"]), []).append(info)
+    return index_by_file
+
+
+def __register_crawlers_from_path(path: Path, root: Path, index_by_file: Dict[str, List[dict]]):
+    """Register the crawler files by their urls in the index, to import them when needed.
+    The files that are not in the index, or were changed since, are imported now.
+    The urls of the disabled crawlers in the index are rejected without importing them."""
+    if path.name.startswith("_") or not path.name[0].isalnum():
+        return
+
+    if path.is_dir():
+        for py_file in path.glob("**/*.py"):
+            __register_crawlers_from_path(py_file, root, index_by_file)
+        return
+
+    base_urls: List[str] = []
+    indexed = index_by_file.get(path.absolute().relative_to(root).as_posix())
+    if indexed:
+        md5 = hashlib.md5(path.read_bytes()).hexdigest()
+        if all(info.get("md5") == md5 for info in indexed):
+            for info in indexed:
+                base_urls += info.get("base_urls") or []
+                if info.get("is_disabled"):
+                    for url in info.get("base_urls") or []:
+                        __update_rejected(url, info.get("disable_reason") or "Crawler is disabled")
+
+    if base_urls:
+        crawler_list.register_file(path.absolute(), base_urls)
+    else:
+        __add_crawlers_from_path(path)
+
+
 def __load_crawlers():
-    for _, current in __current_index["crawlers"].items():
-        source_file = __user_data_path / str(current["file_path"])
+    index_by_file = __index_by_file()
+    for file_path in index_by_file.keys():
+        source_file = __user_data_path / file_path
         if source_file.is_file():
-            __add_crawlers_from_path(source_file)
+            __register_crawlers_from_path(source_file, __user_data_path, index_by_file)
 
 
 # --------------------------------------------------------------------------- #
@@ -383,7 +411,7 @@ def load_sources():
         __save_current_index()
 
     __load_rejected_sources()
-    __add_crawlers_from_path(__local_data_path / "sources")
+    __register_crawlers_from_path(__local_data_path / "sources", __local_data_path, __index_by_file())
 
     if not __is_dev_mode:
         __load_crawlers()
@@ -414,8 +442,9 @@ def prepare_crawler(url: str, crawler_file: Optional[str] = None) -> Crawler:
         __load_rejected_sources()
         __add_crawlers_from_path(Path(crawler_file), True)
 
-    if url in rejected_sources:
-        raise LNException("Source is rejected. Reason: " + rejected_sources[url])
+    for key in (url, hostname, no_www_hostname):
+        if key in rejected_sources:
+            raise LNException("Source is rejected. Reason: " + rejected_sources[key])
 
     CrawlerType = (
         crawler_list.get(url)
@@ -1,22 +1,33 @@
+import asyncio
 import atexit
 import logging
 import os
 from abc import ABC
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from threading import Event, Semaphore, Thread
-from typing import Any, Dict, Generator, Iterable, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, as_completed, wait
+from threading import Event, Lock, Semaphore, Thread
+from typing import (Any, AsyncGenerator, Awaitable, Callable, Dict, Generator,
+                    Iterable, List, Optional, Set)
 
 from tqdm import tqdm
 
+from ..utils.circuit import CircuitBreaker
+from ..utils.concurrency import AdaptiveSemaphore
+from ..utils.executor import PriorityThreadPoolExecutor, TaskPriority
 from ..utils.ratelimit import RateLimiter
 from .exeptions import LNException
 
 logger = logging.getLogger(__name__)
 
 MAX_REQUESTS_PER_DOMAIN = 5
+MAX_REQUESTS_PER_DOMAIN_LIMIT = 32
 
 _resolver = Semaphore(1)
-_host_semaphores: Dict[str, Semaphore] = {}
+_host_semaphores: Dict[str, AdaptiveSemaphore] = {}
+_host_semaphore_lock = Lock()
+_host_breakers: Dict[str, CircuitBreaker] = {}
+_host_breaker_lock = Lock()
+_host_limiters: Dict[str, RateLimiter] = {}
+_limiter_lock = Lock()
 
 
 class TaskManager(ABC):
@@ -24,26 +35,29 @@ class TaskManager(ABC):
         self,
         workers: Optional[int] = None,
         ratelimit: Optional[float] = None,
+        burst: Optional[float] = None,
     ) -> None:
         """A helper class for task queueing and parallel task execution.
         It is being used as a superclass of the Crawler.
 
         Args:
         - workers (int, optional): Number of concurrent workers to expect. Default: 5.
-        - ratelimit (float, optional): Number of requests per second.
+        - ratelimit (float, optional): Number of requests per second per hostname.
+        - burst (float, optional): Number of requests allowed at once per hostname. Default: 1.
         """
-        self.init_executor(workers, ratelimit)
+        self.init_executor(workers, ratelimit, burst)
 
     def close(self) -> None:
         self.shutdown()
 
     @property
-    def executor(self) -> ThreadPoolExecutor:
+    def executor(self) -> PriorityThreadPoolExecutor:
         return self._executor
 
     @property
     def futures(self) -> List[Future]:
-        return self._futures
+        """The submitted futures that are not done yet"""
+        return list(self._futures)
 
     @property
     def workers(self):
@@ -53,33 +67,38 @@ class TaskManager(ABC):
         if hasattr(self, "_executor"):
             self._submit = None
             self._executor.shutdown(wait)
-        if hasattr(self, "_limiter"):
-            self._limiter.shutdown()
+        if hasattr(self, "_rate_signal"):
+            self._rate_signal.set()
 
     def init_executor(
         self,
         workers: Optional[int] = None,
         ratelimit: Optional[float] = None,
+        burst: Optional[float] = None,
     ):
         """Initializes a new executor.
 
         If the number of workers are not the same as the current executor,
         it will shutdown the current executor, and cancel all pending tasks.
 
+        The ratelimit is not bound to the workers. All workers draw requests
+        from a token bucket shared by hostname, see `rate_gate`.
+
         Args:
         - workers (int, optional): Number of concurrent workers to expect. Default: 5.
-        - ratelimit (float, optional): Number of requests per second.
+        - ratelimit (float, optional): Number of requests per second per hostname.
+        - burst (float, optional): Number of requests allowed at once per hostname. Default: 1.
         """
-        self._futures: List[Future] = []
+        self._futures: Set[Future] = set()
         self.close()  # cleanup previous initialization
 
+        self._rate_signal = Event()
         if ratelimit and ratelimit > 0:
-            workers = 1  # use single worker if ratelimit is being applied
-            self._limiter = RateLimiter(ratelimit)
-        elif hasattr(self, "_limiter"):
-            del self._limiter
+            self._ratelimit = (ratelimit, burst)
+        elif hasattr(self, "_ratelimit"):
+            del self._ratelimit
 
-        self._executor = ThreadPoolExecutor(
+        self._executor = PriorityThreadPoolExecutor(
             max_workers=workers,
             thread_name_prefix="lncrawl_scraper",
         )
@@ -96,14 +115,46 @@ class TaskManager(ABC):
         Returns:
             A Future representing the given call.
         """
-        if hasattr(self, "_limiter"):
-            fn = self._limiter.wrap(fn)
         if not self._submit:
             raise Exception("No executor is available")
         future = self._submit(fn, *args, **kwargs)
-        self._futures.append(future)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
         return future
 
+    def submit_priority_task(
+        self,
+        priority: TaskPriority,
+        order: float,
+        fn,
+        *args,
+        **kwargs,
+    ) -> Future:
+        """Submits a callable to be executed with the given priority.
+
+        Queued tasks are picked by the priority class first, e.g.
+        `TaskPriority.METADATA` > `TaskPriority.CHAPTER` > `TaskPriority.IMAGE`,
+        and then by the ascending `order` within the same class.
+        Tasks submitted with `submit_task` has the `TaskPriority.METADATA` priority.
+
+        Returns:
+            A Future representing the given call.
+        """
+        if not self._submit:
+            raise Exception("No executor is available")
+        future = self._executor.submit_with_priority(priority, order, fn, *args, **kwargs)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def boost_task(self, future: Future) -> bool:
+        """Move a queued task in front of all other queued tasks.
+
+        Returns:
+            False if the task is already running or done.
+        """
+        return self._executor.reprioritize(future, TaskPriority.URGENT)
+
     @staticmethod
     def progress_bar(
         iterable: Optional[Iterable] = None,
@@ -144,21 +195,115 @@ class TaskManager(ABC):
     def domain_gate(self, hostname: Optional[str]):
         """Limit number of entry per hostname.
 
+        The number of entries starts at `MAX_REQUESTS_PER_DOMAIN` and adapts
+        to the health of the host: it grows while the responses are fast and
+        successful, and halves on 403, 429, 503 or timeout errors.
+
         Args:
-            hostname: A fully qualified url.
+            hostname: The hostname of the url to request.
 
         Returns:
-            A semaphore object to wait.
+            A context manager to hold a slot while requesting.
 
         Example:
-            with self.domain_gate(url):
+            with self.domain_gate(hostname):
                 self.scraper.get(url)
         """
+        return self._get_domain_semaphore(hostname).slot()
+
+    def domain_gate_async(self, hostname: Optional[str]):
+        """Same as `domain_gate`, but waits in the running event loop.
+
+        Example:
+            async with self.domain_gate_async(hostname):
+                await client.get(url)
+        """
+        return self._get_domain_semaphore(hostname).slot_async()
+
+    @staticmethod
+    def domain_windows() -> Dict[str, int]:
+        """Current number of requests allowed at once for each hostname"""
+        with _host_semaphore_lock:
+            return {
+                hostname: semaphore.window
+                for hostname, semaphore in _host_semaphores.items()
+            }
+
+    def _get_domain_semaphore(self, hostname: Optional[str]) -> AdaptiveSemaphore:
+        if hostname is None:
+            hostname = ''
+        with _host_semaphore_lock:
+            if hostname not in _host_semaphores:
+                _host_semaphores[hostname] = AdaptiveSemaphore(
+                    name=hostname,
+                    initial=MAX_REQUESTS_PER_DOMAIN,
+                    maximum=MAX_REQUESTS_PER_DOMAIN_LIMIT,
+                )
+            return _host_semaphores[hostname]
+
+    def host_breaker(self, hostname: Optional[str]) -> CircuitBreaker:
+        """Get the circuit breaker of the hostname.
+        It is shared among all crawler instances requesting the same host.
+
+        Args:
+            hostname: The hostname of the url to request.
+        """
+        if hostname is None:
+            hostname = ''
+        with _host_breaker_lock:
+            if hostname not in _host_breakers:
+                _host_breakers[hostname] = CircuitBreaker(name=hostname)
+            return _host_breakers[hostname]
+
+    @staticmethod
+    def circuit_states() -> Dict[str, str]:
+        """Current circuit state for each hostname"""
+        with _host_breaker_lock:
+            return {
+                hostname: str(breaker.state)
+                for hostname, breaker in _host_breakers.items()
+            }
+
+    def rate_gate(self, hostname: Optional[str]) -> None:
+        """Wait for the next request slot of the hostname.
+
+        It returns immediately if no ratelimit is set. Otherwise it draws a
+        token from the bucket of the hostname, which is shared among all
+        workers and crawler instances requesting the same host.
+
+        Args:
+            hostname: The hostname of the url to request.
+
+        Example:
+            self.rate_gate(hostname)
+            self.scraper.get(url)
+        """
+        limiter = self._get_rate_limiter(hostname)
+        if limiter:
+            limiter.acquire(self._rate_signal)
+
+    async def rate_gate_async(self, hostname: Optional[str]) -> None:
+        """Same as `rate_gate`, but waits in the running event loop."""
+        limiter = self._get_rate_limiter(hostname)
+        if limiter:
+            delay = limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _get_rate_limiter(self, hostname: Optional[str]) -> Optional[RateLimiter]:
+        if not hasattr(self, "_ratelimit"):
+            return None
         if hostname is None:
             hostname = ''
-        if hostname not in _host_semaphores:
-            _host_semaphores[hostname] = Semaphore(MAX_REQUESTS_PER_DOMAIN)
-        return _host_semaphores[hostname]
+        ratelimit, burst = self._ratelimit
+        with _limiter_lock:
+            limiter = _host_limiters.get(hostname)
+            if limiter is None:
+                limiter = RateLimiter(ratelimit, burst)
+                _host_limiters[hostname] = limiter
+            elif limiter.rate != ratelimit or limiter.capacity != max(1, burst or 1):
+                limiter.update(ratelimit, burst)
+            return limiter
 
     def cancel_futures(self, futures: Iterable[Future]) -> None:
         """Cancels all the future that are not yet done.
@@ -204,14 +349,156 @@ class TaskManager(ABC):
         )
         try:
             for future in as_completed(futures):
+                if signal.is_set():
+                    return  # canceled
+                yield from self.__resolve_one(future, bar, fail_fast, signal)
+        except KeyboardInterrupt:
+            signal.set()
+            raise
+        finally:
+            Thread(
+                target=self.cancel_futures,
+                kwargs=dict(futures=futures),
+                # daemon=True,
+            ).start()
+            bar.close()
+
+    def __resolve_one(
+        self,
+        future: Future,
+        bar: tqdm,
+        fail_fast: bool,
+        signal: Event,
+    ) -> Generator[Any, None, None]:
+        if fail_fast:
+            yield future.result()
+            bar.update()
+            return
+        try:
+            yield future.result()
+        except KeyboardInterrupt:
+            signal.set()
+            raise
+        except LNException as e:
+            bar.clear()
+            print(str(e))
+        except Exception as e:
+            yield None
+            if bar.disable:
+                logger.exception("Failure to resolve future")
+            else:
+                bar.clear()
+                logger.warning(f"{type(e).__name__}: {e}")
+        finally:
+            bar.update()
+
+    def map_tasks(
+        self,
+        fn: Callable[[Any], Any],
+        iterable: Iterable[Any],
+        max_in_flight: Optional[int] = None,
+        priority: TaskPriority = TaskPriority.METADATA,
+        total: Optional[int] = None,
+        disable_bar: bool = False,
+        desc: Optional[str] = None,
+        unit: Optional[str] = None,
+        fail_fast: bool = False,
+        signal=Event(),
+    ) -> Generator[Any, None, None]:
+        """Apply fn to every item of the iterable in the executor,
+        and yield the results as they complete.
+
+        The items are read lazily, and at most `max_in_flight` tasks are
+        submitted at a time. A new task is submitted as soon as one finishes,
+        before its result is yielded, so that the executor stays busy while the
+        consumer handles it. The finished futures are released right away, so
+        the memory usage does not grow with the length of the iterable.
+
+        Args:
+            fn: The callable to apply on every item.
+            iterable: The items to process.
+            max_in_flight: Maximum number of submitted tasks. Default: twice the workers.
+            priority: The priority class of the tasks. They are ordered by the item index.
+            total: Number of items for the progress bar, if known.
+            disable_bar: Hides the progress bar if True.
+            desc: The progress bar description
+            unit: The progress unit name
+            fail_fast: Fail on first error
+        """
+        items = enumerate(iterable)
+        limit = max(1, max_in_flight or 2 * self.workers)
+        pending: Set[Future] = set()
+
+        def _fill() -> None:
+            while len(pending) < limit and not signal.is_set():
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    return
+                pending.add(self.submit_priority_task(priority, index, fn, item))
+
+        bar = self.progress_bar(
+            total=total,
+            desc=desc,
+            unit=unit,
+            disable=disable_bar,
+        )
+        try:
+            _fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    if signal.is_set():
+                        return  # canceled
+                    _fill()
+                    yield from self.__resolve_one(future, bar, fail_fast, signal)
+        except KeyboardInterrupt:
+            signal.set()
+            raise
+        finally:
+            self.cancel_futures(pending)
+            bar.close()
+
+    async def resolve_as_async_generator(
+        self,
+        awaitables: Iterable[Awaitable],
+        disable_bar: bool = False,
+        desc: Optional[str] = None,
+        unit: Optional[str] = None,
+        fail_fast: bool = False,
+        signal=Event(),
+    ) -> AsyncGenerator[Any, None]:
+        """Create an async generator output to resolve the awaitables
+        in the running event loop. It behaves like `resolve_as_generator`.
+
+        Args:
+            awaitables: A iterable list of coroutines or futures to resolve.
+            disable_bar: Hides the progress bar if True.
+            desc: The progress bar description
+            unit: The progress unit name
+            fail_fast: Fail on first error
+        """
+        tasks = [asyncio.ensure_future(x) for x in awaitables]
+        if not tasks:
+            return
+
+        bar = self.progress_bar(
+            total=len(tasks),
+            desc=desc,
+            unit=unit,
+            disable=disable_bar,
+        )
+        try:
+            for task in asyncio.as_completed(tasks):
                 if signal.is_set():
                     return  # canceled
                 if fail_fast:
-                    yield future.result()
+                    yield await task
                     bar.update()
                     continue
                 try:
-                    yield future.result()
+                    yield await task
                 except KeyboardInterrupt:
                     signal.set()
                     raise
@@ -221,7 +508,7 @@ class TaskManager(ABC):
                 except Exception as e:
                     yield None
                     if bar.disable:
-                        logger.exception("Failure to resolve future")
+                        logger.exception("Failure to resolve task")
                     else:
                         bar.clear()
                         logger.warning(f"{type(e).__name__}: {e}")
@@ -231,11 +518,9 @@ class TaskManager(ABC):
             signal.set()
             raise
         finally:
-            Thread(
-                target=self.cancel_futures,
-                kwargs=dict(futures=futures),
-                # daemon=True,
-            ).start()
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
             bar.close()
 
     def resolve_futures(
@@ -4,6 +4,7 @@ from .meta import MetaInfo
 from .novel import Novel
 from .search_result import CombinedSearchResult, SearchResult
 from .session import Session
+from .update import NovelUpdate
 from .volume import Volume
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "SearchResult",
     "OutputFormat",
     "Novel",
+    "NovelUpdate",
     "MetaInfo",
     "Session",
     "Volume",
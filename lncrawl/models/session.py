@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Tuple
 from box import Box
 
 from .formats import OutputFormat
+from .update import NovelUpdate
 
 
 class Session(Box):
@@ -28,6 +29,7 @@ class Session(Box):
         fetch_content_progress: float = 0,
         fetch_images_progress: float = 0,
         binding_progress: float = 0,
+        novel_update: Optional[NovelUpdate] = None,
         ** kwargs,
     ) -> None:
         self.user_input = user_input
@@ -50,4 +52,5 @@ class Session(Box):
         self.fetch_content_progress = fetch_content_progress
         self.fetch_images_progress = fetch_images_progress
         self.binding_progress = binding_progress
+        self.novel_update = novel_update
         self.update(kwargs)
@@ -0,0 +1,23 @@
+from typing import List
+
+from box import Box
+
+
+class NovelUpdate(Box):
+    def __init__(
+        self,
+        added: List[int] = [],
+        changed: List[int] = [],
+        moved: List[int] = [],
+        removed: List[str] = [],
+        volumes: List[int] = [],
+        checked_at: float = 0,
+        **kwargs,
+    ) -> None:
+        self.added = added
+        self.changed = changed
+        self.moved = moved
+        self.removed = removed
+        self.volumes = volumes
+        self.checked_at = checked_at
+        self.update(kwargs)
@@ -2,13 +2,14 @@ import logging
 from abc import abstractmethod
 from io import BytesIO
 from threading import Event
-from typing import Generator, List, Optional
+from typing import Callable, Generator, List, Optional
 
 from PIL import Image
 
 from ...core.browser import Browser, By
 from ...core.crawler import Crawler
 from ...core.exeptions import FallbackToBrowser, ScraperErrorGroup
+from ...core.taskman import TaskPriority
 from ...models import Chapter
 from ...models.search_result import SearchResult
 
@@ -56,7 +57,8 @@ class BasicBrowserTemplate(Crawler):
         if self.using_browser:
             return
         self._max_workers = self.workers
-        self.init_executor(1)
+        self._max_ratelimit = getattr(self, "_ratelimit", (None, None))
+        self.init_executor(1, *self._max_ratelimit)
         self._browser = Browser(
             headless=self.headless,
             timeout=self.timeout,
@@ -74,7 +76,7 @@ class BasicBrowserTemplate(Crawler):
         if not self.using_browser:
             return
         self._browser.__del__()
-        self.init_executor(self._max_workers)
+        self.init_executor(self._max_workers, *self._max_ratelimit)
 
     def search_novel(self, query: str) -> List[SearchResult]:
         try:
@@ -105,6 +107,7 @@ class BasicBrowserTemplate(Crawler):
         chapters: List[Chapter],
         fail_fast=False,
         signal=Event(),
+        persist: Optional[Callable[[Chapter], None]] = None,
     ) -> Generator[Chapter, None, None]:
         yield from ()  # start generator
 
@@ -113,22 +116,24 @@ class BasicBrowserTemplate(Crawler):
             def _downloader(chapter: Chapter):
                 chapter.body = ""
                 chapter.images = {}
-                chapter.body = self.download_chapter_body_in_soup(chapter)
-                self.extract_chapter_images(chapter)
+                with self.collect_chapter_images(chapter):
+                    chapter.body = self.download_chapter_body_in_soup(chapter)
                 chapter.success = bool(chapter.body)
                 return chapter
 
-            futures = [
-                self.executor.submit(_downloader, chapter)
-                for chapter in chapters
-            ]
-            yield from self.resolve_as_generator(
-                futures,
+            for chapter in self.map_tasks(
+                _downloader,
+                chapters,
+                priority=TaskPriority.CHAPTER,
+                total=len(chapters),
                 desc="Chapters",
                 unit="item",
                 fail_fast=True,
                 signal=signal
-            )
+            ):
+                if chapter and persist:
+                    persist(chapter)
+                yield chapter
             return  # successfully downloaded all the chapters
         except ScraperErrorGroup as e:
             if logger.isEnabledFor(logging.DEBUG):
@@ -144,9 +149,11 @@ class BasicBrowserTemplate(Crawler):
             chapter.images = {}
             try:
                 print(chapter.id, chapter.body[:50])
-                chapter.body = self.download_chapter_body(chapter)
-                self.extract_chapter_images(chapter)
+                with self.collect_chapter_images(chapter):
+                    chapter.body = self.download_chapter_body(chapter)
                 chapter.success = True
+                if persist:
+                    persist(chapter)
             except Exception as e:
                 logger.error("Failed to get chapter body: %s", e)
                 if isinstance(e, KeyboardInterrupt):
@@ -112,9 +112,12 @@ class GeneralBrowserTemplate(BasicBrowserTemplate, GeneralSoupTemplate):
         return self.parse_chapter_list(self.browser.soup)
 
     def download_chapter_body_in_soup(self, chapter: Chapter) -> str:
-        soup = self.get_soup(chapter.url)
-        body = self.select_chapter_body(soup)
-        return self.parse_chapter_body(body)
+        response = self.get_response(
+            chapter.url,
+            headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9"},
+        )
+        self.last_soup_url = chapter.url
+        return self.parse_chapter_response(response)
 
     def download_chapter_body_in_browser(self, chapter: Chapter) -> str:
         self.visit_chapter_page_in_browser(chapter)
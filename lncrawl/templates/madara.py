@@ -12,6 +12,9 @@ logger = logging.getLogger(__name__)
 
 class MadaraTemplate(SearchableSoupTemplate, ChapterOnlyBrowserTemplate):
     is_template = True
+    use_http_cache = True
+    use_image_cache = True
+    chapter_body_selector = "div.reading-content"
 
     def initialize(self) -> None:
         self.cleaner.bad_tags.update(["h3"])
@@ -106,8 +109,3 @@ class MadaraTemplate(SearchableSoupTemplate, ChapterOnlyBrowserTemplate):
             title=tag.text.strip(),
             url=self.absolute_url(tag["href"]),
         )
-
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        body = soup.select_one("div.reading-content")
-        assert body
-        return body
@@ -11,6 +11,7 @@ from lncrawl.templates.browser.searchable import SearchableBrowserTemplate
 
 class MangaStreamTemplate(SearchableBrowserTemplate, OptionalVolumeBrowserTemplate):
     is_template = True
+    chapter_body_selector = "#readernovel, #readerarea, .entry-content"
 
     def initialize(self) -> None:
         self.cleaner.bad_tags.update(["h3"])
@@ -96,11 +97,6 @@ class MangaStreamTemplate(SearchableBrowserTemplate, OptionalVolumeBrowserTempla
             url=self.absolute_url(tag["href"]),
         )
 
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        body = soup.select_one("#readernovel, #readerarea, .entry-content")
-        assert body
-        return body
-
     def visit_chapter_page_in_browser(self, chapter: Chapter) -> None:
         self.visit(chapter.url)
         self.browser.wait("#readernovel, #readerarea, .entry-content,.mainholder")
@@ -12,6 +12,14 @@ from lncrawl.templates.soup.searchable import SearchableSoupTemplate
 
 class NovelFullTemplate(SearchableSoupTemplate, ChapterOnlySoupTemplate):
     is_template = True
+    use_http_cache = True
+    use_image_cache = True
+    chapter_body_selector = "#chr-content, #chapter-content"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # the ads inside the chapter text, set here as the sources override `initialize`
+        self.cleaner.bad_css.update(["#chr-content div", "#chapter-content div"])
 
     def select_search_items(self, query: str) -> Generator[Tag, None, None]:
         params = {"keyword": query}
@@ -85,10 +93,3 @@ class NovelFullTemplate(SearchableSoupTemplate, ChapterOnlySoupTemplate):
             title=tag.text.strip(),
             url=self.absolute_url(tag.get("href") or tag.get("value")),
         )
-
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        contents = soup.select_one("#chr-content, #chapter-content")
-        assert contents
-        for ads in contents.select("div"):
-            ads.extract()
-        return contents
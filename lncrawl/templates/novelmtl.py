@@ -13,6 +13,7 @@ from lncrawl.templates.browser.chapter_only import ChapterOnlyBrowserTemplate
 
 class NovelMTLTemplate(SearchableBrowserTemplate, ChapterOnlyBrowserTemplate):
     is_template = True
+    chapter_body_selector = ".chapter-content"
 
     def initialize(self) -> None:
         self.cur_time = int(1000 * time.time())
@@ -103,8 +104,3 @@ class NovelMTLTemplate(SearchableBrowserTemplate, ChapterOnlyBrowserTemplate):
             url=self.absolute_url(tag["href"]),
             title=title.get_text(strip=True),
         )
-
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        body = soup.select_one(".chapter-content")
-        assert body
-        return body
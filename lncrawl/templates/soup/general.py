@@ -3,15 +3,43 @@ from abc import abstractmethod
 from typing import Generator, Union, Optional
 
 from bs4 import BeautifulSoup, Tag
+from requests import Response
 
+from ...core.charset import get_charset_resolver
+from ...core.cleaner import TextCleaner
 from ...core.crawler import Crawler
 from ...core.exeptions import LNException
+from ...core.parse_pool import (clean_chapter_page, dump_cleaner_config,
+                                get_parse_pool)
 from ...models import Chapter, Volume
 
 logger = logging.getLogger(__name__)
 
 
+def _has_abstract_methods(cls: type) -> bool:
+    # the abstract methods are set on the class after `__init_subclass__`
+    return any(
+        getattr(getattr(cls, name, None), "__isabstractmethod__", False)
+        for name in dir(cls)
+    )
+
+
 class GeneralSoupTemplate(Crawler):
+    # CSS selector of the tag containing the chapter text. Crawlers setting it
+    # instead of overriding `select_chapter_body` can have their chapters
+    # parsed and cleaned in worker processes, see `--parse-processes`.
+    chapter_body_selector: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # like an abstract method, but a selector can be set instead of it
+        if cls.__dict__.get("is_template") or _has_abstract_methods(cls):
+            return
+        if not cls.chapter_body_selector and cls.select_chapter_body is GeneralSoupTemplate.select_chapter_body:
+            raise TypeError(
+                f"{cls.__name__} must set `chapter_body_selector` or override `select_chapter_body`"
+            )
+
     def read_novel_info(self) -> None:
         soup = self.get_novel_soup()
 
@@ -84,10 +112,58 @@ class GeneralSoupTemplate(Crawler):
         body = self.select_chapter_body(soup)
         return self.parse_chapter_body(body)
 
-    @abstractmethod
+    def fetch_chapter_page(self, chapter: Chapter) -> Optional[Response]:
+        if type(self).download_chapter_body is not GeneralSoupTemplate.download_chapter_body:
+            return super().fetch_chapter_page(chapter)
+        response = self.get_response(
+            chapter.url,
+            headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9"},
+        )
+        self.last_soup_url = chapter.url
+        return response
+
+    def parse_chapter_page(self, chapter: Chapter, page: Response) -> str:
+        if type(self).download_chapter_body is not GeneralSoupTemplate.download_chapter_body:
+            return super().parse_chapter_page(chapter, page)
+        return self.parse_chapter_response(page)
+
+    def parse_chapter_response(self, page: Response) -> str:
+        """Parse the chapter page and return the clean html.
+        It runs in the parse pool, if enabled and `can_parse_in_process`."""
+        pool = get_parse_pool()
+        if pool and self.can_parse_in_process:
+            future = pool.submit(
+                clean_chapter_page,
+                page.content,
+                self._soup_tool._parser,
+                self._soup_tool._backend,
+                self.chapter_body_selector,
+                dump_cleaner_config(self.cleaner),
+                get_charset_resolver().resolve(page.content, page.headers, page.url),
+            )
+            return future.result()
+        soup = self.make_soup(page)
+        body = self.select_chapter_body(soup)
+        return self.parse_chapter_body(body)
+
+    @property
+    def can_parse_in_process(self) -> bool:
+        """True if the chapter body is selected by `chapter_body_selector`,
+        and cleaned by a plain `TextCleaner` without any custom steps."""
+        cls = type(self)
+        return bool(
+            self.chapter_body_selector
+            and type(self.cleaner) is TextCleaner
+            and cls.select_chapter_body is GeneralSoupTemplate.select_chapter_body
+            and cls.parse_chapter_body is GeneralSoupTemplate.parse_chapter_body
+        )
+
     def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
         """Select the tag containing the chapter text"""
-        raise NotImplementedError()
+        assert self.chapter_body_selector
+        body = soup.select_one(self.chapter_body_selector)
+        assert body
+        return body
 
     def parse_chapter_body(self, tag: Tag) -> str:
         """Extract the clean HTML content from the tag containing the chapter text"""
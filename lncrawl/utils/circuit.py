@@ -0,0 +1,151 @@
+import logging
+import time
+from enum import Enum
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class RetryBudget(object):
+    """A budget of retries shared by all requests to a host.
+
+    Every request deposits `ratio` tokens and every retry withdraws one,
+    so the retries can be at most `ratio` of the requests in the long run.
+    The budget can not hold more than `capacity` tokens.
+
+    Args:
+    - ratio (float, optional): Number of retries allowed per request. Default: 0.2.
+    - capacity (float, optional): Maximum number of retries to save up. Default: 10.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10) -> None:
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry. Returns False if the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker(object):
+    """A circuit breaker of a host.
+
+    - CLOSED: requests are allowed. After `failure_threshold` consecutive
+      failures the circuit opens.
+    - OPEN: requests fail fast for `recovery_time` seconds, then the
+      circuit becomes half-open.
+    - HALF_OPEN: a single probe request is allowed. The circuit closes if
+      it succeeds, otherwise it opens again with a doubled recovery time.
+
+    Args:
+    - name (str): Name of the host, used in logs.
+    - failure_threshold (int, optional): Consecutive failures to open the circuit. Default: 10.
+    - recovery_time (float, optional): Initial seconds to keep the circuit open. Default: 30.
+    - max_recovery_time (float, optional): Maximum seconds to keep the circuit open. Default: 300.
+    """
+
+    def __init__(
+        self,
+        name: str = '',
+        failure_threshold: int = 10,
+        recovery_time: float = 30,
+        max_recovery_time: float = 300,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_recovery_time = recovery_time
+        self.max_recovery_time = max_recovery_time
+        self.budget = RetryBudget()
+        self._lock = Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._recovery_time = recovery_time
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self) -> None:
+        if self._state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at >= self._recovery_time:
+                self._set_state(CircuitState.HALF_OPEN)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if self._state == state:
+            return
+        self._state = state
+        self._probing = False
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(
+                "Circuit of %s is open for %ds after %d failures",
+                self.name, self._recovery_time, self._failures,
+            )
+        else:
+            logger.warning("Circuit of %s is %s", self.name, state)
+
+    def allow_request(self) -> bool:
+        """Check if a request can be made now. In half-open state,
+        only the first caller is allowed to probe the host."""
+        with self._lock:
+            self._refresh()
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds left until the circuit becomes half-open"""
+        with self._lock:
+            if self._state != CircuitState.OPEN:
+                return 0
+            return max(0, self._opened_at + self._recovery_time - time.monotonic())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._recovery_time = self.min_recovery_time
+            self._set_state(CircuitState.CLOSED)
+
+    def record_ignored(self) -> None:
+        """Finish a request whose outcome says nothing about the host"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN:
+                self._recovery_time = min(self.max_recovery_time, 2 * self._recovery_time)
+                self._set_state(CircuitState.OPEN)
+            elif self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+                self._set_state(CircuitState.OPEN)
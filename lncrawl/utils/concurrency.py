@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from threading import Condition
+from typing import List, Optional, Tuple
+
+from requests.exceptions import HTTPError, RequestException, Timeout
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = {403, 429, 503}
+
+
+def is_overload_error(error: Optional[BaseException]) -> bool:
+    """Check if the error indicates that the host is overloaded or blocking us"""
+    if isinstance(error, Timeout):
+        return True
+    if isinstance(error, HTTPError):
+        status_code = getattr(error.response, "status_code", None)
+        return status_code in OVERLOAD_STATUS_CODES
+    return False
+
+
+def is_host_failure(error: Optional[BaseException]) -> bool:
+    """Check if the error indicates that the host is down or refusing us.
+    Other errors, e.g. 404, mean that the host is responding fine."""
+    if error is None:
+        return False
+    if is_overload_error(error):
+        return True
+    if isinstance(error, HTTPError):
+        status_code = getattr(error.response, "status_code", None)
+        return status_code is None or status_code >= 500
+    return isinstance(error, RequestException)
+
+
+class AdaptiveSemaphore(object):
+    """A semaphore with an adaptive window using the AIMD
+    (additive increase, multiplicative decrease) algorithm.
+    It is being used along with the TaskManager class.
+
+    The window grows by one slot per window of healthy responses and
+    halves on overload errors (403, 429, 503 or timeouts). A response is
+    healthy when it succeeds with a latency close to the best one seen.
+
+    Args:
+    - name (str): Name of the host this semaphore controls, used in logs.
+    - initial (int, optional): Initial window size. Default: 5.
+    - minimum (int, optional): Minimum window size. Default: 1.
+    - maximum (int, optional): Maximum window size. Default: 32.
+    - latency_factor (float, optional): Latency above `latency_factor` times the
+        baseline latency stops the window from growing. Default: 3.
+    """
+
+    def __init__(
+        self,
+        name: str = '',
+        initial: int = 5,
+        minimum: int = 1,
+        maximum: int = 32,
+        latency_factor: float = 3,
+    ) -> None:
+        if not (0 < minimum <= initial <= maximum):
+            raise ValueError("window should be: 0 < minimum <= initial <= maximum")
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self._limit = float(initial)
+        self._active = 0
+        self._epoch = 0
+        self._baseline: Optional[float] = None
+        self._resized_to = 0
+        self._cond = Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def window(self) -> int:
+        """Current number of requests allowed at once"""
+        return int(self._limit)
+
+    @property
+    def active(self) -> int:
+        """Current number of requests in flight"""
+        return self._active
+
+    def resize(self, maximum: int, initial: Optional[int] = None) -> None:
+        """Raise the maximum window size, and the current one up to `initial`.
+        It never shrinks the window. Only the first call for a maximum changes
+        the window, so that the decreases made since then are kept.
+
+        Args:
+            maximum: New maximum window size.
+            initial: Minimum value of the current window size.
+        """
+        with self._cond:
+            if maximum <= self._resized_to:
+                return
+            self._resized_to = maximum
+            self.maximum = max(self.maximum, maximum)
+            if initial:
+                self._limit = max(self._limit, float(min(initial, self.maximum)))
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def acquire(self) -> int:
+        """Block until a slot is available.
+
+        Returns:
+            The epoch of the window when the slot was acquired.
+        """
+        with self._cond:
+            while self._active >= int(self._limit):
+                self._cond.wait()
+            self._active += 1
+            return self._epoch
+
+    async def acquire_async(self) -> int:
+        """Wait in the running event loop until a slot is available.
+
+        Returns:
+            The epoch of the window when the slot was acquired.
+        """
+        while True:
+            with self._cond:
+                if self._active < int(self._limit):
+                    self._active += 1
+                    return self._epoch
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(
+        self,
+        epoch: int,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Release a slot and adjust the window by the outcome of the request.
+
+        Args:
+            epoch: The value returned by `acquire`.
+            latency: Seconds taken by the request.
+            error: The exception raised by the request, if any.
+        """
+        with self._cond:
+            self._active -= 1
+            old_window = self.window
+            if is_overload_error(error):
+                self._decrease(epoch)
+            elif error is None and latency is not None:
+                self._increase(latency)
+            if self.window != old_window:
+                logger.debug("Window of %s: %d -> %d", self.name, old_window, self.window)
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def _wake_async_waiters(self) -> None:
+        for loop, waiter in self._async_waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake_up, waiter)
+        self._async_waiters.clear()
+
+    def _increase(self, latency: float) -> None:
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # let the baseline drift slowly towards recent latencies
+            self._baseline = 0.95 * self._baseline + 0.05 * latency
+        if latency > self.latency_factor * self._baseline:
+            return
+        self._limit = min(self.maximum, self._limit + 1 / self._limit)
+
+    def _decrease(self, epoch: int) -> None:
+        if epoch != self._epoch:
+            return  # already decreased for requests of the same window
+        self._epoch += 1
+        self._limit = max(self.minimum, self._limit / 2)
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot while the block is being executed.
+
+        Example:
+            with semaphore.slot():
+                response = session.get(url)
+                response.raise_for_status()
+        """
+        epoch = self.acquire()
+        start = time.monotonic()
+        try:
+            yield self
+        except BaseException as e:
+            self.release(epoch, error=e)
+            raise
+        else:
+            self.release(epoch, latency=time.monotonic() - start)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Hold a slot while the block is being executed in an event loop.
+
+        Example:
+            async with semaphore.slot_async():
+                response = await client.get(url)
+                response.raise_for_status()
+        """
+        epoch = await self.acquire_async()
+        start = time.monotonic()
+        try:
+            yield self
+        except BaseException as e:
+            self.release(epoch, error=e)
+            raise
+        else:
+            self.release(epoch, latency=time.monotonic() - start)
+
+
+def _wake_up(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,115 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import IntEnum
+from heapq import heappop, heappush
+from typing import Any, List, Tuple
+
+
+class TaskPriority(IntEnum):
+    """Priority classes of the tasks. Lower values run first."""
+    URGENT = 0
+    METADATA = 10
+    CHAPTER = 20
+    IMAGE = 30
+
+
+Priority = Tuple[float, float]
+
+_REMOVED = object()
+_SENTINEL_PRIORITY: Priority = (float("inf"), 0)
+_DEFAULT_PRIORITY: Priority = (TaskPriority.METADATA, 0)
+
+
+class PriorityWorkQueue(queue.Queue):
+    """A work queue for the ThreadPoolExecutor ordered by (priority, order).
+
+    The priority of the next work item is picked from a thread local value
+    set by the submitter. Queued items can be moved to another priority.
+    """
+
+    def _init(self, maxsize: int) -> None:
+        self.queue: List[list] = []
+        self.local = threading.local()
+        self._count = 0
+        self._seq = itertools.count()
+
+    def _qsize(self) -> int:
+        return self._count
+
+    def _put(self, item: Any) -> None:
+        if item is None:
+            priority = _SENTINEL_PRIORITY  # shutdown signal runs after all work
+        else:
+            priority = getattr(self.local, "priority", None) or _DEFAULT_PRIORITY
+        self._push(priority, item)
+
+    def _push(self, priority: Priority, item: Any) -> None:
+        entry = [priority, next(self._seq), item]
+        if item is not None:
+            setattr(item.future, "_queue_entry", entry)
+        heappush(self.queue, entry)
+        self._count += 1
+
+    def _get(self) -> Any:
+        while True:
+            entry = heappop(self.queue)
+            item = entry[-1]
+            if item is not _REMOVED:
+                entry[-1] = _REMOVED
+                self._count -= 1
+                return item
+
+    def reprioritize(self, future: Future, priority: Priority) -> bool:
+        """Move the work item of a queued future to a new priority.
+
+        Returns:
+            False if the future is not waiting in this queue.
+        """
+        with self.mutex:
+            entry = getattr(future, "_queue_entry", None)
+            if not entry or entry[-1] is _REMOVED:
+                return False
+            item = entry[-1]
+            entry[-1] = _REMOVED
+            self._count -= 1
+            self._push(priority, item)
+            return True
+
+
+class PriorityThreadPoolExecutor(ThreadPoolExecutor):
+    """A ThreadPoolExecutor that runs the queued tasks by priority.
+
+    Tasks with the same priority class run in ascending `order`, and then in
+    the order of submission. Tasks submitted with `submit` has the priority
+    of `TaskPriority.METADATA`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._work_queue = PriorityWorkQueue()
+
+    def submit_with_priority(
+        self,
+        priority: TaskPriority,
+        order: float,
+        fn,
+        *args,
+        **kwargs,
+    ) -> Future:
+        work_queue: PriorityWorkQueue = self._work_queue  # type:ignore
+        work_queue.local.priority = (priority, order)
+        try:
+            return super().submit(fn, *args, **kwargs)
+        finally:
+            work_queue.local.priority = None
+
+    def reprioritize(
+        self,
+        future: Future,
+        priority: TaskPriority,
+        order: float = 0,
+    ) -> bool:
+        work_queue: PriorityWorkQueue = self._work_queue  # type:ignore
+        return work_queue.reprioritize(future, (priority, order))
@@ -1,42 +1,82 @@
 import logging
 import time
+from threading import Event, Lock
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter(object):
-    """A helper class for a controlling number of requests per seconds.
+    """A thread-safe token bucket for controlling number of requests per seconds.
     It is being used along with the TaskManager class.
 
+    The bucket refills at `ratelimit` tokens per second and can hold at most
+    `burst` tokens. Every caller reserves one token and sleeps until its slot
+    arrives, so any number of workers can share the same bucket without
+    exceeding the rate, while the actual requests are free to overlap.
+
     Args:
-    - ratelimit (float, optional): Number of requests per seconds.
+    - ratelimit (float): Number of requests per seconds. Can be fractional.
+    - burst (float, optional): Maximum number of requests allowed at once. Default: 1.
     """
 
-    def __init__(self, ratelimit: float):
-        if ratelimit <= 0:
-            raise ValueError("ratelimit should be a non-zero positive number")
-        self.period = 1 / ratelimit
-        self._closed = False
+    def __init__(self, ratelimit: float, burst: Optional[float] = None):
+        self._lock = Lock()
+        self._closed = Event()
+        self.update(ratelimit, burst)
+        self._tokens = self.capacity
+        self._time = self._now()
 
     def _now(self):
         if hasattr(time, "monotonic"):
             return time.monotonic()
         return time.time()
 
+    def update(self, ratelimit: float, burst: Optional[float] = None) -> None:
+        """Change the rate and burst capacity of this bucket"""
+        if ratelimit <= 0:
+            raise ValueError("ratelimit should be a non-zero positive number")
+        with self._lock:
+            self.rate = float(ratelimit)
+            self.period = 1 / self.rate
+            self.capacity = max(1.0, float(burst or 1))
+            if hasattr(self, "_tokens"):
+                self._tokens = min(self._tokens, self.capacity)
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Reserve tokens from the bucket.
+
+        Returns:
+            The number of seconds to wait before the reserved slot is available.
+        """
+        with self._lock:
+            now = self._now()
+            elapsed = max(0.0, now - self._time)
+            self._time = now
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens * self.period
+
+    def acquire(self, signal: Optional[Event] = None) -> None:
+        """Block until a token is available or the signal is set"""
+        if self._closed.is_set():
+            return
+        delay = self.reserve()
+        if delay > 0:
+            logger.debug("Rate limited for %.2f seconds", delay)
+            (signal or self._closed).wait(delay)
+
     def __enter__(self):
-        self._time = self._now()
+        self.acquire()
         return self
 
     def __exit__(self, type, value, traceback):
-        if self._closed:
-            return
-        d = (self._time + self.period) - self._now()
-        self._time = self._now()
-        if d > 0:
-            time.sleep(d)
+        pass
 
     def shutdown(self):
-        self._closed = True
+        self._closed.set()
 
     def wrap(self, fn):
         def inner(*args, **kwargs):
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compares the size and speed of the chapter stores on a downloaded novel
+
+Usage:
+    python scripts/bench_chapter_store.py "Lightnovels/<source>/<novel>"
+"""
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from lncrawl.constants import META_FILE_NAME
+    from lncrawl.core.chapter_store import (SQLITE_STORE, JsonChapterStore,
+                                            SqliteChapterStore,
+                                            chapter_store_type)
+    from lncrawl.models import Chapter, MetaInfo
+except ImportError:
+    raise
+
+
+def load_chapters(output_path: Path):
+    with open(output_path / META_FILE_NAME, "r", encoding="utf-8") as fp:
+        meta = MetaInfo(**json.load(fp))
+    assert meta.novel and meta.session, "Invalid metadata"
+
+    chapters = []
+    pack_by_volume = meta.session.pack_by_volume
+    if chapter_store_type(str(output_path)) == SQLITE_STORE:
+        store = SqliteChapterStore(str(output_path))
+    else:
+        store = JsonChapterStore(str(output_path), pack_by_volume)
+    with store:
+        saved_chapters = store.get_many(meta.novel.chapters)
+    for chapter in meta.novel.chapters:
+        if chapter.id in saved_chapters:
+            chapters.append(Chapter(**saved_chapters[chapter.id]))
+    return chapters
+
+
+def folder_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.glob("**/*") if f.is_file())
+
+
+def measure(name: str, create_store, chapters, raw_size: int):
+    tmp_dir = Path(tempfile.mkdtemp(prefix="lncrawl-bench-"))
+    try:
+        start = time.perf_counter()
+        with create_store(str(tmp_dir)) as store:
+            for chapter in chapters:
+                store.put(chapter)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with create_store(str(tmp_dir)) as store:
+            restored = store.get_many(chapters)
+        read_time = time.perf_counter() - start
+        assert len(restored) == len(chapters), "Some chapters were not restored"
+
+        size = folder_size(tmp_dir)
+        print(
+            f"{name:<12} {size / 1024:>10.0f} KB {raw_size / size:>7.2f}x "
+            f"{write_time * 1000:>10.0f} ms {read_time * 1000:>10.0f} ms"
+        )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    output_path = Path(sys.argv[1])
+    print("Reading chapters from", output_path, f"({chapter_store_type(str(output_path))})")
+    chapters = load_chapters(output_path)
+    if not chapters:
+        print("No downloaded chapters found")
+        return
+
+    raw_size = sum(
+        len(json.dumps(chapter, ensure_ascii=False).encode("utf-8"))
+        for chapter in chapters
+    )
+    print(f"{len(chapters)} chapters, {raw_size / 1024:.0f} KB of json")
+    print()
+    print(f"{'store':<12} {'size':>13} {'ratio':>8} {'write':>13} {'read':>13}")
+
+    measure("json", lambda path: JsonChapterStore(path), chapters, raw_size)
+    measure("zlib", lambda path: SqliteChapterStore(path, codec="zlib"), chapters, raw_size)
+    measure("zstd", lambda path: SqliteChapterStore(path, codec="zstd", dict_samples=sys.maxsize), chapters, raw_size)
+    measure("zstd+dict", lambda path: SqliteChapterStore(path, codec="zstd"), chapters, raw_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Measures the time to clean the chapter pages with the TextCleaner
+
+The pages are the given html files, or the pages in the given folders.
+Without any argument, the pages recorded in the http cache are used.
+
+Usage:
+    python scripts/bench_cleaner_rules.py [file or folder...]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from bs4 import BeautifulSoup
+
+    from lncrawl import constants as C
+    from lncrawl.core.cleaner import TextCleaner
+except ImportError:
+    raise
+
+
+def find_pages(args):
+    paths = [Path(x) for x in args] or [Path(C.HTTP_CACHE_PATH) / "bodies"]
+    for path in paths:
+        files = sorted(x for x in path.glob("**/*") if x.is_file()) if path.is_dir() else [path]
+        for file in files:
+            content = file.read_bytes()
+            if b"<body" in content[:65536].lower():
+                yield file, content.decode("utf8", "ignore")
+
+
+def make_cleaner() -> TextCleaner:
+    # a few rules like the ones set by the sources in `initialize`
+    cleaner = TextCleaner()
+    cleaner.bad_css.update(["div.chapter-nav", ".comments", "#related-posts"])
+    cleaner.bad_tags.update(["h3"])
+    cleaner.bad_tag_text_pairs.update({"p": ["Read at", "translated by"], "strong": "TL Note"})
+    cleaner.bad_text_regex.update(["Next Chapter", "Previous Chapter"])
+    return cleaner
+
+
+def main():
+    pages = list(find_pages(sys.argv[1:]))
+    if not pages:
+        print(__doc__)
+        return
+
+    cleaner = make_cleaner()
+    cleaner.clean_text("")  # build the shared tables before measuring
+
+    timings = []
+    for _ in range(3):
+        for _, html in pages:
+            soup = BeautifulSoup(html, "lxml")
+            start = time.perf_counter()
+            cleaner.extract_contents(soup.body)
+            timings.append(time.perf_counter() - start)
+
+    total = sum(timings) * 1000
+    print(f"{len(pages)} pages, {len(timings)} runs")
+    print(f"total  {total:>10.1f} ms")
+    print(f"mean   {statistics.mean(timings) * 1000:>10.3f} ms")
+    print(f"median {statistics.median(timings) * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
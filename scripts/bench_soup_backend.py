@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compares the time to parse and clean the chapter pages with the bs4 and
+the lxml soup backends, and fails if the lxml backend is the slower one.
+
+The pages are the given html files, or the pages in the given folders.
+Without any argument, a generated chapter page is used. The chapter body
+is the first tag matching the selector, and the cleaner has the rules of
+the NovelFull sources, which use a descendant selector.
+
+Usage:
+    python scripts/bench_soup_backend.py [--selector css] [file or folder...]
+"""
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from lncrawl.core.cleaner import TextCleaner
+    from lncrawl.core.soup import SoupMaker
+except ImportError:
+    raise
+
+BACKENDS = ["bs4", "lxml"]
+
+
+def find_pages(paths):
+    for path in paths:
+        files = sorted(x for x in path.glob("**/*") if x.is_file()) if path.is_dir() else [path]
+        for file in files:
+            content = file.read_bytes()
+            if b"<body" in content[:65536].lower():
+                yield file.name, content
+
+
+def sample_page() -> bytes:
+    paragraphs = "".join(
+        f'<p class="p{i % 3}" style="color:red">Paragraph {i} with <b>bold</b> and '
+        f'<a href="/x{i}">link</a> text &amp; more<br/>line</p>'
+        + ('<div class="ads"><p>AD</p><script>x</script></div>' if i % 20 == 0 else "")
+        for i in range(300)
+    )
+    return (
+        "<html><head><title>Chapter</title></head><body>"
+        f'<div id="chr-content">{paragraphs}</div>'
+        "</body></html>"
+    ).encode()
+
+
+def make_cleaner() -> TextCleaner:
+    cleaner = TextCleaner()
+    cleaner.bad_css.update(['div[align="left"]', "#chr-content div", "#chapter-content div"])
+    cleaner.clean_text("")  # build the shared tables before measuring
+    return cleaner
+
+
+def measure(soup_maker: SoupMaker, cleaner: TextCleaner, html: bytes, selector: str):
+    gc.collect()
+    start = time.perf_counter()
+    soup = soup_maker.make_soup(html, "utf-8")
+    body = soup.select_one(selector)
+    if not body:
+        return None
+    parsed = time.perf_counter()
+    cleaner.extract_contents(body)
+    return parsed - start, time.perf_counter() - parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--selector", default="#chr-content, #chapter-content, .reading-content, body")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("paths", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    pages = list(find_pages(args.paths)) if args.paths else [("sample", sample_page())]
+    if not pages:
+        print(__doc__)
+        return
+
+    cleaner = make_cleaner()
+    soup_makers = {name: SoupMaker(backend=name) for name in BACKENDS}
+
+    # the best of the runs of each page, the backends taking turns
+    best = {name: {} for name in BACKENDS}
+    for _ in range(args.runs):
+        for page, html in pages:
+            for name, soup_maker in soup_makers.items():
+                timing = measure(soup_maker, cleaner, html, args.selector)
+                if timing:
+                    current = best[name].get(page, timing)
+                    best[name][page] = tuple(map(min, current, timing))
+
+    totals = {}
+    for name in BACKENDS:
+        parse = sum(x[0] for x in best[name].values()) * 1000
+        clean = sum(x[1] for x in best[name].values()) * 1000
+        totals[name] = parse + clean
+        print(f"{name:<5} parse {parse:>9.1f} ms  clean {clean:>9.1f} ms  total {parse + clean:>9.1f} ms")
+
+    print(f"{len(best['bs4'])} pages, best of {args.runs} runs")
+    if totals["lxml"] > totals["bs4"]:
+        print("FAIL: the lxml backend is slower than bs4")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Measures the cost of creating the text cleaners, as every crawler has one
+
+Usage:
+    python scripts/bench_text_cleaner.py [count]
+"""
+import itertools
+import subprocess
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from lncrawl.core.cleaner import TextCleaner
+except ImportError:
+    raise
+
+
+def build_table_per_instance():
+    """What every cleaner used to do in its constructor"""
+    invisible_chars = [
+        code
+        for code in range(sys.maxunicode)
+        if unicodedata.category(chr(code)) in {"Cf", "Cc"}
+    ]
+    return {
+        character: None
+        for character in itertools.chain(
+            range(0x00, 0x20),
+            range(0x7F, 0xA0),
+            invisible_chars,
+        )
+    }
+
+
+def measure(name: str, count: int, create):
+    start = time.perf_counter()
+    for _ in range(count):
+        create()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed * 1000:>10.1f} ms {elapsed * 1000 / count:>10.3f} ms/each")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "from lncrawl.core.cleaner import TextCleaner; TextCleaner()"],
+        cwd=str(workdir),
+        check=True,
+    )
+    print(f"{'python startup with a cleaner':<32} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    print()
+
+    print(f"Creating {count} cleaners")
+    measure("table per instance (before)", count, build_table_per_instance)
+    measure("cleaner, no text cleaned", count, TextCleaner)
+    measure("cleaner, first text cleaned", 1, lambda: TextCleaner().clean_text("x"))
+    measure("cleaner, later texts cleaned", count, lambda: TextCleaner().clean_text("x"))
+
+
+if __name__ == "__main__":
+    main()
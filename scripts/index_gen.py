@@ -263,6 +263,8 @@ def process_file(py_file: Path) -> float:
         info["can_search"] = can_search
         info["can_login"] = can_login
         info["can_logout"] = can_logout
+        info["is_disabled"] = crawler.is_disabled
+        info["disable_reason"] = crawler.disable_reason
         info["base_urls"] = getattr(crawler, "base_url")
         info["contributors"] = process_contributors(history)
 